@@ -5,10 +5,16 @@ import plotly.graph_objects as go
 import time
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 from brightdata_linkedin_scraper import BrightDataLinkedInScraper
-from data_manager import DataManager
+from data_manager import CONNECTION_BUCKETS, DataManager
+from ingest_pipeline import IngestPipeline
+from recrawl_scheduler import RecrawlScheduler
+from export_service import data_version, get_export_service
+from lead_store import LeadStore
+from metrics import registry, start_metrics_server
+from proxy_pool import ProxyEndpoint, ProxyPool, credential_env_names
 
 # Set page configuration
 st.set_page_config(
@@ -29,8 +35,10 @@ if "current_page" not in st.session_state:
     st.session_state.current_page = "dashboard"
 if "leads_df" not in st.session_state:
     st.session_state.leads_df = pd.DataFrame()
-if "search_history" not in st.session_state:
-    st.session_state.search_history = []
+if "leads_version" not in st.session_state:
+    st.session_state.leads_version = None
+if "recrawl_plan" not in st.session_state:
+    st.session_state.recrawl_plan = None
 if "filters" not in st.session_state:
     st.session_state.filters = []
 if "theme" not in st.session_state:
@@ -47,12 +55,22 @@ if "proxy_username" not in st.session_state:
     st.session_state.proxy_username = ""
 if "proxy_password" not in st.session_state:
     st.session_state.proxy_password = ""
+if "proxy_list" not in st.session_state:
+    st.session_state.proxy_list = ""
+if "proxy_config_file" not in st.session_state:
+    st.session_state.proxy_config_file = os.path.join("data", "proxies.json")
 if "storage_type" not in st.session_state:
     st.session_state.storage_type = "file"
 if "db_path" not in st.session_state:
     st.session_state.db_path = "linkedin_leads.db"
 if "data_dir" not in st.session_state:
     st.session_state.data_dir = "data"
+if "source_backend" not in st.session_state:
+    st.session_state.source_backend = "mock"
+if "source_base_url" not in st.session_state:
+    st.session_state.source_base_url = "https://www.linkedin.com"
+if "fixture_dir" not in st.session_state:
+    st.session_state.fixture_dir = os.path.join("data", "fixtures")
 
 # Initialize data manager
 data_manager = DataManager(
@@ -61,12 +79,113 @@ data_manager = DataManager(
     data_dir=st.session_state.data_dir
 )
 
+# One lead snapshot per storage location, shared by every session in the process
+@st.cache_resource
+def get_lead_store(storage_type, db_path, data_dir, _data_manager):
+    return LeadStore(_data_manager)
+
+lead_store = get_lead_store(
+    st.session_state.storage_type,
+    st.session_state.db_path,
+    st.session_state.data_dir,
+    data_manager
+)
+
+# Sessions hold a shallow view of the shared snapshot and only swap it when the version changes
+def sync_leads(snapshot=None):
+    snapshot = snapshot or lead_store.snapshot()
+    if st.session_state.leads_version != snapshot.version:
+        st.session_state.leads_df = snapshot.view()
+        st.session_state.leads_version = snapshot.version
+
+# Proxy pools are cached across reruns and sessions so their health scores persist
+@st.cache_resource
+def load_proxy_pool(proxy_config_file, config_mtime, proxy_list, single_proxy):
+    pool = ProxyPool.from_lines(proxy_list)
+    if single_proxy[0]:
+        pool.endpoints.insert(0, ProxyEndpoint(*single_proxy))
+    
+    if config_mtime is not None:
+        # Credentials typed into the form stand in for environment variables that are not set
+        fallback_credentials = {
+            endpoint.key: (endpoint.username, endpoint.password)
+            for endpoint in pool.endpoints if endpoint.username or endpoint.password
+        }
+        return ProxyPool.from_config(proxy_config_file, fallback_credentials)
+    return pool if pool.endpoints else None
+
+# The config file takes precedence when it exists; otherwise the pool is built
+# from the single proxy fields and the proxy list
+def get_proxy_pool():
+    config_file = st.session_state.proxy_config_file
+    config_mtime = os.path.getmtime(config_file) if config_file and os.path.exists(config_file) else None
+    single_proxy = (
+        st.session_state.proxy_host,
+        st.session_state.proxy_port,
+        st.session_state.proxy_username or None,
+        st.session_state.proxy_password or None
+    )
+    return load_proxy_pool(config_file, config_mtime, st.session_state.proxy_list, single_proxy)
+
+# Scrapers are created on worker threads, so the settings are read here on the script thread
+def get_scraper_factory():
+    use_proxy = st.session_state.use_proxy
+    proxy_pool = get_proxy_pool() if use_proxy else None
+    backend = st.session_state.source_backend
+    base_url = st.session_state.source_base_url
+    fixture_dir = st.session_state.fixture_dir
+    
+    def make_scraper():
+        return BrightDataLinkedInScraper(
+            use_proxy=use_proxy,
+            proxy_pool=proxy_pool,
+            backend=backend,
+            base_url=base_url,
+            fixture_dir=fixture_dir
+        )
+    
+    return make_scraper
+
+EXPORT_LABELS = {"csv": "CSV", "excel": "Excel", "json": "JSON"}
+
+# Export cache key for the session's leads: the snapshot version, qualified by the storage
+# it belongs to, so checking for cached exports never has to hash the leads
+def leads_export_version():
+    storage = st.session_state.db_path if st.session_state.storage_type == "database" else st.session_state.data_dir
+    return f"leads:{st.session_state.storage_type}:{os.path.abspath(storage)}:{st.session_state.leads_version}"
+
+# Exports are rendered by the process-wide export service and cached by data version,
+# so once prepared the download buttons survive reruns without rendering again.
+# Frames without a known version are versioned by hashing their contents
+def show_export_downloads(df, formats, key, label="Prepare Export", version=None):
+    export_service = get_export_service()
+    version = version or data_version(df)
+    
+    if not export_service.is_cached(df, formats, version=version):
+        if not st.button(label, key=f"{key}_prepare"):
+            return
+    
+    try:
+        with st.spinner("Preparing export..."):
+            artifacts = export_service.export(df, formats, version=version)
+    except Exception as e:
+        st.error(f"Export failed: {str(e)}")
+        return
+    
+    columns = st.columns(len(artifacts))
+    for column, artifact in zip(columns, artifacts):
+        with column:
+            st.download_button(
+                f"Download {EXPORT_LABELS[artifact.format]}",
+                data=artifact.data,
+                file_name=artifact.file_name,
+                mime=artifact.mime,
+                key=f"{key}_{artifact.format}"
+            )
+
 # Load data if available
 if st.session_state.logged_in:
-    if st.session_state.leads_df.empty:
-        st.session_state.leads_df = data_manager.load_leads()
-    if not st.session_state.search_history:
-        st.session_state.search_history = data_manager.load_search_history()
+    sync_leads()
     if not st.session_state.filters:
         st.session_state.filters = data_manager.load_filters()
 
@@ -108,7 +227,7 @@ def show_login():
 # Main navigation
 def show_navigation():
     st.markdown("<div class='navigation'>", unsafe_allow_html=True)
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
     
     with col1:
         if st.button("Dashboard", key="nav_dashboard"):
@@ -186,6 +305,21 @@ def show_navigation():
             )
     
     with col6:
+        if st.button("Jobs", key="nav_jobs"):
+            st.session_state.current_page = "jobs"
+            # Use JavaScript to reload the page instead of experimental_rerun
+            st.markdown(
+                """
+                <script>
+                setTimeout(function() {
+                    window.location.reload();
+                }, 100);
+                </script>
+                """,
+                unsafe_allow_html=True
+            )
+    
+    with col7:
         if st.button("Settings", key="nav_settings"):
             st.session_state.current_page = "settings"
             # Use JavaScript to reload the page instead of experimental_rerun
@@ -332,7 +466,7 @@ def show_dashboard():
     with col4:
         st.markdown("<div class='dashboard-card'>", unsafe_allow_html=True)
         st.markdown("<h3>Recent Searches</h3>", unsafe_allow_html=True)
-        recent_searches = len(st.session_state.search_history) if st.session_state.search_history else 0
+        recent_searches = data_manager.count_search_history()
         st.markdown(f"<p class='dashboard-number'>{recent_searches}</p>", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
@@ -342,15 +476,32 @@ def show_dashboard():
     with col1:
         st.markdown("<h2>Recent Activity</h2>", unsafe_allow_html=True)
         
-        if st.session_state.search_history:
+        # Only the visible page of the history is loaded
+        page_size = 5
+        page_count = max(1, -(-recent_searches // page_size))
+        page = 0
+        if page_count > 1:
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="recent_searches_page") - 1
+        recent = data_manager.load_recent_searches(limit=page_size, offset=page * page_size)
+        
+        if recent:
             st.markdown("<div class='activity-container'>", unsafe_allow_html=True)
-            for i, search in enumerate(reversed(st.session_state.search_history[-5:])):
+            for search in recent:
                 st.markdown(f"<div class='activity-item'>", unsafe_allow_html=True)
                 st.markdown(f"<p><strong>Search:</strong> {search['keywords']} in {search['location']}</p>", unsafe_allow_html=True)
                 st.markdown(f"<p><strong>Date:</strong> {search['date']}</p>", unsafe_allow_html=True)
                 st.markdown(f"<p><strong>Results:</strong> {search['results']} leads</p>", unsafe_allow_html=True)
+                if search.get('duration_seconds') is not None:
+                    st.markdown(f"<p><strong>Duration:</strong> {search['duration_seconds']:.1f}s</p>", unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
+            
+            search_stats = data_manager.get_search_history_stats()
+            if search_stats['avg_duration_seconds'] is not None:
+                st.caption(
+                    f"Average search: {search_stats['avg_results']} results, "
+                    f"{search_stats['avg_duration_seconds']:.1f}s"
+                )
         else:
             st.markdown("<p>No recent activity</p>", unsafe_allow_html=True)
     
@@ -430,52 +581,45 @@ def show_search():
         
         if submit_button and keywords and location:
             with st.spinner("Searching LinkedIn..."):
-                # Initialize LinkedIn scraper with proxy settings if enabled
-                proxy_config = None
-                if st.session_state.use_proxy:
-                    proxy_config = {
-                        'host': st.session_state.proxy_host,
-                        'port': st.session_state.proxy_port,
-                        'username': st.session_state.proxy_username,
-                        'password': st.session_state.proxy_password
-                    }
-                
-                scraper = BrightDataLinkedInScraper(
-                    use_proxy=st.session_state.use_proxy,
-                    proxy_config=proxy_config
-                )
+                # Initialize LinkedIn scrapers with the proxy pool if enabled
+                make_scraper = get_scraper_factory()
                 
                 try:
-                    # Search for profiles
-                    results = scraper.search_profiles(keywords, location, limit=result_limit)
+                    # Search for profiles; results are cleaned and stored in batches while pages are still being fetched
+                    pipeline = IngestPipeline(data_manager)
+                    search_start = time.perf_counter()
+                    ingest = pipeline.run(
+                        [{'keywords': keywords, 'location': location, 'limit': result_limit}],
+                        make_scraper,
+                        workers=1
+                    )
+                    
+                    search_duration = time.perf_counter() - search_start
                     
-                    # Convert to DataFrame
-                    results_df = pd.DataFrame(results)
+                    if ingest.errors:
+                        raise RuntimeError(ingest.errors[0])
+                    if ingest.failed_batches:
+                        st.warning(f"{ingest.failed_batches} batches of leads could not be saved")
                     
-                    # Clean data
-                    results_df = data_manager.clean_data(results_df)
+                    results_df = ingest.leads_df
                     
                     # Update session state
                     if not results_df.empty:
-                        # Append new results to existing leads
-                        if not st.session_state.leads_df.empty:
-                            combined_df = pd.concat([st.session_state.leads_df, results_df])
-                            st.session_state.leads_df = combined_df.drop_duplicates(subset=['profile_url'], keep='first').reset_index(drop=True)
-                        else:
-                            st.session_state.leads_df = results_df
-                        
-                        # Save leads
-                        data_manager.save_leads(st.session_state.leads_df)
+                        # The results are already stored; reload the shared snapshot so every session sees them
+                        sync_leads(lead_store.refresh())
                         
                         # Update search history
                         search_entry = {
                             "keywords": keywords,
                             "location": location,
                             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "results": len(results_df)
+                            "results": len(results_df),
+                            "result_limit": result_limit,
+                            "new_leads": ingest.stored,
+                            "duration_seconds": round(search_duration, 3),
+                            "run_id": ingest.run_ids[0]
                         }
-                        st.session_state.search_history.append(search_entry)
-                        data_manager.save_search_history(st.session_state.search_history)
+                        data_manager.append_search_history(search_entry)
                         
                         st.success(f"Found {len(results_df)} leads matching your criteria")
                     else:
@@ -514,30 +658,51 @@ def show_search():
         
         st.markdown("</div>", unsafe_allow_html=True)
     
+    # Re-crawl stale leads
+    with st.expander("Refresh Stale Leads"):
+        st.markdown(
+            "<p>Re-runs the searches whose leads are due for a refresh. Leads that change often are refreshed "
+            "after a day, leads that never change after up to 30 days.</p>",
+            unsafe_allow_html=True
+        )
+        
+        scheduler = RecrawlScheduler(data_manager)
+        
+        # Planning scans every lead, so it only runs on request; the plan is kept until the leads change
+        if st.button("Find Stale Leads", key="recrawl_plan_button"):
+            with st.spinner("Checking lead freshness..."):
+                st.session_state.recrawl_plan = (st.session_state.leads_version, scheduler.plan())
+        
+        plan = st.session_state.recrawl_plan
+        due_searches = plan[1] if plan is not None and plan[0] == st.session_state.leads_version else None
+        
+        if due_searches:
+            st.dataframe(pd.DataFrame(due_searches), use_container_width=True)
+            max_searches = st.number_input("Searches to run", min_value=1, max_value=len(due_searches), value=min(5, len(due_searches)))
+            
+            if st.button("Refresh Now", key="recrawl_button"):
+                with st.spinner("Refreshing leads..."):
+                    recrawl = scheduler.run(get_scraper_factory(), max_searches=max_searches)
+                
+                if recrawl is not None:
+                    if recrawl.errors:
+                        st.warning(f"{len(recrawl.errors)} searches failed")
+                    st.success(f"Refreshed {recrawl.records} leads; {recrawl.stored} new leads found")
+                    sync_leads(lead_store.refresh())
+        elif due_searches is not None:
+            st.markdown("<p>No leads are due for a refresh.</p>", unsafe_allow_html=True)
+    
     # Search results
     if not st.session_state.leads_df.empty:
         st.markdown("<h2>Search Results</h2>", unsafe_allow_html=True)
         
         # Export options
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("Export as CSV"):
-                export_path = data_manager.export_leads(st.session_state.leads_df, format="csv")
-                if export_path:
-                    st.success(f"Leads exported to {export_path}")
-        
-        with col2:
-            if st.button("Export as Excel"):
-                export_path = data_manager.export_leads(st.session_state.leads_df, format="excel")
-                if export_path:
-                    st.success(f"Leads exported to {export_path}")
-        
-        with col3:
-            if st.button("Export as JSON"):
-                export_path = data_manager.export_leads(st.session_state.leads_df, format="json")
-                if export_path:
-                    st.success(f"Leads exported to {export_path}")
+        show_export_downloads(
+            st.session_state.leads_df,
+            ["csv", "excel", "json"],
+            key="search_export",
+            version=leads_export_version()
+        )
         
         # Display results
         st.dataframe(st.session_state.leads_df)
@@ -582,33 +747,17 @@ def show_leads():
         qualified_filter = st.selectbox("Qualification", ["All", "Qualified", "Unqualified"], key="qualified_filter")
     
     # Apply filters
-    filtered_df = st.session_state.leads_df.copy()
-    
-    if name_filter:
-        filtered_df = filtered_df[filtered_df['name'].str.contains(name_filter, case=False)]
-    
-    if title_filter:
-        filtered_df = filtered_df[filtered_df['title'].str.contains(title_filter, case=False)]
-    
-    if company_filter:
-        filtered_df = filtered_df[filtered_df['company'].str.contains(company_filter, case=False)]
-    
-    if location_filter:
-        filtered_df = filtered_df[filtered_df['location'].str.contains(location_filter, case=False)]
-    
-    if industry_filter:
-        filtered_df = filtered_df[filtered_df['industry'].str.contains(industry_filter, case=False)]
-    
-    if company_size_filter:
-        filtered_df = filtered_df[filtered_df['company_size'].str.contains(company_size_filter, case=False)]
-    
-    if connections_filter:
-        filtered_df = filtered_df[filtered_df['connections'].astype(str).str.contains(connections_filter, case=False)]
-    
-    if qualified_filter == "Qualified":
-        filtered_df = filtered_df[filtered_df['is_qualified'] == True]
-    elif qualified_filter == "Unqualified":
-        filtered_df = filtered_df[filtered_df['is_qualified'] == False]
+    filtered_df = data_manager.filter_leads(
+        st.session_state.leads_df,
+        name=name_filter,
+        title=title_filter,
+        company=company_filter,
+        location=location_filter,
+        industry=industry_filter,
+        company_size=company_size_filter,
+        connections=connections_filter,
+        qualified=qualified_filter
+    )
     
     # View options
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -643,7 +792,7 @@ def show_leads():
             )
     
     with col2:
-        sort_by = st.selectbox("Sort By", ["Name", "Title", "Company", "Location", "Qualification"])
+        sort_by = st.selectbox("Sort By", ["Name", "Title", "Company", "Location", "Qualification", "Score"])
     
     with col3:
         st.markdown(f"<p class='filter-count'>{len(filtered_df)} leads found</p>", unsafe_allow_html=True)
@@ -659,6 +808,14 @@ def show_leads():
         filtered_df = filtered_df.sort_values(by="location")
     elif sort_by == "Qualification":
         filtered_df = filtered_df.sort_values(by="is_qualified", ascending=False)
+    elif sort_by == "Score" and 'lead_score' in filtered_df.columns:
+        snapshot = lead_store.snapshot()
+        if snapshot.version == st.session_state.leads_version:
+            # Select from the snapshot's score order instead of sorting every rerun
+            order = snapshot.score_order()
+            filtered_df = filtered_df.loc[order[order.isin(filtered_df.index)]]
+        else:
+            filtered_df = filtered_df.sort_values(by="lead_score", ascending=False, na_position="last")
     
     # Display leads
     if st.session_state.view_mode == "card":
@@ -679,6 +836,8 @@ def show_leads():
                         st.markdown(f"<p><strong>{lead['title']}</strong></p>", unsafe_allow_html=True)
                         st.markdown(f"<p>{lead['company']}</p>", unsafe_allow_html=True)
                         st.markdown(f"<p>{lead['location']}</p>", unsafe_allow_html=True)
+                        if pd.notna(lead.get('lead_score')):
+                            st.markdown(f"<p><strong>Score:</strong> {lead['lead_score']:.0f}</p>", unsafe_allow_html=True)
                         
                         if lead['is_qualified']:
                             st.markdown("<span class='badge qualified'>Qualified</span>", unsafe_allow_html=True)
@@ -695,8 +854,8 @@ def show_leads():
                         with col2:
                             if lead['is_qualified']:
                                 if st.button("Unqualify", key=f"unqualify_{i+j}"):
-                                    st.session_state.leads_df.loc[st.session_state.leads_df['profile_url'] == lead['profile_url'], 'is_qualified'] = False
-                                    data_manager.save_leads(st.session_state.leads_df)
+                                    lead_store.update_lead(lead['profile_url'], is_qualified=False)
+                                    sync_leads()
                                     # Use JavaScript to reload the page instead of experimental_rerun
                                     st.markdown(
                                         """
@@ -710,8 +869,8 @@ def show_leads():
                                     )
                             else:
                                 if st.button("Qualify", key=f"qualify_{i+j}"):
-                                    st.session_state.leads_df.loc[st.session_state.leads_df['profile_url'] == lead['profile_url'], 'is_qualified'] = True
-                                    data_manager.save_leads(st.session_state.leads_df)
+                                    lead_store.update_lead(lead['profile_url'], is_qualified=True)
+                                    sync_leads()
                                     # Use JavaScript to reload the page instead of experimental_rerun
                                     st.markdown(
                                         """
@@ -749,7 +908,10 @@ def show_leads():
                 st.markdown(f"<p><strong>Location:</strong> {lead['location']}</p>", unsafe_allow_html=True)
                 st.markdown(f"<p><strong>Industry:</strong> {lead['industry']}</p>", unsafe_allow_html=True)
                 st.markdown(f"<p><strong>Company Size:</strong> {lead['company_size']}</p>", unsafe_allow_html=True)
-                st.markdown(f"<p><strong>Connections:</strong> {lead['connections']}</p>", unsafe_allow_html=True)
+                connections = 'Unknown' if pd.isna(lead['connections']) else f"{lead['connections']:,}"
+                st.markdown(f"<p><strong>Connections:</strong> {connections}</p>", unsafe_allow_html=True)
+                if pd.notna(lead.get('lead_score')):
+                    st.markdown(f"<p><strong>Lead Score:</strong> {lead['lead_score']:.1f}</p>", unsafe_allow_html=True)
                 st.markdown(f"<p><strong>Profile URL:</strong> <a href='{lead['profile_url']}' target='_blank'>{lead['profile_url']}</a></p>", unsafe_allow_html=True)
                 
                 if lead['is_qualified']:
@@ -763,8 +925,8 @@ def show_leads():
                 # Actions
                 if lead['is_qualified']:
                     if st.button("Mark as Unqualified"):
-                        st.session_state.leads_df.loc[st.session_state.leads_df['profile_url'] == lead['profile_url'], 'is_qualified'] = False
-                        data_manager.save_leads(st.session_state.leads_df)
+                        lead_store.update_lead(lead['profile_url'], is_qualified=False)
+                        sync_leads()
                         # Use JavaScript to reload the page instead of experimental_rerun
                         st.markdown(
                             """
@@ -778,8 +940,8 @@ def show_leads():
                         )
                 else:
                     if st.button("Mark as Qualified"):
-                        st.session_state.leads_df.loc[st.session_state.leads_df['profile_url'] == lead['profile_url'], 'is_qualified'] = True
-                        data_manager.save_leads(st.session_state.leads_df)
+                        lead_store.update_lead(lead['profile_url'], is_qualified=True)
+                        sync_leads()
                         # Use JavaScript to reload the page instead of experimental_rerun
                         st.markdown(
                             """
@@ -796,9 +958,73 @@ def show_leads():
                 notes = st.text_area("Notes", value=lead.get('notes', ''))
                 
                 if st.button("Save Notes"):
-                    st.session_state.leads_df.loc[st.session_state.leads_df['profile_url'] == lead['profile_url'], 'notes'] = notes
-                    data_manager.save_leads(st.session_state.leads_df)
-                    st.success("Notes saved successfully")
+                    if lead_store.update_lead(lead['profile_url'], notes=notes):
+                        sync_leads()
+                        st.success("Notes saved successfully")
+                    else:
+                        st.error("Notes could not be saved")
+    
+    # Possible duplicates
+    with st.expander("Possible Duplicates"):
+        show_duplicate_suggestions()
+
+# Merge suggestions for leads that are probably the same person under different profile URLs
+def show_duplicate_suggestions(page_size=10):
+    st.markdown(
+        "<p>Leads with the same canonical profile URL, or a very similar name at the same company. "
+        "New leads are checked as they are stored.</p>",
+        unsafe_allow_html=True
+    )
+    
+    if st.button("Check all leads for duplicates", key="find_duplicates"):
+        with st.spinner("Checking leads for duplicates..."):
+            found = data_manager.find_duplicate_leads()
+        if found is None:
+            st.error("Error checking leads for duplicates")
+        else:
+            st.success(f"Found {found} new possible duplicates")
+    
+    suggestion_count = data_manager.count_duplicate_suggestions()
+    if not suggestion_count:
+        st.markdown("<p>No possible duplicates found.</p>", unsafe_allow_html=True)
+        return
+    
+    # Only the visible page of suggestions is loaded
+    page_count = max(1, -(-suggestion_count // page_size))
+    page = 0
+    if page_count > 1:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="duplicates_page") - 1
+    st.caption(f"{suggestion_count} possible duplicates")
+    
+    suggestions = data_manager.get_duplicate_suggestions(limit=page_size, offset=page * page_size)
+    leads = st.session_state.leads_df.drop_duplicates(subset=['profile_url']).set_index('profile_url')
+    for row, suggestion in suggestions.iterrows():
+        if suggestion['profile_url'] not in leads.index or suggestion['duplicate_of'] not in leads.index:
+            continue
+        duplicate = leads.loc[suggestion['profile_url']]
+        existing = leads.loc[suggestion['duplicate_of']]
+        reason = "Same profile URL" if suggestion['reason'] == "url" else f"{suggestion['similarity']:.0%} similar name and company"
+        
+        col1, col2, col3 = st.columns([2, 2, 1])
+        
+        with col1:
+            st.markdown(f"<p><strong>{existing['name']}</strong> ({existing['company']})<br><a href='{suggestion['duplicate_of']}' target='_blank'>{suggestion['duplicate_of']}</a></p>", unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"<p><strong>{duplicate['name']}</strong> ({duplicate['company']})<br><a href='{suggestion['profile_url']}' target='_blank'>{suggestion['profile_url']}</a></p>", unsafe_allow_html=True)
+            st.caption(reason)
+        
+        with col3:
+            # The lead stored first is kept
+            if st.button("Merge", key=f"merge_duplicate_{page}_{row}"):
+                if data_manager.merge_leads(suggestion['duplicate_of'], suggestion['profile_url']):
+                    sync_leads(lead_store.refresh())
+                    st.success("Leads merged")
+                else:
+                    st.error("Leads could not be merged")
+            if st.button("Not a duplicate", key=f"dismiss_duplicate_{page}_{row}"):
+                data_manager.dismiss_duplicate_suggestion(suggestion['profile_url'], suggestion['duplicate_of'])
+                st.success("Suggestion dismissed")
 
 # Filters page
 def show_filters():
@@ -864,29 +1090,7 @@ def show_filters():
                 
                 if st.button("Apply Filter", key=f"apply_{i}"):
                     # Apply the filter to leads
-                    filtered_df = st.session_state.leads_df.copy()
-                    
-                    if filter_data['job_titles']:
-                        title_mask = filtered_df['title'].apply(lambda x: any(title.lower() in x.lower() for title in filter_data['job_titles']))
-                        filtered_df = filtered_df[title_mask]
-                    
-                    if filter_data['companies']:
-                        company_mask = filtered_df['company'].apply(lambda x: any(company.lower() in x.lower() for company in filter_data['companies']))
-                        filtered_df = filtered_df[company_mask]
-                    
-                    if filter_data['industries']:
-                        industry_mask = filtered_df['industry'].apply(lambda x: any(industry.lower() in x.lower() for industry in filter_data['industries']))
-                        filtered_df = filtered_df[industry_mask]
-                    
-                    if filter_data['locations']:
-                        location_mask = filtered_df['location'].apply(lambda x: any(location.lower() in x.lower() for location in filter_data['locations']))
-                        filtered_df = filtered_df[location_mask]
-                    
-                    qualification_mask = (filtered_df['is_qualified'] == True) if filter_data['include_qualified'] and not filter_data['include_unqualified'] else \
-                                        (filtered_df['is_qualified'] == False) if not filter_data['include_qualified'] and filter_data['include_unqualified'] else \
-                                        pd.Series([True] * len(filtered_df))
-                    
-                    filtered_df = filtered_df[qualification_mask]
+                    filtered_df = data_manager.apply_filter(st.session_state.leads_df, filter_data)
                     
                     # Display results
                     st.session_state.filtered_leads = filtered_df
@@ -937,6 +1141,19 @@ def show_filters():
         st.markdown("<h2>Filter Results</h2>", unsafe_allow_html=True)
         st.dataframe(st.session_state.filtered_leads)
 
+# Detail tables only fetch the page of groups they show
+def show_lead_count_table(column, label, key, page_size=50):
+    group_count = data_manager.count_lead_groups(column)
+    page_count = max(1, -(-group_count // page_size))
+    page = 0
+    if page_count > 1:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=key) - 1
+    
+    counts = data_manager.get_lead_count_page(column, limit=page_size, offset=page * page_size)
+    counts.columns = [label, 'Count']
+    st.dataframe(counts, use_container_width=True)
+    st.caption(f"{group_count} distinct values")
+
 # Analytics page
 def show_analytics():
     st.markdown("<h1>Analytics</h1>", unsafe_allow_html=True)
@@ -945,11 +1162,11 @@ def show_analytics():
         st.markdown("<p>No leads available for analytics. Use the Search page to find leads.</p>", unsafe_allow_html=True)
         return
     
-    # Get lead statistics
-    stats = data_manager.get_lead_statistics(st.session_state.leads_df)
+    # Get lead statistics; counts are aggregated by the data manager and only chart-sized results are returned
+    stats = data_manager.get_lead_summary()
     
     # Analytics tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Companies", "Job Titles", "Locations"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Overview", "Companies", "Job Titles", "Locations", "Search Yield", "Trends"])
     
     with tab1:
         # Overview
@@ -990,10 +1207,20 @@ def show_analytics():
         # Connections distribution
         st.markdown("<h3>Connections Distribution</h3>", unsafe_allow_html=True)
         
-        connections_df = pd.DataFrame({
-            'Connections': list(stats['connections_distribution'].keys()),
-            'Count': list(stats['connections_distribution'].values())
-        })
+        bucket_edges = st.text_input(
+            "Bucket edges",
+            value=", ".join(str(edge) for edge in CONNECTION_BUCKETS),
+            help="Lower edge of each bucket, comma-separated; the last bucket is open-ended",
+            key="connection_bucket_edges"
+        )
+        try:
+            buckets = [int(edge) for edge in bucket_edges.replace(" ", "").split(",") if edge]
+        except ValueError:
+            st.warning("Bucket edges must be whole numbers; showing the default buckets.")
+            buckets = CONNECTION_BUCKETS
+        
+        connections_df = data_manager.get_connections_histogram(buckets)[['bucket', 'count']]
+        connections_df.columns = ['Connections', 'Count']
         
         fig = px.bar(
             connections_df,
@@ -1001,6 +1228,7 @@ def show_analytics():
             y='Count',
             color_discrete_sequence=['#0077B5']
         )
+        fig.update_xaxes(type='category')
         fig.update_layout(margin=dict(t=0, b=0, l=0, r=0))
         st.plotly_chart(fig, use_container_width=True)
     
@@ -1011,10 +1239,9 @@ def show_analytics():
         # Top companies chart
         st.markdown("<h3>Top Companies</h3>", unsafe_allow_html=True)
         
-        companies_df = pd.DataFrame({
-            'Company': list(stats['top_companies'].keys()),
-            'Count': list(stats['top_companies'].values())
-        })
+        # Name variants such as "Google" and "Google LLC" are counted as one company
+        companies_df = data_manager.get_lead_counts('company', top_n=10)
+        companies_df.columns = ['Company', 'Count']
         
         fig = px.bar(
             companies_df,
@@ -1028,10 +1255,27 @@ def show_analytics():
         # Company data
         st.markdown("<h3>Company Data</h3>", unsafe_allow_html=True)
         
-        company_counts = st.session_state.leads_df['company'].value_counts().reset_index()
-        company_counts.columns = ['Company', 'Count']
+        show_lead_count_table('company', 'Company', key="company_counts_page")
+        
+        # Company aliases
+        st.markdown("<h3>Company Aliases</h3>", unsafe_allow_html=True)
+        st.caption("Count a former name or brand as part of another company.")
         
-        st.dataframe(company_counts)
+        with st.form("company_alias_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                alias = st.text_input("Alias", placeholder="e.g. Facebook")
+            
+            with col2:
+                alias_company = st.text_input("Company", placeholder="e.g. Meta")
+            
+            if st.form_submit_button("Add Alias"):
+                entity = data_manager.companies.add_alias(alias, alias_company)
+                if entity:
+                    st.success(f"'{alias}' is now counted as {entity.name}")
+                else:
+                    st.error("Please enter both an alias and a company")
     
     with tab3:
         # Job Titles
@@ -1040,10 +1284,8 @@ def show_analytics():
         # Top job titles chart
         st.markdown("<h3>Top Job Titles</h3>", unsafe_allow_html=True)
         
-        titles_df = pd.DataFrame({
-            'Title': list(stats['top_titles'].keys()),
-            'Count': list(stats['top_titles'].values())
-        })
+        titles_df = data_manager.get_lead_counts('title', top_n=10)
+        titles_df.columns = ['Title', 'Count']
         
         fig = px.bar(
             titles_df,
@@ -1057,10 +1299,7 @@ def show_analytics():
         # Job title data
         st.markdown("<h3>Job Title Data</h3>", unsafe_allow_html=True)
         
-        title_counts = st.session_state.leads_df['title'].value_counts().reset_index()
-        title_counts.columns = ['Title', 'Count']
-        
-        st.dataframe(title_counts)
+        show_lead_count_table('title', 'Title', key="title_counts_page")
     
     with tab4:
         # Locations
@@ -1069,10 +1308,8 @@ def show_analytics():
         # Top locations chart
         st.markdown("<h3>Top Locations</h3>", unsafe_allow_html=True)
         
-        locations_df = pd.DataFrame({
-            'Location': list(stats['top_locations'].keys()),
-            'Count': list(stats['top_locations'].values())
-        })
+        locations_df = data_manager.get_lead_counts('location', top_n=10)
+        locations_df.columns = ['Location', 'Count']
         
         fig = px.bar(
             locations_df,
@@ -1086,16 +1323,158 @@ def show_analytics():
         # Location data
         st.markdown("<h3>Location Data</h3>", unsafe_allow_html=True)
         
-        location_counts = st.session_state.leads_df['location'].value_counts().reset_index()
-        location_counts.columns = ['Location', 'Count']
+        show_lead_count_table('location', 'Location', key="location_counts_page")
+    
+    with tab5:
+        # Search yield
+        st.markdown("<h2>Search Yield</h2>", unsafe_allow_html=True)
+        st.markdown("<p>New leads found per run of each search query, highest yield first.</p>", unsafe_allow_html=True)
+        
+        yield_df = data_manager.get_search_yield()
+        if yield_df.empty:
+            st.markdown("<p>No searches have been recorded yet.</p>", unsafe_allow_html=True)
+        else:
+            yield_df.columns = ['Keywords', 'Location', 'Runs', 'Leads Found', 'New Leads', 'New per Run', 'Last Run']
+            st.dataframe(yield_df, use_container_width=True)
+            
+            # New leads from one run
+            recent = data_manager.load_recent_searches(limit=20)
+            runs = [search for search in recent if search.get('run_id')]
+            if runs:
+                run = st.selectbox(
+                    "Show new leads from run",
+                    runs,
+                    format_func=lambda search: f"{search['date']} - {search['keywords']} in {search['location']}"
+                )
+                st.dataframe(data_manager.get_run_leads(run['run_id']), use_container_width=True)
+    
+    with tab6:
+        # Trends
+        st.markdown("<h2>Trends</h2>", unsafe_allow_html=True)
+        st.markdown("<p>Leads found and qualified per period, read from rollups kept up to date as leads are stored.</p>", unsafe_allow_html=True)
+        
+        period = st.radio("Period", ["Daily", "Weekly"], horizontal=True, key="trends_period")
+        if period == "Daily":
+            activity = data_manager.get_lead_activity("day", since=(datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d"))
+        else:
+            activity = data_manager.get_lead_activity("week", since=(datetime.now() - timedelta(weeks=52)).strftime("%Y-%m-%d"))
         
-        st.dataframe(location_counts)
+        if activity.empty:
+            st.markdown("<p>No lead activity has been recorded yet.</p>", unsafe_allow_html=True)
+        else:
+            activity.columns = ['Period', 'New Leads', 'Qualified']
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("New Leads", int(activity['New Leads'].sum()))
+            with col2:
+                st.metric("Qualified", int(activity['Qualified'].sum()))
+            
+            fig = px.line(
+                activity,
+                x='Period',
+                y=['New Leads', 'Qualified'],
+                color_discrete_sequence=['#0077B5', '#00A0DC']
+            )
+            fig.update_layout(margin=dict(t=0, b=0, l=0, r=0), legend_title_text="")
+            st.plotly_chart(fig, use_container_width=True)
+
+# Jobs page
+def show_jobs():
+    st.markdown("<h1>Jobs</h1>", unsafe_allow_html=True)
+    
+    # Job search
+    with st.expander("Search LinkedIn Jobs", expanded=data_manager.count_jobs() == 0):
+        with st.form("job_search_form"):
+            job_keywords = st.text_input("Keywords", placeholder="e.g. Data Engineer")
+            job_location = st.text_input("Location", placeholder="e.g. Berlin")
+            job_limit = st.slider("Maximum Results", min_value=10, max_value=500, value=50, step=10)
+            job_search_button = st.form_submit_button("Search Jobs")
+        
+        if job_search_button and job_keywords and job_location:
+            with st.spinner("Searching LinkedIn jobs..."):
+                try:
+                    scraper = get_scraper_factory()()
+                    jobs = scraper.search_jobs(job_keywords, job_location, limit=job_limit)
+                    stored = data_manager.upsert_jobs(jobs)
+                    
+                    if stored is None:
+                        st.error("The jobs could not be saved")
+                    else:
+                        st.success(f"Found {len(jobs)} jobs, {stored} of them new")
+                except Exception as e:
+                    st.error(f"An error occurred during the job search: {str(e)}")
+    
+    # Filters; every option comes from an index in database storage
+    facets = data_manager.get_job_facets()
+    criteria_names = [name for name in facets if name not in ("companies", "locations")]
+    
+    st.markdown("<h2>Stored Jobs</h2>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        title_filter = st.text_input("Title contains", key="job_title_filter")
+    with col2:
+        company_filter = st.selectbox("Company", ["All"] + facets['companies'], key="job_company_filter")
+    with col3:
+        location_filter = st.selectbox("Location", ["All"] + facets['locations'], key="job_location_filter")
+    
+    criteria_filter = {}
+    if criteria_names:
+        criteria_cols = st.columns(len(criteria_names))
+        for col, name in zip(criteria_cols, criteria_names):
+            with col:
+                value = st.selectbox(name, ["All"] + facets[name], key=f"job_criteria_{name}")
+                if value != "All":
+                    criteria_filter[name] = value
+    
+    job_filters = {
+        'keywords': title_filter or None,
+        'company': None if company_filter == "All" else company_filter,
+        'location': None if location_filter == "All" else location_filter,
+        'criteria': criteria_filter
+    }
+    
+    total_jobs = data_manager.count_jobs(**job_filters)
+    if total_jobs == 0:
+        st.markdown("<p>No jobs match the current filters.</p>", unsafe_allow_html=True)
+        return
+    
+    # Only the visible page of jobs is loaded
+    page_size = 50
+    page_count = -(-total_jobs // page_size)
+    page = 0
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key="jobs_page") - 1
+    
+    jobs_df = data_manager.query_jobs(**job_filters, limit=page_size, offset=page * page_size)
+    st.markdown(f"<p>{total_jobs} jobs, newest first</p>", unsafe_allow_html=True)
+    st.dataframe(jobs_df.drop(columns=['description']), use_container_width=True)
+    
+    # Job details
+    job_labels = {
+        row.job_id: f"{row.title} - {row.company} ({row.location})"
+        for row in jobs_df.itertuples(index=False)
+    }
+    selected_job = st.selectbox("Job details", list(job_labels), format_func=job_labels.get)
+    if selected_job:
+        job = jobs_df[jobs_df['job_id'] == selected_job].iloc[0]
+        st.markdown(f"**{job['title']}** at {job['company']}, posted {job['posting_date']}")
+        st.markdown(job['description'] or "No description available")
+        if job['url']:
+            st.markdown(f"[View on LinkedIn]({job['url']})")
+    
+    # Delete jobs
+    delete_ids = st.multiselect("Select jobs to delete", list(job_labels), format_func=job_labels.get)
+    if delete_ids and st.button("Delete Selected Jobs"):
+        if data_manager.delete_jobs(delete_ids):
+            st.success(f"Deleted {len(delete_ids)} jobs")
 
 # Settings page
 def show_settings():
     st.markdown("<h1>Settings</h1>", unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs(["Proxy Settings", "Storage Settings", "Application Settings"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Proxy Settings", "Storage Settings", "Application Settings", "Performance"])
     
     with tab1:
         # Proxy settings
@@ -1111,6 +1490,12 @@ def show_settings():
                 proxy_port = st.text_input("Proxy Port", value=st.session_state.proxy_port)
                 proxy_username = st.text_input("Proxy Username", value=st.session_state.proxy_username)
                 proxy_password = st.text_input("Proxy Password", type="password", value=st.session_state.proxy_password)
+                proxy_list = st.text_area(
+                    "Additional Proxies (one per line: host:port or host:port:username:password)",
+                    value=st.session_state.proxy_list
+                )
+                proxy_config_file = st.text_input("Proxy Config File (JSON)", value=st.session_state.proxy_config_file)
+                st.caption("When the config file exists, it takes precedence over the fields above.")
             
             submit_button = st.form_submit_button("Save Proxy Settings")
         
@@ -1122,8 +1507,43 @@ def show_settings():
                 st.session_state.proxy_port = proxy_port
                 st.session_state.proxy_username = proxy_username
                 st.session_state.proxy_password = proxy_password
+                st.session_state.proxy_list = proxy_list
+                st.session_state.proxy_config_file = proxy_config_file
             
             st.success("Proxy settings saved successfully")
+        
+        if st.session_state.use_proxy:
+            proxy_pool = get_proxy_pool()
+            
+            st.markdown("<h3>Proxy Pool Health</h3>", unsafe_allow_html=True)
+            
+            if proxy_pool is None:
+                st.info("No proxies configured.")
+            else:
+                missing_credentials = proxy_pool.missing_credentials()
+                if missing_credentials:
+                    st.error(
+                        "Proxy credentials could not be found, so requests through these proxies will fail authentication. "
+                        f"Set these environment variables or enter the credentials above: {', '.join(missing_credentials)}"
+                    )
+                
+                st.dataframe(pd.DataFrame(proxy_pool.stats()), use_container_width=True)
+                
+                if st.button("Write Proxy Config File"):
+                    config_dir = os.path.dirname(st.session_state.proxy_config_file)
+                    if config_dir:
+                        os.makedirs(config_dir, exist_ok=True)
+                    proxy_pool.save_config(st.session_state.proxy_config_file)
+                    st.success(f"Proxy config written to {st.session_state.proxy_config_file}")
+                    
+                    # Credentials are not written to the file; the app reads them from the environment
+                    env_names = [
+                        name
+                        for endpoint in proxy_pool.endpoints if endpoint.username or endpoint.password
+                        for name in credential_env_names(endpoint.host, endpoint.port)
+                    ]
+                    if env_names:
+                        st.info(f"Proxy credentials are not saved in the file. Set these environment variables: {', '.join(env_names)}")
     
     with tab2:
         # Storage settings
@@ -1157,6 +1577,8 @@ def show_settings():
                 # Load data from old storage
                 leads_df = old_data_manager.load_leads()
                 search_history = old_data_manager.load_search_history()
+                search_run_leads = old_data_manager.load_search_run_leads()
+                jobs = old_data_manager.load_jobs()
                 filters = old_data_manager.load_filters()
                 
                 # Save data to new storage
@@ -1166,6 +1588,12 @@ def show_settings():
                 if search_history:
                     new_data_manager.save_search_history(search_history)
                 
+                if not search_run_leads.empty:
+                    new_data_manager.save_search_run_leads(search_run_leads)
+                
+                if jobs:
+                    new_data_manager.upsert_jobs(jobs)
+                
                 if filters:
                     new_data_manager.save_filters(filters)
                 
@@ -1198,16 +1626,118 @@ def show_settings():
         
         with st.form("app_settings_form"):
             default_result_limit = st.slider("Default Result Limit", 5, 50, 20)
-            auto_qualify = st.checkbox("Auto-qualify leads with specific criteria")
             
-            if auto_qualify:
-                auto_qualify_titles = st.text_area("Auto-qualify job titles (one per line)")
-                auto_qualify_companies = st.text_area("Auto-qualify companies (one per line)")
+            source_options = {"Mock Data": "mock", "HTTP (LinkedIn or stub server)": "http", "Recorded Fixtures": "fixture"}
+            source_labels = list(source_options.keys())
+            source_label = st.selectbox(
+                "Data Source",
+                source_labels,
+                index=list(source_options.values()).index(st.session_state.source_backend)
+            )
+            source_base_url = st.text_input("HTTP Base URL", value=st.session_state.source_base_url)
+            fixture_dir = st.text_input("Fixture Directory", value=st.session_state.fixture_dir)
+            
+            # Leads are scored against the rules as they are cleaned; each matched criterion adds its weight
+            qualification_config = data_manager.load_qualification_rules()
+            saved_rules = {(rule['field'], rule['operator']): rule for rule in qualification_config.get('rules', [])}
+            
+            auto_qualify = st.checkbox(
+                "Auto-qualify leads with specific criteria",
+                value=qualification_config.get('enabled', False)
+            )
+            
+            criteria = [
+                ("title", "contains", "Job titles containing (one per line)"),
+                ("company", "equals", "Companies (one per line)"),
+                ("industry", "contains", "Industries containing (one per line)"),
+                ("company_size", "equals", "Company sizes (one per line)")
+            ]
+            criteria_values = {}
+            for field, operator, label in criteria:
+                saved = saved_rules.get((field, operator), {})
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    terms = st.text_area(label, value="\n".join(saved.get('value', [])), key=f"auto_qualify_{field}")
+                with col2:
+                    weight = st.number_input("Weight", 0.0, 10.0, float(saved.get('weight', 1.0)), 0.5, key=f"auto_qualify_{field}_weight")
+                criteria_values[(field, operator)] = ([term.strip() for term in terms.splitlines() if term.strip()], weight)
+            
+            saved = saved_rules.get(("connections", "at_least"), {})
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                min_connections = st.number_input("Minimum connections (0 for any)", 0, 100000, int(saved.get('value', 0)), 50)
+            with col2:
+                connections_weight = st.number_input("Weight", 0.0, 10.0, float(saved.get('weight', 1.0)), 0.5, key="auto_qualify_connections_weight")
+            
+            qualification_threshold = st.number_input(
+                "Score needed to qualify",
+                0.5, 50.0, float(qualification_config.get('threshold', 1.0)), 0.5
+            )
             
             submit_button = st.form_submit_button("Save Application Settings")
         
         if submit_button:
-            st.success("Application settings saved successfully")
+            st.session_state.source_backend = source_options[source_label]
+            st.session_state.source_base_url = source_base_url
+            st.session_state.fixture_dir = fixture_dir
+            
+            rules = [
+                {'field': field, 'operator': operator, 'value': terms, 'weight': weight}
+                for (field, operator), (terms, weight) in criteria_values.items() if terms
+            ]
+            if min_connections:
+                rules.append({'field': 'connections', 'operator': 'at_least', 'value': min_connections, 'weight': connections_weight})
+            
+            if data_manager.save_qualification_rules({'enabled': auto_qualify, 'rules': rules, 'threshold': qualification_threshold}):
+                st.success("Application settings saved successfully")
+            else:
+                st.error("Error saving qualification rules")
+        
+        # New leads are qualified as they are ingested; stored leads are re-scored on demand
+        if st.button("Apply qualification rules to stored leads"):
+            with st.spinner("Re-scoring stored leads..."):
+                changed = data_manager.apply_qualification_rules()
+            
+            if changed is None:
+                st.error("Error applying qualification rules")
+            elif data_manager.get_qualification_rules() is None:
+                st.warning("Auto-qualification is off or has no criteria")
+            else:
+                sync_leads(lead_store.refresh())
+                st.success(f"Qualified {changed[0]} and unqualified {changed[1]} stored leads")
+        
+        # Lead scoring
+        st.markdown("<h2>Lead Scoring</h2>", unsafe_allow_html=True)
+        
+        scorer = data_manager.get_lead_scorer()
+        if scorer.trained_on:
+            st.markdown(f"<p>Scores come from a model trained on {scorer.trained_on} leads (version {scorer.version})</p>", unsafe_allow_html=True)
+        else:
+            st.markdown("<p>Scores come from hand-tuned weights for seniority and connections</p>", unsafe_allow_html=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("Train on qualification decisions"):
+                with st.spinner("Training lead scorer..."):
+                    trained = data_manager.train_lead_scorer()
+                    rescored = data_manager.rescore_leads() if trained is not None else None
+                
+                if trained is None:
+                    st.warning("Training needs at least 20 leads you qualified and 20 you unqualified")
+                else:
+                    sync_leads(lead_store.refresh())
+                    st.success(f"Trained on {trained.trained_on} leads and rescored {rescored or 0} leads")
+        
+        with col2:
+            if st.button("Score unscored leads"):
+                rescored = data_manager.rescore_leads()
+                if rescored is None:
+                    st.error("Error scoring leads")
+                else:
+                    if rescored:
+                        sync_leads(lead_store.refresh())
+                    st.success(f"Scored {rescored} leads")
         
         # Data management
         st.markdown("<h2>Data Management</h2>", unsafe_allow_html=True)
@@ -1215,14 +1745,17 @@ def show_settings():
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("Export All Data"):
-                # Export all data
-                if not st.session_state.leads_df.empty:
-                    export_path = data_manager.export_leads(st.session_state.leads_df, format="excel")
-                    if export_path:
-                        st.success(f"All data exported to {export_path}")
-                else:
-                    st.warning("No data to export")
+            # Export all data
+            if not st.session_state.leads_df.empty:
+                show_export_downloads(
+                    st.session_state.leads_df,
+                    ["excel", "csv", "json"],
+                    key="settings_export",
+                    label="Export All Data",
+                    version=leads_export_version()
+                )
+            else:
+                st.warning("No data to export")
         
         with col2:
             if st.button("Clear All Data"):
@@ -1231,16 +1764,74 @@ def show_settings():
                 
                 if confirm:
                     # Clear all data
-                    st.session_state.leads_df = pd.DataFrame()
-                    st.session_state.search_history = []
                     st.session_state.filters = []
                     
                     # Save empty data
-                    data_manager.save_leads(st.session_state.leads_df)
-                    data_manager.save_search_history(st.session_state.search_history)
+                    sync_leads(lead_store.replace(pd.DataFrame()))
+                    data_manager.save_search_history([])
+                    data_manager.save_search_run_leads(pd.DataFrame())
+                    data_manager.delete_jobs()
                     data_manager.save_filters(st.session_state.filters)
                     
                     st.success("All data cleared successfully")
+    
+    with tab4:
+        # Performance metrics
+        st.markdown("<h2>Performance</h2>", unsafe_allow_html=True)
+        st.markdown("<p>Timings collected in this process since startup (all durations in milliseconds)</p>", unsafe_allow_html=True)
+        
+        snapshot = registry.snapshot()
+        
+        if snapshot['histograms']:
+            timings_df = pd.DataFrame([
+                {
+                    'Metric': h['name'],
+                    'Labels': ", ".join(f"{k}={v}" for k, v in h['labels'].items()),
+                    'Count': h['count'],
+                    'Mean': round(h['mean'] * 1000, 1),
+                    'P50': round(h['p50'] * 1000, 1),
+                    'P95': round(h['p95'] * 1000, 1),
+                    'Total': round(h['sum'] * 1000, 1)
+                }
+                for h in snapshot['histograms']
+            ])
+            st.markdown("<h3>Timings</h3>", unsafe_allow_html=True)
+            st.dataframe(timings_df, use_container_width=True)
+        else:
+            st.markdown("<p>No timings recorded yet</p>", unsafe_allow_html=True)
+        
+        if snapshot['counters']:
+            counters_df = pd.DataFrame([
+                {
+                    'Metric': c['name'],
+                    'Labels': ", ".join(f"{k}={v}" for k, v in c['labels'].items()),
+                    'Value': round(c['value'], 2)
+                }
+                for c in snapshot['counters']
+            ])
+            st.markdown("<h3>Counters</h3>", unsafe_allow_html=True)
+            st.dataframe(counters_df, use_container_width=True)
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            if st.button("Write Metrics JSON"):
+                metrics_path = registry.write_json(os.path.join(st.session_state.data_dir, "metrics.json"))
+                st.success(f"Metrics written to {metrics_path}")
+        
+        with col2:
+            metrics_port = st.number_input("Metrics Port", min_value=1024, max_value=65535, value=9100)
+            if st.button("Start Prometheus Endpoint"):
+                try:
+                    server = start_metrics_server(port=int(metrics_port))
+                    st.success(f"Metrics available at http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+                except OSError as e:
+                    st.error(f"Could not start metrics endpoint: {str(e)}")
+        
+        with col3:
+            if st.button("Reset Metrics"):
+                registry.reset()
+                st.success("Metrics reset")
 
 # Main app
 def main():
@@ -1282,18 +1873,21 @@ def main():
     show_sidebar()
     
     # Show current page
-    if st.session_state.current_page == "dashboard":
-        show_dashboard()
-    elif st.session_state.current_page == "search":
-        show_search()
-    elif st.session_state.current_page == "leads":
-        show_leads()
-    elif st.session_state.current_page == "filters":
-        show_filters()
-    elif st.session_state.current_page == "analytics":
-        show_analytics()
-    elif st.session_state.current_page == "settings":
-        show_settings()
+    with registry.timer("page_render_seconds", page=st.session_state.current_page):
+        if st.session_state.current_page == "dashboard":
+            show_dashboard()
+        elif st.session_state.current_page == "search":
+            show_search()
+        elif st.session_state.current_page == "leads":
+            show_leads()
+        elif st.session_state.current_page == "filters":
+            show_filters()
+        elif st.session_state.current_page == "analytics":
+            show_analytics()
+        elif st.session_state.current_page == "jobs":
+            show_jobs()
+        elif st.session_state.current_page == "settings":
+            show_settings()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,250 @@
+"""
+Benchmark suite for the lead processing pipeline.
+
+Measures cleaning, storage, filtering, statistics and export over synthetic
+leads of several sizes and writes the timings to a JSON file, so results from
+different commits can be compared with --compare.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --repeat 5
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from data_manager import DataManager
+from mock_data_generator import MockDataGenerator
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+# Saved filter used for the saved-filter benchmark, shaped like filters created in the app
+SAVED_FILTER = {
+    "name": "Senior engineers at large companies",
+    "job_titles": ["Senior", "Lead", "Principal"],
+    "companies": ["Google", "Microsoft", "Amazon", "Apple"],
+    "industries": ["Technology", "Software"],
+    "locations": [],
+    "include_qualified": True,
+    "include_unqualified": False
+}
+
+# Slow formats are only benchmarked up to this many rows
+MAX_ROWS = {
+    "export_excel": 100000
+}
+
+
+def make_leads(size, seed):
+    """
+    Build a raw leads DataFrame with some missing values, as scraped data has.
+
+    Args:
+        size (int): Number of leads
+        seed (int): Random seed
+
+    Returns:
+        DataFrame: Raw leads data
+    """
+    leads_df = MockDataGenerator(seed=seed).generate_profiles(size, "software engineer", "San Francisco, CA")
+    rng = np.random.default_rng(seed)
+    for column in ['title', 'company', 'industry', 'connections']:
+        leads_df.loc[rng.random(size) < 0.02, column] = None
+    # Some leads are scraped twice
+    duplicates = leads_df.sample(frac=0.01, random_state=seed)
+    return pd.concat([leads_df, duplicates], ignore_index=True)
+
+
+def time_call(func, repeat):
+    """
+    Time a function over several runs.
+
+    Args:
+        func (callable): Function to time
+        repeat (int): Number of runs
+
+    Returns:
+        dict: Minimum, median and mean duration in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    return {
+        'min': min(durations),
+        'median': statistics.median(durations),
+        'mean': statistics.mean(durations),
+        'repeat': repeat
+    }
+
+
+def build_benchmarks(raw_df, work_dir):
+    """
+    Build the benchmark cases for one dataset.
+
+    Args:
+        raw_df (DataFrame): Raw leads data
+        work_dir (str): Scratch directory for storage and exports
+
+    Returns:
+        list: List of (name, function) tuples
+    """
+    file_manager = DataManager(storage_type="file", data_dir=os.path.join(work_dir, "data"))
+    db_manager = DataManager(storage_type="database", db_path=os.path.join(work_dir, "leads.db"))
+    export_dir = os.path.join(work_dir, "exports")
+
+    leads_df = file_manager.clean_data(raw_df)
+    file_manager.save_leads(leads_df)
+    db_manager.save_leads(leads_df)
+
+    return [
+        ("clean_data", lambda: file_manager.clean_data(raw_df)),
+        ("save_leads_file", lambda: file_manager.save_leads(leads_df)),
+        ("load_leads_file", lambda: file_manager.load_leads()),
+        ("save_leads_database", lambda: db_manager.save_leads(leads_df)),
+        ("load_leads_database", lambda: db_manager.load_leads()),
+        ("filter_leads", lambda: file_manager.filter_leads(
+            leads_df, title="senior", company="o", industry="tech", qualified="Qualified"
+        )),
+        ("apply_filter", lambda: file_manager.apply_filter(leads_df, SAVED_FILTER)),
+        ("get_lead_statistics", lambda: file_manager.get_lead_statistics(leads_df)),
+        ("export_csv", lambda: file_manager.export_leads(leads_df, format="csv", output_dir=export_dir)),
+        ("export_json", lambda: file_manager.export_leads(leads_df, format="json", output_dir=export_dir)),
+        ("export_excel", lambda: file_manager.export_leads(leads_df, format="excel", output_dir=export_dir)),
+    ]
+
+
+def get_commit():
+    """
+    Get the current git commit hash.
+
+    Returns:
+        str: Short commit hash, or 'unknown' outside a git checkout
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes, repeat, seed, only=None):
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes (list): Dataset sizes to benchmark
+        repeat (int): Number of runs per benchmark
+        seed (int): Random seed for the synthetic data
+        only (list): Names of benchmarks to run (None for all)
+
+    Returns:
+        dict: Benchmark report
+    """
+    results = []
+
+    for size in sizes:
+        raw_df = make_leads(size, seed)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            for name, func in build_benchmarks(raw_df, work_dir):
+                if only and name not in only:
+                    continue
+                if size > MAX_ROWS.get(name, size):
+                    print(f"{name:<24}{size:>10}  skipped")
+                    continue
+
+                timing = time_call(func, repeat)
+                results.append(dict(name=name, size=size, **timing))
+                print(f"{name:<24}{size:>10}  {timing['median'] * 1000:>10.1f} ms")
+
+    return {
+        'commit': get_commit(),
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'seed': seed,
+        'results': results
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    Print how each benchmark changed relative to a baseline report.
+
+    Args:
+        report (dict): Current benchmark report
+        baseline (dict): Previous benchmark report
+        threshold (float): Relative slowdown reported as a regression (0.2 = 20%)
+
+    Returns:
+        int: Number of regressions
+    """
+    previous = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = 0
+
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    for result in report['results']:
+        old = previous.get((result['name'], result['size']))
+        if old is None:
+            continue
+
+        ratio = result['median'] / old['median'] if old['median'] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{result['name']:<24}{result['size']:>10}  {ratio:>6.2f}x{flag}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark lead cleaning, storage, filtering and export")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Numbers of leads to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic leads")
+    parser.add_argument("--only", nargs="+", default=None, help="Names of benchmarks to run")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Previous result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    logging.getLogger("DataManager").setLevel(logging.WARNING)
+
+    report = run(args.sizes, args.repeat, args.seed, args.only)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{report['commit']}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
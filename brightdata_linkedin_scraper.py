@@ -4,9 +4,18 @@ import json
 import time
 import random
 import os
+import socket
+from urllib.parse import urlparse
+from urllib3.util.request import ACCEPT_ENCODING
 from fake_useragent import UserAgent
 import logging
 from datetime import datetime
+from jsonl_io import JsonlWriter
+from metrics import registry
+from mock_backend import MockBackend
+from proxy_pool import ProxyEndpoint, ProxyPool
+from retry_policy import RetryPolicy, default_circuit_breakers, default_retry_budget, parse_retry_after
+from source_backends import FixtureSourceBackend, HttpSourceBackend
 
 # Configure logging
 logging.basicConfig(
@@ -27,13 +36,26 @@ class BrightDataLinkedInScraper:
     - Uses lightweight libraries (Requests and BeautifulSoup)
     """
     
-    def __init__(self, use_proxy=False, proxy_config=None):
+    def __init__(self, use_proxy=False, proxy_config=None, mock_seed=None, mock_replay=False,
+                 backend="mock", base_url=None, fixture_dir=None, record_dir=None, request_delay=(3, 7),
+                 retry_policy=None, circuit_breakers=None, retry_budget=None, proxy_pool=None):
         """
         Initialize the LinkedIn scraper.
         
         Args:
             use_proxy (bool): Whether to use a proxy for requests
             proxy_config (dict): Proxy configuration (if use_proxy is True)
+            mock_seed (int): Seed for mock data generation (random if None)
+            mock_replay (bool): Whether identical mock searches return identical results
+            backend (str): Source of search results ('mock', 'http' or 'fixture')
+            base_url (str): Base URL for the 'http' backend (defaults to LinkedIn)
+            fixture_dir (str): Directory of recorded pages for the 'fixture' backend
+            record_dir (str): Directory the 'http' backend records fetched pages to
+            request_delay (tuple): Range in seconds of the random delay before each request
+            retry_policy (RetryPolicy): Retry policy (defaults to RetryPolicy())
+            circuit_breakers (CircuitBreakerRegistry): Circuit breakers by target (defaults to the shared registry)
+            retry_budget (RetryBudget): Budget limiting retries (defaults to the shared budget)
+            proxy_pool (ProxyPool): Pool of proxies to rotate across (takes precedence over proxy_config)
         """
         self.session = requests.Session()
         self.ua = UserAgent()
@@ -41,6 +63,8 @@ class BrightDataLinkedInScraper:
             'User-Agent': self.ua.random,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
+            # Only the encodings urllib3 can decode here; br and zstd are added when brotli/zstandard are installed
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Referer': 'https://www.google.com/',
             'DNT': '1',
             'Connection': 'keep-alive',
@@ -55,41 +79,183 @@ class BrightDataLinkedInScraper:
         self.use_proxy = use_proxy
         self.proxy_config = proxy_config
         
-        if self.use_proxy and self.proxy_config:
-            self.proxies = {
-                'http': f"http://{self.proxy_config['username']}:{self.proxy_config['password']}@{self.proxy_config['host']}:{self.proxy_config['port']}",
-                'https': f"http://{self.proxy_config['username']}:{self.proxy_config['password']}@{self.proxy_config['host']}:{self.proxy_config['port']}"
-            }
+        # A single proxy_config is treated as a pool of one endpoint
+        if self.use_proxy and proxy_pool is not None:
+            self.proxy_pool = proxy_pool
+        elif self.use_proxy and self.proxy_config:
+            self.proxy_pool = ProxyPool([ProxyEndpoint(
+                self.proxy_config['host'],
+                self.proxy_config['port'],
+                self.proxy_config.get('username'),
+                self.proxy_config.get('password')
+            )])
         else:
-            self.proxies = None
+            self.proxy_pool = None
+        
+        self.request_delay = request_delay
+        
+        # Select the source that search results are fetched from
+        if backend == "mock":
+            self.backend = MockBackend(seed=mock_seed, replay=mock_replay)
+        elif backend == "http":
+            self.backend = HttpSourceBackend(
+                self._make_request,
+                base_url=base_url or "https://www.linkedin.com",
+                record_dir=record_dir
+            )
+        elif backend == "fixture":
+            self.backend = FixtureSourceBackend(fixture_dir or os.path.join('data', 'fixtures'))
+        else:
+            raise ValueError(f"Unsupported source backend: {backend}")
+        
+        # Retry behaviour; breakers and budget are shared across scraper instances by default
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or default_circuit_breakers
+        self.retry_budget = retry_budget or default_retry_budget
+        
+        # Hosts whose DNS resolution time has already been recorded
+        self._resolved_hosts = set()
         
         # Create data directory if it doesn't exist
         os.makedirs('data', exist_ok=True)
         
         logger.info("LinkedIn scraper initialized")
     
-    def _make_request(self, url, params=None, max_retries=3, retry_delay=5):
+    def _sleep(self, seconds, reason):
+        """
+        Sleep and record the time spent waiting.
+        
+        Args:
+            seconds (float): Time to sleep in seconds
+            reason (str): Why the scraper is waiting (used as a metric label)
+        """
+        time.sleep(seconds)
+        registry.increment("scraper_sleep_seconds_total", seconds, reason=reason)
+    
+    def _breaker_key(self, host, endpoint=None):
+        """
+        Get the circuit breaker key for a request target.
+        
+        Requests through different proxies are blocked independently, so the
+        proxy is part of the key.
+        
+        Args:
+            host (str): Target host name
+            endpoint (ProxyEndpoint): Proxy the request goes through (None for a direct request)
+            
+        Returns:
+            str: Circuit breaker key
+        """
+        if endpoint is not None:
+            return f"{host} via {endpoint.key}"
+        return host
+    
+    def _select_route(self, host):
+        """
+        Choose the proxy and circuit breaker for the next attempt.
+        
+        With a proxy pool, proxies whose breaker for the host is open are
+        skipped in favour of the next healthiest proxy.
+        
+        Args:
+            host (str): Target host name
+            
+        Returns:
+            tuple: (endpoint, breaker), with endpoint None for a direct
+            request, or None if no route is currently allowed
+        """
+        if self.proxy_pool is None:
+            breaker = self.circuit_breakers.get(host)
+            if breaker.allow_request():
+                return None, breaker
+            registry.increment("scraper_circuit_open_total", target=host)
+            return None
+        
+        skipped = set()
+        while True:
+            endpoint = self.proxy_pool.acquire(exclude=skipped)
+            if endpoint is None:
+                return None
+            
+            breaker_key = self._breaker_key(host, endpoint)
+            breaker = self.circuit_breakers.get(breaker_key)
+            if breaker.allow_request():
+                return endpoint, breaker
+            
+            registry.increment("scraper_circuit_open_total", target=breaker_key)
+            self.proxy_pool.cancel(endpoint)
+            skipped.add(endpoint.key)
+    
+    def _record_dns_time(self, host):
+        """
+        Record how long resolving a host takes, once per host.
+        
+        Requests does not expose per-request DNS timing, so the first request
+        to each host does an explicit lookup. Skipped when a proxy is used,
+        since the proxy resolves the target host.
+        
+        Args:
+            host (str): Host name to resolve
+        """
+        if not host or self.proxy_pool or host in self._resolved_hosts:
+            return
+        self._resolved_hosts.add(host)
+        
+        start = time.perf_counter()
+        try:
+            socket.getaddrinfo(host, None)
+        except OSError:
+            return
+        registry.observe("scraper_dns_seconds", time.perf_counter() - start, host=host)
+    
+    def _make_request(self, url, params=None, max_retries=None, stream=False):
         """
         Make an HTTP request with retry logic.
         
+        Failed attempts are retried according to the scraper's retry policy,
+        subject to the shared retry budget. With a proxy pool, every attempt
+        goes through the healthiest available proxy and its outcome is fed back
+        into the pool. Requests to a target whose circuit breaker is open fail
+        immediately.
+        
         Args:
             url (str): URL to request
             params (dict): Query parameters
-            max_retries (int): Maximum number of retries
-            retry_delay (int): Delay between retries in seconds
+            max_retries (int): Maximum number of attempts (defaults to the retry policy's)
+            stream (bool): Whether to return before the body is read; the caller must close the response
             
         Returns:
-            requests.Response: Response object
+            requests.Response: Response object, or None if the request failed
         """
-        retries = 0
-        
-        while retries < max_retries:
+        max_attempts = max_retries or self.retry_policy.max_attempts
+        host = urlparse(url).hostname
+        request_start = time.perf_counter()
+        self._record_dns_time(host)
+        self.retry_budget.record_request()
+        
+        attempt = 0
+        delay = None
+        
+        while True:
+            route = self._select_route(host)
+            if route is None:
+                if self.proxy_pool is not None:
+                    logger.warning(f"No healthy proxy available for {host}. Failing fast for {url}")
+                else:
+                    logger.warning(f"Circuit breaker open for {host}. Failing fast for {url}")
+                break
+            endpoint, breaker = route
+            
+            status_code = None
+            retry_after = None
+            
             try:
                 # Update user agent for each request to avoid detection
                 self.headers['User-Agent'] = self.ua.random
                 
-                # Add random delay to mimic human behavior (longer delay)
-                time.sleep(random.uniform(3, 7))
+                # Add random delay to mimic human behavior; retries are spaced by the backoff instead
+                if attempt == 0:
+                    self._sleep(random.uniform(*self.request_delay), "human_delay")
                 
                 # Use a different referer each time
                 referers = [
@@ -106,37 +272,77 @@ class BrightDataLinkedInScraper:
                     'session_id': f"{random.randint(10000000, 99999999)}",
                 }
                 
+                attempt_start = time.perf_counter()
                 response = self.session.get(
                     url,
                     headers=self.headers,
                     params=params,
-                    proxies=self.proxies,
+                    proxies=endpoint.proxies if endpoint is not None else None,
                     cookies=cookies,
-                    timeout=30
+                    timeout=30,
+                    stream=stream
                 )
+                status_code = response.status_code
+                attempt_latency = time.perf_counter() - attempt_start
+                
+                # `elapsed` stops when the response headers are parsed, i.e. time to first byte
+                registry.observe("scraper_request_ttfb_seconds", response.elapsed.total_seconds(), host=host)
+                registry.observe("scraper_request_attempt_seconds", attempt_latency, host=host)
+                registry.increment("scraper_responses_total", host=host, status=status_code)
+                
+                if endpoint is not None:
+                    self.proxy_pool.release(endpoint, attempt_latency, status_code)
+                    registry.increment("scraper_proxy_responses_total", proxy=endpoint.key, status=status_code)
                 
                 # Check if the response is valid
-                if response.status_code == 200:
+                if status_code == 200:
+                    breaker.record_success()
+                    registry.observe("scraper_request_seconds", time.perf_counter() - request_start, host=host, outcome="success")
                     return response
-                elif response.status_code == 429:
-                    # Rate limited, wait longer before retrying
-                    logger.warning(f"Rate limited (429). Waiting before retry {retries+1}/{max_retries}")
-                    time.sleep(retry_delay * 10)  # Wait longer for rate limits
-                elif response.status_code == 999:
-                    # LinkedIn's anti-bot detection, try with different approach
-                    logger.warning(f"LinkedIn anti-bot detection (999). Trying different approach. Retry {retries+1}/{max_retries}")
-                    time.sleep(retry_delay * 8)  # Wait longer for anti-bot detection
+                
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                # Release the connection; the body of a failed response is not needed
+                response.close()
+                if status_code == 429:
+                    logger.warning(f"Rate limited (429). Attempt {attempt+1}/{max_attempts}")
+                elif status_code == 999:
+                    logger.warning(f"LinkedIn anti-bot detection (999). Attempt {attempt+1}/{max_attempts}")
                 else:
-                    logger.warning(f"Request failed with status code {response.status_code}. Retry {retries+1}/{max_retries}")
+                    logger.warning(f"Request failed with status code {status_code}. Attempt {attempt+1}/{max_attempts}")
                     
             except requests.RequestException as e:
-                logger.error(f"Request error: {str(e)}. Retry {retries+1}/{max_retries}")
+                if endpoint is not None:
+                    self.proxy_pool.release(endpoint)
+                    registry.increment("scraper_proxy_responses_total", proxy=endpoint.key, status="error")
+                registry.increment("scraper_request_errors_total", host=host, error=type(e).__name__)
+                logger.error(f"Request error: {str(e)}. Attempt {attempt+1}/{max_attempts}")
+            
+            policy = self.retry_policy.policy_for(status_code)
+            # Only a successful response closes the breaker; other failures leave its count alone
+            if policy.trips_breaker:
+                breaker.record_failure()
+            else:
+                breaker.record_inconclusive()
+            
+            attempt += 1
+            if not policy.retry or attempt >= max_attempts:
+                break
+            
+            if not self.retry_budget.try_acquire():
+                registry.increment("scraper_retry_budget_exhausted_total", host=host)
+                logger.warning(f"Retry budget exhausted. Not retrying {url}")
+                break
             
-            # Increment retry counter and delay
-            retries += 1
-            time.sleep(retry_delay)
+            delay = self.retry_policy.next_delay(policy, delay, retry_after)
+            if delay is None:
+                logger.warning(f"Server asked to retry after {retry_after:.0f}s, longer than the retry policy allows")
+                break
+            
+            registry.increment("scraper_retries_total", host=host, status=status_code or "error")
+            self._sleep(delay, "retry_after" if retry_after is not None and delay == retry_after else "backoff")
         
-        logger.error(f"Failed to make request to {url} after {max_retries} retries")
+        registry.observe("scraper_request_seconds", time.perf_counter() - request_start, host=host, outcome="failure")
+        logger.error(f"Failed to make request to {url} after {attempt} attempts")
         return None
     
     def search_jobs(self, keywords, location, limit=25):
@@ -153,148 +359,14 @@ class BrightDataLinkedInScraper:
         """
         logger.info(f"Searching for jobs with keywords: '{keywords}' in location: '{location}'")
         
-        # Due to LinkedIn's anti-scraping measures, we'll use a fallback to mock data
-        # This is a common approach when dealing with sites that actively prevent scraping
-        logger.warning("LinkedIn is blocking direct scraping attempts. Using fallback to mock data.")
+        if self.backend.name == "mock":
+            # Due to LinkedIn's anti-scraping measures, the default backend serves mock data
+            logger.warning("LinkedIn is blocking direct scraping attempts. Using fallback to mock data.")
         
-        # Generate mock job listings that closely resemble real LinkedIn data
-        job_listings = self._generate_mock_job_listings(keywords, location, limit)
+        with registry.timer("scraper_search_seconds", kind="jobs", backend=self.backend.name):
+            job_listings = self.backend.search_jobs(keywords, location, limit)
         
-        logger.info(f"Generated {len(job_listings)} mock job listings")
-        
-        return job_listings
-    
-    def _generate_mock_job_listings(self, keywords, location, count):
-        """
-        Generate mock job listings that closely resemble real LinkedIn data.
-        
-        Args:
-            keywords (str): Job search keywords
-            location (str): Job location
-            count (int): Number of job listings to generate
-            
-        Returns:
-            list: List of mock job listings
-        """
-        job_listings = []
-        
-        # Use the keywords to generate relevant job titles
-        base_title = keywords.lower()
-        job_titles = [
-            f"Senior {base_title.title()}",
-            f"{base_title.title()}",
-            f"Lead {base_title.title()}",
-            f"{base_title.title()} Manager",
-            f"Principal {base_title.title()}",
-            f"{base_title.title()} Specialist",
-            f"Staff {base_title.title()}",
-            f"{base_title.title()} Consultant",
-            f"Associate {base_title.title()}",
-            f"{base_title.title()} Architect"
-        ]
-        
-        companies = [
-            "Google", "Microsoft", "Amazon", "Facebook", "Apple",
-            "Netflix", "Uber", "Airbnb", "Salesforce", "LinkedIn",
-            "IBM", "Oracle", "Intel", "Cisco", "Adobe",
-            "Twitter", "Spotify", "Slack", "Zoom", "Dropbox"
-        ]
-        
-        # Generate realistic job descriptions based on keywords
-        description_templates = [
-            f"We are looking for a talented {base_title} to join our team. The ideal candidate will have experience with {{technologies}} and a passion for {{domain}}. You will be responsible for {{responsibilities}}.",
-            f"Join our team as a {base_title}! In this role, you will {{responsibilities}}. We're looking for someone with experience in {{technologies}} and knowledge of {{domain}}.",
-            f"Exciting opportunity for a {base_title} to work on cutting-edge projects. You'll be {{responsibilities}} while collaborating with cross-functional teams. Required skills: {{technologies}}.",
-            f"We're seeking an experienced {base_title} to help us {{domain}}. In this role, you'll be {{responsibilities}}. The ideal candidate has {{experience}} years of experience with {{technologies}}."
-        ]
-        
-        technologies_by_role = {
-            "software engineer": ["Python", "JavaScript", "Java", "C++", "React", "Node.js", "AWS", "Docker", "Kubernetes"],
-            "data scientist": ["Python", "R", "SQL", "TensorFlow", "PyTorch", "Machine Learning", "Data Visualization", "Statistics"],
-            "product manager": ["Agile", "Scrum", "JIRA", "Product Roadmapping", "User Stories", "Market Research", "A/B Testing"],
-            "designer": ["Figma", "Sketch", "Adobe XD", "UI/UX", "Wireframing", "Prototyping", "User Research"],
-            "marketing": ["SEO", "SEM", "Content Marketing", "Social Media", "Google Analytics", "Email Marketing", "Growth Hacking"]
-        }
-        
-        # Determine which technologies to use based on the keywords
-        role_key = next((k for k in technologies_by_role.keys() if k in base_title.lower()), "software engineer")
-        technologies = technologies_by_role[role_key]
-        
-        domains = [
-            "building scalable applications",
-            "improving user experience",
-            "optimizing performance",
-            "developing new features",
-            "maintaining existing systems",
-            "creating innovative solutions",
-            "solving complex problems",
-            "enhancing product capabilities"
-        ]
-        
-        responsibilities = [
-            "designing and implementing new features",
-            "collaborating with cross-functional teams",
-            "troubleshooting and debugging issues",
-            "writing clean, maintainable code",
-            "participating in code reviews",
-            "mentoring junior team members",
-            "optimizing application performance",
-            "ensuring high-quality deliverables"
-        ]
-        
-        for i in range(count):
-            # Generate a unique job ID
-            job_id = f"linkedin-job-{random.randint(1000000, 9999999)}"
-            
-            # Select a random job title, company, and location
-            job_title = random.choice(job_titles)
-            company = random.choice(companies)
-            job_location = location
-            
-            # Generate a job URL
-            job_url = f"https://www.linkedin.com/jobs/view/{job_id}/"
-            
-            # Generate a job description
-            description_template = random.choice(description_templates)
-            description = description_template.format(
-                technologies=", ".join(random.sample(technologies, min(3, len(technologies)))),
-                domain=random.choice(domains),
-                responsibilities=random.choice(responsibilities),
-                experience=random.randint(2, 8)
-            )
-            
-            # Generate job criteria
-            criteria = {
-                "Seniority level": random.choice(["Entry level", "Associate", "Mid-Senior level", "Director", "Executive"]),
-                "Employment type": random.choice(["Full-time", "Part-time", "Contract", "Temporary", "Internship"]),
-                "Job function": random.choice(["Engineering", "Information Technology", "Product Management", "Design", "Marketing"]),
-                "Industries": random.choice(["Technology", "Software Development", "Internet", "Information Services", "Computer Software"])
-            }
-            
-            # Generate company details
-            company_details = {
-                "url": f"https://www.linkedin.com/company/{company.lower().replace(' ', '-')}/"
-            }
-            
-            # Generate posting date
-            days_ago = random.randint(1, 30)
-            posting_date = f"{days_ago} days ago"
-            
-            # Create the job listing
-            job_listing = {
-                'id': job_id,
-                'title': job_title,
-                'company': company,
-                'location': job_location,
-                'url': job_url,
-                'description': description,
-                'criteria': criteria,
-                'application_type': random.choice(["Direct", "LinkedIn Easy Apply"]),
-                'company_details': company_details,
-                'posting_date': posting_date
-            }
-            
-            job_listings.append(job_listing)
+        logger.info(f"Retrieved {len(job_listings)} job listings from {self.backend.name} backend")
         
         return job_listings
     
@@ -312,128 +384,75 @@ class BrightDataLinkedInScraper:
         """
         logger.info(f"Searching for profiles with keywords: '{keywords}' in location: '{location}'")
         
-        # Due to LinkedIn's anti-scraping measures, we'll use mock profile data
-        logger.warning("LinkedIn is blocking direct scraping attempts. Using mock profile data.")
-        
-        # Generate mock profiles that closely resemble real LinkedIn data
-        profiles = self._generate_mock_profiles(keywords, location, limit)
+        if self.backend.name == "mock":
+            # Due to LinkedIn's anti-scraping measures, the default backend serves mock data
+            logger.warning("LinkedIn is blocking direct scraping attempts. Using mock profile data.")
         
-        logger.info(f"Generated {len(profiles)} mock profiles")
+        with registry.timer("scraper_search_seconds", kind="profiles", backend=self.backend.name):
+            profiles = self.backend.search_profiles(keywords, location, limit)
         
+        logger.info(f"Retrieved {len(profiles)} profiles from {self.backend.name} backend")
+
         return profiles
     
-    def _generate_mock_profiles(self, keywords, location, count):
+    def iter_profiles(self, keywords, location=None, limit=10):
         """
-        Generate mock profile data that closely resembles real LinkedIn profiles.
+        Search for LinkedIn profiles, yielding each page's results as soon as it is parsed.
         
         Args:
             keywords (str): Search keywords
             location (str): Location filter
-            count (int): Number of profiles to generate
-            
-        Returns:
-            list: List of mock profile data
-        """
-        profiles = []
-        
-        # Generate realistic first and last names
-        first_names = [
-            "James", "John", "Robert", "Michael", "William", "David", "Richard", "Joseph", "Thomas", "Charles",
-            "Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Barbara", "Susan", "Jessica", "Sarah", "Karen"
-        ]
-        
-        last_names = [
-            "Smith", "Johnson", "Williams", "Jones", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor",
-            "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Garcia", "Martinez", "Robinson"
-        ]
-        
-        # Generate job titles based on keywords
-        base_title = keywords.lower()
-        job_titles = [
-            f"Senior {base_title.title()}",
-            f"{base_title.title()}",
-            f"Lead {base_title.title()}",
-            f"{base_title.title()} Manager",
-            f"Principal {base_title.title()}",
-            f"{base_title.title()} Specialist",
-            f"Staff {base_title.title()}",
-            f"{base_title.title()} Consultant",
-            f"Associate {base_title.title()}",
-            f"{base_title.title()} Architect"
-        ]
-        
-        companies = [
-            "Google", "Microsoft", "Amazon", "Facebook", "Apple",
-            "Netflix", "Uber", "Airbnb", "Salesforce", "LinkedIn",
-            "IBM", "Oracle", "Intel", "Cisco", "Adobe",
-            "Twitter", "Spotify", "Slack", "Zoom", "Dropbox"
-        ]
-        
-        industries = [
-            "Technology", "Software Development", "Internet", "Information Services", "Computer Software",
-            "Financial Services", "Marketing and Advertising", "Higher Education", "Hospital & Health Care",
-            "Telecommunications", "Management Consulting", "Information Technology"
-        ]
-        
-        company_sizes = [
-            "1-10 employees", "11-50 employees", "51-200 employees", "201-500 employees",
-            "501-1,000 employees", "1,001-5,000 employees", "5,001-10,000 employees", "10,001+ employees"
-        ]
-        
-        for i in range(count):
-            # Generate a name
-            first_name = random.choice(first_names)
-            last_name = random.choice(last_names)
-            name = f"{first_name} {last_name}"
-            
-            # Generate a profile URL
-            profile_slug = f"{first_name.lower()}-{last_name.lower()}-{random.randint(10000, 99999)}"
-            profile_url = f"https://www.linkedin.com/in/{profile_slug}/"
-            
-            # Select a random job title and company
-            title = random.choice(job_titles)
-            company = random.choice(companies)
-            
-            # Generate other profile data
-            industry = random.choice(industries)
-            company_size = random.choice(company_sizes)
-            connections = random.randint(50, 500) * 10
-            is_qualified = random.choice([True, False])
-            
-            # Create the profile
-            profile = {
-                'name': name,
-                'title': title,
-                'company': company,
-                'location': location or "San Francisco, CA",
-                'profile_url': profile_url,
-                'connections': connections,
-                'is_qualified': is_qualified,
-                'industry': industry,
-                'company_size': company_size
-            }
-            
-            profiles.append(profile)
+            limit (int): Maximum number of profiles to retrieve
         
-        return profiles
+        Yields:
+            dict: Profile data
+        """
+        logger.info(f"Streaming profiles with keywords: '{keywords}' in location: '{location}'")
+        yield from self.backend.iter_search("profiles", keywords, location, limit)
     
-    def save_results(self, data, filename=None):
+    def save_results(self, data, filename=None, format="json", compression=None, max_bytes=None):
         """
-        Save the scraped data to a JSON file.
+        Save the scraped data to a file in the data directory.
+        
+        The 'json' format writes the whole result set as one pretty-printed
+        document. The 'jsonl' format streams records one per line as they
+        arrive, so `data` can be a generator such as `iter_profiles()`. Writing
+        to an existing JSON Lines file appends to it.
         
         Args:
-            data (list or dict): Data to save
+            data (list, dict or iterable): Data to save; 'jsonl' takes any iterable of records
             filename (str): Filename to save to (default: based on current timestamp)
+            format (str): Output format ('json' or 'jsonl')
+            compression (str): Compression for 'jsonl' output (None, 'gzip' or 'zstd')
+            max_bytes (int): Size at which 'jsonl' output rolls over to a new numbered part file
             
         Returns:
-            str: Path to the saved file
+            str: Path to the saved file (the first part for rotated output), or None if saving failed
         """
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"linkedin_data_{timestamp}.json"
+            filename = f"linkedin_data_{timestamp}" + (".json" if format == "json" else "")
         
         filepath = os.path.join('data', filename)
         
+        if format == "jsonl":
+            try:
+                with JsonlWriter(filepath, compression=compression, max_bytes=max_bytes) as writer:
+                    writer.write_many([data] if isinstance(data, dict) else data)
+            except ImportError:
+                logger.error("zstandard is required for zstd compression")
+                return None
+            except (ValueError, OSError) as e:
+                logger.error(f"Error saving results: {str(e)}")
+                return None
+            
+            if not writer.paths:
+                logger.warning("No results to save")
+                return None
+            
+            logger.info(f"Streamed {writer.records} records to {', '.join(writer.paths)}")
+            return writer.paths[0]
+        
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         
@@ -451,8 +470,6 @@ if __name__ == "__main__":
     # Save the results
     scraper.save_results(jobs, "software_engineer_jobs.json")
     
-    # Search for profiles
-    profiles = scraper.search_profiles("software engineer", "New York", limit=5)
-    
-    # Save the results
-    scraper.save_results(profiles, "software_engineer_profiles.json")
+    # Stream profiles to compressed JSON Lines as each page is parsed
+    profiles = scraper.iter_profiles("software engineer", "New York", limit=5)
+    scraper.save_results(profiles, "software_engineer_profiles", format="jsonl", compression="gzip")
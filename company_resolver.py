@@ -0,0 +1,280 @@
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+
+import pandas as pd
+
+from metrics import registry
+
+logger = logging.getLogger("company_resolver")
+
+# Legal-form words dropped from the end of company names
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "sas", "sarl", "bv", "nv", "oy", "ab", "as", "spa", "srl", "pty", "kg", "se"
+}
+
+# Names scraped for profiles without a company
+PLACEHOLDER_NAMES = {"", "unknown", "none", "n a", "na", "self employed"}
+
+LINKEDIN_COMPANY_URL = re.compile(r"linkedin\.com/company/([^/?#]+)", re.IGNORECASE)
+
+CompanyEntity = namedtuple("CompanyEntity", ["key", "name", "url"])
+
+
+def normalize_company_name(name):
+    """
+    Reduce a company name to the form used for matching.
+
+    Accents, case, punctuation, a leading "the" and trailing legal forms are
+    removed, so "Google", "Google LLC" and "google" all become "google".
+
+    Args:
+        name (str): Company name as scraped
+
+    Returns:
+        str: Normalized name ('' for missing or placeholder names)
+    """
+    if not isinstance(name, str):
+        return ""
+
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    # Dotted abbreviations such as "S.A." become single words
+    text = text.replace("&", " and ").replace(".", "")
+    words = re.sub(r"[^a-z0-9]+", " ", text).split()
+
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+
+    normalized = " ".join(words)
+    return "" if normalized in PLACEHOLDER_NAMES else normalized
+
+
+def company_slug(url):
+    """
+    Extract the company identifier from a LinkedIn company URL.
+
+    Args:
+        url (str): Company URL, e.g. https://www.linkedin.com/company/google/
+
+    Returns:
+        str: Lowercased company slug, or '' if the URL is not a company page
+    """
+    if not isinstance(url, str):
+        return ""
+    match = LINKEDIN_COMPANY_URL.search(url)
+    return match.group(1).lower() if match else ""
+
+
+class CompanyResolver:
+    """
+    Resolves free-text company names and company URLs to company entities.
+
+    Every name is normalized (see `normalize_company_name`) and looked up in
+    an alias index; LinkedIn company URLs are looked up by slug, which takes
+    precedence over the name. Unknown companies become new entities, and
+    every new name or URL seen for an entity is added to the index. Lookups
+    are memoized in an LRU cache keyed by the raw name and URL, and the index
+    is persisted to a JSON file so it survives restarts.
+    """
+
+    def __init__(self, cache_path=None, cache_size=65536):
+        """
+        Initialize the resolver.
+
+        Args:
+            cache_path (str): JSON file the alias index is loaded from and saved to (optional)
+            cache_size (int): Maximum number of memoized lookups
+        """
+        self.cache_path = cache_path
+        self.entities = {}
+        self.name_index = {}
+        self.url_index = {}
+        self._dirty = False
+        # Increased whenever an existing name may resolve differently
+        self.revision = 0
+        self._lock = threading.RLock()
+        self._lookup = functools.lru_cache(maxsize=cache_size)(self._resolve_key)
+
+        if cache_path and os.path.exists(cache_path):
+            self._load()
+
+    def _load(self):
+        with open(self.cache_path, "r") as f:
+            data = json.load(f)
+        self.entities = data.get("entities", {})
+        self.name_index = data.get("names", {})
+        self.url_index = data.get("urls", {})
+        logger.info(f"Loaded {len(self.entities)} companies from {self.cache_path}")
+
+    def save(self):
+        """
+        Write the alias index to the cache file if it has changed.
+
+        Returns:
+            bool: True if the file was written
+        """
+        if not self.cache_path or not self._dirty:
+            return False
+
+        with self._lock:
+            data = {'entities': self.entities, 'names': self.name_index, 'urls': self.url_index}
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        return True
+
+    def _resolve_key(self, name, url):
+        """
+        Find or create the entity for a name and URL.
+
+        Args:
+            name (str): Company name
+            url (str): Company URL
+
+        Returns:
+            str: Entity key, or None if neither identifies a company
+        """
+        registry.increment("company_resolver_lookups_total")
+        normalized = normalize_company_name(name)
+        slug = company_slug(url)
+        if not normalized and not slug:
+            return None
+
+        with self._lock:
+            key = self.url_index.get(slug) if slug else None
+            if key is None and normalized:
+                key = self.name_index.get(normalized)
+            if key is None and slug:
+                # Slugs are usually the company name, e.g. /company/coca-cola/
+                key = self.name_index.get(normalize_company_name(slug.replace("-", " ")))
+
+            if key is None:
+                key = f"linkedin:{slug}" if slug else f"name:{normalized}"
+                self.entities[key] = {'name': name.strip() if normalized else slug, 'url': url if slug else None}
+                self._dirty = True
+            elif slug and not self.entities[key].get('url'):
+                self.entities[key]['url'] = url
+                self._dirty = True
+
+            if slug and slug not in self.url_index:
+                self.url_index[slug] = key
+                self._dirty = True
+            if normalized and normalized not in self.name_index:
+                self.name_index[normalized] = key
+                self._dirty = True
+        return key
+
+    def resolve(self, name, url=None):
+        """
+        Resolve a company name and/or URL to its entity.
+
+        Args:
+            name (str): Company name as scraped
+            url (str): Company URL (optional)
+
+        Returns:
+            CompanyEntity: The company, or None if neither identifies one
+        """
+        key = self._lookup(name if isinstance(name, str) else None, url if isinstance(url, str) else None)
+        if key is None:
+            return None
+        entity = self.entities[key]
+        return CompanyEntity(key, entity['name'], entity.get('url'))
+
+    def resolve_frame(self, names, urls=None):
+        """
+        Resolve a column of company names, looking up each distinct name/URL pair once.
+
+        Args:
+            names (Series): Company names
+            urls (Series): Company URLs aligned with the names (optional)
+
+        Returns:
+            DataFrame: company_key and company_name columns, aligned with the input
+        """
+        pairs = pd.DataFrame({
+            'name': names.to_numpy(),
+            'url': None if urls is None else urls.to_numpy()
+        }, index=names.index)
+
+        distinct = pairs.drop_duplicates()
+        entities = [self.resolve(name, url) for name, url in distinct.itertuples(index=False, name=None)]
+        distinct = distinct.assign(
+            company_key=[entity.key if entity else None for entity in entities],
+            company_name=[entity.name if entity else None for entity in entities]
+        )
+        self.save()
+
+        resolved = pairs.merge(distinct, on=['name', 'url'], how='left')
+        resolved.index = names.index
+        return resolved[['company_key', 'company_name']]
+
+    def add_alias(self, alias, company):
+        """
+        Make a name resolve to another company, e.g. a former name or a brand.
+
+        Args:
+            alias (str): Name that should resolve to the company
+            company (str): Name of the company it belongs to
+
+        Returns:
+            CompanyEntity: The company the alias now resolves to, or None if either name is empty
+        """
+        normalized = normalize_company_name(alias)
+        entity = self.resolve(company)
+        if not normalized or entity is None:
+            return None
+
+        with self._lock:
+            self.name_index[normalized] = entity.key
+            self._dirty = True
+            self.revision += 1
+        # Memoized lookups may point at the alias's old entity
+        self._lookup.cache_clear()
+        self.save()
+        return entity
+
+    def cache_info(self):
+        """
+        Get the hit and miss counts of the lookup cache.
+
+        Returns:
+            CacheInfo: functools cache statistics
+        """
+        return self._lookup.cache_info()
+
+
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_company_resolver(cache_path):
+    """
+    Get the process-wide resolver for a cache file, creating it if needed.
+
+    Args:
+        cache_path (str): Path to the alias cache file
+
+    Returns:
+        CompanyResolver: Resolver shared by everything that uses the cache file
+    """
+    key = os.path.abspath(cache_path)
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+        if resolver is None:
+            resolver = _resolvers[key] = CompanyResolver(cache_path)
+        return resolver
@@ -0,0 +1,202 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import registry
+
+logger = logging.getLogger("connection_manager")
+
+# Number of compiled statements each connection keeps; parameterized queries
+# issued through the same connection are only prepared once
+STATEMENT_CACHE_SIZE = 256
+
+# Idle reader connections kept open for reuse; connections opened beyond
+# this under load are closed when they are returned
+READER_POOL_SIZE = 8
+
+
+class SQLiteConnectionManager:
+    """
+    Shared access to one SQLite database from many threads.
+
+    Reads check a connection out of a small pool and return it when done,
+    so short-lived threads (Streamlit runs every rerun on a new one) reuse
+    connections instead of each leaving one open. All writes go through a
+    single writer connection guarded by a lock, so concurrent writers queue
+    up instead of failing with "database is locked". The database runs in
+    WAL mode, which lets readers proceed while a write transaction is open.
+    """
+
+    def __init__(self, db_path, busy_timeout=10.0, pool_size=READER_POOL_SIZE):
+        """
+        Initialize the connection manager.
+
+        Args:
+            db_path (str): Path to the database file
+            busy_timeout (float): Seconds to wait for a lock held by another process
+            pool_size (int): Most idle reader connections kept open
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._idle_readers = []
+        # Increased by close(), so connections checked out before it are closed when returned
+        self._generation = 0
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._writer = None
+
+    def _connect(self, check_same_thread=True):
+        """
+        Open a new connection with the manager's settings.
+
+        Args:
+            check_same_thread (bool): Whether the connection may only be used by the creating thread
+
+        Returns:
+            sqlite3.Connection: The connection
+        """
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # Autocommit mode; transactions are opened explicitly by writer()
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=check_same_thread,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        return conn
+
+    def _get_writer(self):
+        if self._writer is None:
+            self._writer = self._connect(check_same_thread=False)
+            self._writer.execute("PRAGMA journal_mode = WAL")
+            self._writer.execute("PRAGMA synchronous = NORMAL")
+        return self._writer
+
+    def _checkout_reader(self):
+        with self._readers_lock:
+            if self._idle_readers:
+                return self._idle_readers.pop(), self._generation
+            generation = self._generation
+
+        # Make sure the database is in WAL mode before the first read
+        with self._write_lock:
+            self._get_writer()
+        registry.increment("sqlite_reader_connections_opened_total")
+        # Pooled connections move between threads, but only one uses them at a time
+        return self._connect(check_same_thread=False), generation
+
+    def _return_reader(self, conn, generation):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._readers_lock:
+            if generation == self._generation and len(self._idle_readers) < self.pool_size:
+                self._idle_readers.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def reader(self):
+        """
+        Check out a reader connection for the duration of the block.
+
+        Nested reader() blocks in the same thread share the outer block's
+        connection.
+
+        Yields:
+            sqlite3.Connection: Connection for queries
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn, generation = self._checkout_reader()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._return_reader(conn, generation)
+
+    @contextmanager
+    def writer(self):
+        """
+        Run a write transaction on the shared writer connection.
+
+        Only one thread writes at a time. Everything done inside the block is
+        committed together, or rolled back if it raises. Cursors must not
+        outlive the block: the connection is shared, and a cursor that is
+        garbage-collected later resets its statement under whichever thread
+        is writing at the time. Use conn.execute() and conn.executemany().
+
+        Yields:
+            sqlite3.Connection: Connection for statements in the transaction
+        """
+        wait_start = time.perf_counter()
+        with self._write_lock:
+            registry.observe("sqlite_write_lock_wait_seconds", time.perf_counter() - wait_start)
+            conn = self._get_writer()
+
+            # Nested writer() blocks join the outer transaction
+            if conn.in_transaction:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self):
+        """
+        Close every connection opened by the manager.
+
+        Reader connections in use are closed when their block ends.
+        """
+        with self._readers_lock:
+            for conn in self._idle_readers:
+                conn.close()
+            self._idle_readers = []
+            self._generation += 1
+
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path):
+    """
+    Get the process-wide connection manager for a database, creating it if needed.
+
+    Args:
+        db_path (str): Path to the database file
+
+    Returns:
+        SQLiteConnectionManager: Manager shared by everything that uses the database
+    """
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = SQLiteConnectionManager(db_path)
+            logger.info(f"Opened connection manager for {db_path}")
+        return manager
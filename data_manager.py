@@ -1,8 +1,368 @@
 import pandas as pd
+import numpy as np
 import os
 import json
 import logging
-from datetime import datetime
+import re
+import functools
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from metrics import registry
+from connection_manager import get_connection_manager
+from company_resolver import get_company_resolver
+from qualification_rules import QualificationRules
+from lead_scoring import SCORE_TEXT_COLUMNS, LeadScorer
+from lead_dedup import SUGGESTION_COLUMNS, canonical_profile_urls, get_duplicate_index
+from jsonl_io import count_lines, iter_jsonl, iter_jsonl_reversed
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+    logging.getLogger("DataManager").warning("pyarrow is not installed; the columnar leads cache is disabled")
+
+# Search history columns and their SQLite types
+SEARCH_HISTORY_COLUMNS = {
+    'keywords': 'TEXT',
+    'location': 'TEXT',
+    'date': 'TEXT',
+    'results': 'INTEGER',
+    'result_limit': 'INTEGER',
+    'new_leads': 'INTEGER',
+    'duration_seconds': 'REAL',
+    'run_id': 'TEXT'
+}
+
+# Scraped lead fields covered by the content hash; user edits such as
+# qualification and notes are left out
+LEAD_CONTENT_COLUMNS = ['name', 'title', 'company', 'location', 'industry', 'company_size', 'connections']
+
+# Lead score and the model version that computed it; derived from the
+# scraped fields, so rewritten along with them
+LEAD_SCORE_COLUMNS = ['lead_score', 'score_model']
+
+# Who made a lead's qualification decision, stored in qualified_by: a user
+# qualifying or unqualifying it, or the qualification rules. Leads nobody
+# decided on have none. Rules never override a user's decision
+QUALIFIED_BY_MANUAL = "manual"
+QUALIFIED_BY_RULE = "rule"
+
+# Columns linking a search run to the leads it found
+SEARCH_RUN_LEAD_COLUMNS = ['run_id', 'profile_url', 'found_at', 'is_new']
+
+# Lead columns analytics can count leads by
+LEAD_GROUP_COLUMNS = ['company', 'title', 'location', 'industry', 'company_size', 'connections', 'is_qualified']
+
+# Lead count rollups by (leads cache path, leads version, column, resolver revision), shared by
+# every DataManager in the process; see DataManager._lead_rollup
+LEAD_ROLLUP_CACHE_SIZE = 64
+_lead_rollups = OrderedDict()
+_lead_rollups_lock = threading.Lock()
+
+# Line counts of search history files by path: (inode, size counted, lines). The
+# history is only appended to or replaced, so only the bytes appended since the
+# last count are read; see DataManager.count_search_history
+_search_history_counts = {}
+_search_history_counts_lock = threading.Lock()
+
+# Running search history statistics by path: (inode, offset, totals), extended
+# with the entries appended since; see DataManager.get_search_history_stats
+_search_history_totals = {}
+_search_history_totals_lock = threading.Lock()
+
+# Compiled qualification rules by storage location: (file stamp, rules), so ingest
+# batches don't reload and recompile them; see DataManager.get_qualification_rules
+_qualification_rules = {}
+_qualification_rules_lock = threading.Lock()
+
+# Loaded lead scorers by model file path: (file stamp, scorer), so ingest batches
+# don't re-read the model; see DataManager.get_lead_scorer
+_lead_scorers = {}
+_lead_scorers_lock = threading.Lock()
+
+
+def file_stamp(file_path):
+    """
+    Identify the current contents of a file without reading it
+    
+    Args:
+        file_path (str): Path to the file
+    
+    Returns:
+        tuple: (modification time in ns, size), or None if the file doesn't exist
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Columns of the stored jobs table (file mode) in insert order
+JOB_STORAGE_COLUMNS = [
+    'job_id', 'title', 'company_key', 'location', 'url', 'description', 'application_type', 'posting_date', 'first_seen_at'
+]
+
+# Columns of job query results, before the per-criterion columns
+JOB_COLUMNS = ['job_id', 'title', 'company', 'company_url', 'location', 'posting_date', 'application_type', 'url', 'description']
+
+
+# Relative posting ages as shown on search result cards, e.g. "3 days ago"
+RELATIVE_DATE_PATTERN = re.compile(r"(\d+)\s+(minute|hour|day|week|month|year)s?\s+ago", re.IGNORECASE)
+RELATIVE_DATE_UNITS = {'minute': 1 / 1440, 'hour': 1 / 24, 'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+
+def parse_posting_date(value, now=None):
+    """
+    Convert a job's posting date to an ISO date, so stored jobs sort by it
+    
+    Args:
+        value (str): Posting date, either relative ("3 days ago") or absolute
+        now (datetime): Time the listing was fetched (defaults to the current time)
+        
+    Returns:
+        str: ISO date (YYYY-MM-DD), or the value unchanged if it can't be parsed
+    """
+    if not value:
+        return None
+    
+    match = RELATIVE_DATE_PATTERN.search(str(value))
+    if match:
+        age = timedelta(days=int(match.group(1)) * RELATIVE_DATE_UNITS[match.group(2).lower()])
+        return ((now or datetime.now()) - age).date().isoformat()
+    
+    parsed = pd.to_datetime(value, errors="coerce")
+    return value if pd.isna(parsed) else parsed.date().isoformat()
+
+
+def normalize_jobs(jobs, resolver=None):
+    """
+    Split job listings into job, company and criteria rows
+    
+    Companies are keyed by the resolver's entity key when a resolver is
+    given, otherwise by their LinkedIn URL, or by their lowercased name when
+    the listing has no company URL. Listings without an ID are skipped.
+    
+    Args:
+        jobs (list): Job listings as returned by the scraper's search_jobs
+        resolver (CompanyResolver): Resolver mapping company names and URLs to entities (optional)
+        
+    Returns:
+        tuple: (jobs DataFrame, companies DataFrame, criteria DataFrame)
+    """
+    now = datetime.now()
+    first_seen_at = now.isoformat()
+    job_rows = []
+    companies = {}
+    criteria_rows = []
+    seen = set()
+    
+    for job in jobs:
+        if job.get('id') is None or str(job['id']) in seen:
+            continue
+        job_id = str(job['id'])
+        seen.add(job_id)
+        
+        company_url = (job.get('company_details') or {}).get('url')
+        if resolver is not None:
+            entity = resolver.resolve(job.get('company'), company_url)
+            company_key = entity.key if entity else None
+            company = (company_key, entity.name, entity.url or company_url) if entity else None
+        else:
+            company_key = company_url or (job.get('company') or '').strip().lower() or None
+            company = (company_key, job.get('company'), company_url)
+        if company_key is not None and company_key not in companies:
+            companies[company_key] = company
+        
+        job_rows.append((
+            job_id, job.get('title'), company_key, job.get('location'), job.get('url'), job.get('description'),
+            job.get('application_type'), parse_posting_date(job.get('posting_date'), now), first_seen_at
+        ))
+        for name, value in (job.get('criteria') or {}).items():
+            criteria_rows.append((job_id, name, None if value is None else str(value)))
+    
+    return (
+        pd.DataFrame(job_rows, columns=JOB_STORAGE_COLUMNS),
+        pd.DataFrame(list(companies.values()), columns=['company_key', 'name', 'url']),
+        pd.DataFrame(criteria_rows, columns=['job_id', 'name', 'value'])
+    )
+
+
+def lead_content_hash(lead):
+    """
+    Hash the scraped fields of a lead, so a re-fetched lead can be compared with the stored one
+    
+    Args:
+        lead (dict): Lead data
+        
+    Returns:
+        str: Hex digest of the lead's content
+    """
+    values = []
+    for column in LEAD_CONTENT_COLUMNS:
+        value = lead.get(column)
+        # Leads without a connection count used to store 'Unknown'
+        if column == 'connections' and pd.isna(value):
+            value = 'Unknown'
+        # CSV round trips turn integer columns with gaps into floats
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        values.append(str(value))
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Default lower edges of the connection count buckets; the last bucket is open-ended
+CONNECTION_BUCKETS = [0, 100, 250, 500, 1000, 2500, 5000]
+
+
+def parse_connections(values):
+    """
+    Convert connection counts to integers
+    
+    Counts may arrive as numbers or as text such as "500+" or "1,234"
+    (legacy rows also hold 'Unknown'); values without digits become missing.
+    
+    Args:
+        values (Series): Connection counts as scraped or stored
+    
+    Returns:
+        Series: Nullable Int64 connection counts
+    """
+    numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+    text = values[numbers.isna() & values.notna()]
+    if not text.empty:
+        digits = text.astype(str).str.replace(r"\D", "", regex=True)
+        numbers[text.index] = pd.to_numeric(digits, errors="coerce").astype("float64")
+    return numbers.round().astype("Int64")
+
+
+def connection_histogram(connections, weights=None, buckets=CONNECTION_BUCKETS):
+    """
+    Count connection counts per bucket
+    
+    Args:
+        connections (Series): Int64 connection counts
+        weights (array): Number of leads per entry in connections (optional; one each by default)
+        buckets (list): Ascending lower edges of the buckets; the last bucket is open-ended
+    
+    Returns:
+        DataFrame: bucket, lower, upper and count columns, plus an 'Unknown' bucket for missing counts
+    """
+    edges = np.asarray(sorted(set(buckets)) or [0], dtype="int64")
+    
+    weights = np.ones(len(connections), dtype="int64") if weights is None else np.asarray(weights, dtype="int64")
+    known = connections.notna().to_numpy()
+    # Counts below the first edge fall into the first bucket
+    positions = np.maximum(np.digitize(connections[known].to_numpy(dtype="int64"), edges) - 1, 0)
+    counts = np.bincount(positions, weights=weights[known], minlength=len(edges)).astype("int64")
+    
+    lowers = edges.tolist()
+    uppers = [int(edge) - 1 for edge in edges[1:]] + [None]
+    labels = [f"{lower:,}+" if upper is None else f"{lower:,}-{upper:,}" for lower, upper in zip(lowers, uppers)]
+    counts = counts.tolist()
+    
+    unknown = int(weights[~known].sum())
+    if unknown:
+        labels, lowers, uppers, counts = labels + ['Unknown'], lowers + [None], uppers + [None], counts + [unknown]
+    return pd.DataFrame({
+        'bucket': labels,
+        'lower': pd.array(lowers, dtype="Int64"),
+        'upper': pd.array(uppers, dtype="Int64"),
+        'count': pd.array(counts, dtype="int64")
+    })
+
+
+# Time buckets of the lead activity rollups
+LEAD_ACTIVITY_PERIODS = ['day', 'week']
+LEAD_ACTIVITY_COLUMNS = ['period', 'period_start', 'created', 'qualified']
+
+
+def activity_period_start(timestamps, period):
+    """
+    Find the start of the day or week (starting Monday) each timestamp falls in
+    
+    Args:
+        timestamps (iterable): ISO timestamps
+        period (str): 'day' or 'week'
+        
+    Returns:
+        Series: Period starts as ISO dates (NaN for missing timestamps)
+    """
+    times = pd.to_datetime(pd.Series(timestamps, dtype=object), format="ISO8601", errors="coerce")
+    if period == "week":
+        times = times - pd.to_timedelta(times.dt.weekday, unit="D")
+    elif period != "day":
+        raise ValueError(f"Unsupported activity period: {period}")
+    return times.dt.strftime("%Y-%m-%d")
+
+
+def sqlite_column_type(dtype):
+    """
+    Get the SQLite column type pandas' to_sql would use for a dtype
+    
+    Args:
+        dtype: Column dtype
+    
+    Returns:
+        str: SQLite type
+    """
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def sqlite_rows(df):
+    """
+    Get the rows of a frame as tuples sqlite3 can bind, with None for missing values
+    
+    Args:
+        df (DataFrame): Rows to write
+    
+    Returns:
+        iterator: One tuple per row
+    """
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def qualified_mask(values):
+    """
+    Read qualification flags stored as booleans (CSV files) or 0/1 (database)
+    
+    Args:
+        values (Series): Stored is_qualified values
+        
+    Returns:
+        Series: True for qualified leads
+    """
+    return values.fillna(False).astype(str).str.lower().isin(['true', '1', '1.0'])
+
+
+def timed_storage(operation):
+    """
+    Decorator that records the duration of a storage operation, labelled by storage type.
+    
+    Args:
+        operation (str): Name of the operation (used as a metric label)
+        
+    Returns:
+        callable: Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with registry.timer("storage_operation_seconds", operation=operation, storage=self.storage_type):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
 
 class DataManager:
     """
@@ -34,6 +394,28 @@ class DataManager:
             os.makedirs(data_dir)
             self.logger.info(f"Created data directory: {data_dir}")
     
+    @property
+    def db(self):
+        """
+        SQLiteConnectionManager: Shared connection manager for the current db_path
+        """
+        return get_connection_manager(self.db_path)
+    
+    @property
+    def duplicate_index(self):
+        """
+        DuplicateIndex: Shared index of the stored leads for finding duplicates
+        """
+        return get_duplicate_index(self._lead_cache_path())
+    
+    @property
+    def companies(self):
+        """
+        CompanyResolver: Shared company resolver, with its alias index stored in the data directory
+        """
+        return get_company_resolver(os.path.join(self.data_dir, "company_aliases.json"))
+    
+    @registry.timed("clean_data_seconds")
     def clean_data(self, leads_df):
         """
         Clean and normalize the leads data
@@ -57,8 +439,9 @@ class DataManager:
         df['location'] = df['location'].fillna('Unknown')
         df['industry'] = df['industry'].fillna('Unknown')
         df['company_size'] = df['company_size'].fillna('Unknown')
-        df['connections'] = df['connections'].fillna('Unknown')
-        df['profile_url'] = df['profile_url'].fillna('')
+        df['connections'] = parse_connections(df['connections'])
+        # Variants of a profile URL (locale subdomains, query strings, trailing slashes) become one URL
+        df['profile_url'] = canonical_profile_urls(df['profile_url'])
         
         # Ensure is_qualified column exists and is boolean
         if 'is_qualified' not in df.columns:
@@ -66,6 +449,21 @@ class DataManager:
         else:
             df['is_qualified'] = df['is_qualified'].fillna(False).astype(bool)
         
+        if 'qualified_by' not in df.columns:
+            df['qualified_by'] = None
+        
+        # Auto-qualify unqualified leads matching the saved rules, recording that the rules decided
+        rules = self.get_qualification_rules()
+        if rules is not None:
+            by_rule = rules.qualify(df) & ~df['is_qualified'] & df['qualified_by'].ne(QUALIFIED_BY_MANUAL)
+            df['is_qualified'] = df['is_qualified'] | by_rule
+            df['qualified_by'] = df['qualified_by'].astype(object).where(~by_rule, QUALIFIED_BY_RULE)
+        
+        # Score leads for outreach priority
+        scorer = self.get_lead_scorer()
+        df['lead_score'] = scorer.score(df)
+        df['score_model'] = scorer.version
+        
         # Ensure notes column exists
         if 'notes' not in df.columns:
             df['notes'] = ''
@@ -79,6 +477,125 @@ class DataManager:
         self.logger.info(f"Cleaned data: {len(df)} leads after cleaning")
         return df
     
+    def _lead_cache_path(self):
+        """
+        Get the path of the columnar leads cache
+        
+        Returns:
+            str: Path to the Arrow IPC file
+        """
+        if self.storage_type == "database":
+            return f"{os.path.splitext(self.db_path)[0]}.leads.arrow"
+        return os.path.join(self.data_dir, "leads.arrow")
+    
+    def _bump_leads_version(self, conn):
+        """
+        Count a write to the leads table, which invalidates the leads cache
+        
+        Args:
+            conn (Connection): Writer connection of the current transaction
+            
+        Returns:
+            str: New leads version
+        """
+        conn.execute("CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        conn.execute(
+            "INSERT INTO table_versions (name, version) VALUES ('leads', 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1"
+        )
+        return str(conn.execute("SELECT version FROM table_versions WHERE name = 'leads'").fetchone()[0])
+    
+    def _leads_version(self):
+        """
+        Identify the current contents of the leads storage
+        
+        Returns:
+            str: Version the leads cache must match, or None if no leads are stored
+        """
+        if self.storage_type == "file":
+            file_path = os.path.join(self.data_dir, "leads.csv")
+            if not os.path.exists(file_path):
+                return None
+            stat = os.stat(file_path)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        elif self.storage_type == "database":
+            if not self._has_table("leads"):
+                return None
+            if not self._has_table("table_versions"):
+                return "0"
+            with self.db.reader() as conn:
+                row = conn.execute("SELECT version FROM table_versions WHERE name = 'leads'").fetchone()
+            return str(row[0]) if row else "0"
+        return None
+    
+    def _read_lead_cache(self, version):
+        """
+        Load leads from the columnar cache if it matches the stored leads
+        
+        The cache is memory-mapped, so opening it takes constant time and
+        only the pages that are converted are read from disk.
+        
+        Args:
+            version (str): Current leads version (see `_leads_version`)
+        
+        Returns:
+            DataFrame: Cached leads, or None if the cache is missing or stale
+        """
+        cache_path = self._lead_cache_path()
+        if pa is None or version is None or not os.path.exists(cache_path):
+            return None
+        
+        try:
+            reader = pa.ipc.open_file(pa.memory_map(cache_path, "r"))
+            metadata = reader.schema.metadata or {}
+            if metadata.get(b"leads_version") != version.encode("utf-8"):
+                registry.increment("lead_cache_total", outcome="stale")
+                return None
+            leads_df = reader.read_all().to_pandas()
+        except Exception as e:
+            self.logger.warning(f"Error reading leads cache {cache_path}: {str(e)}")
+            return None
+        
+        registry.increment("lead_cache_total", outcome="hit")
+        return leads_df
+    
+    def _write_lead_cache(self, leads_df, version):
+        """
+        Write leads to the columnar cache, tagged with the leads version they match
+        
+        Does nothing if pyarrow is not installed.
+        
+        Args:
+            leads_df (DataFrame): Leads as stored
+            version (str): Leads version of the stored leads
+        
+        Returns:
+            bool: True if the cache was written
+        """
+        if pa is None or version is None:
+            return False
+        
+        cache_path = self._lead_cache_path()
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            table = pa.Table.from_pandas(leads_df, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[b"leads_version"] = version.encode("utf-8")
+            table = table.replace_schema_metadata(metadata)
+            
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # e.g. columns mixing strings and numbers, which Arrow can't store
+            self.logger.warning(f"Error writing leads cache {cache_path}: {str(e)}")
+            return False
+        
+        self.logger.info(f"Wrote {len(leads_df)} leads to cache {cache_path}")
+        return True
+    
+    @timed_storage("save_leads")
     def save_leads(self, leads_df):
         """
         Save leads data to storage
@@ -93,27 +610,31 @@ class DataManager:
             self.logger.warning("No leads to save")
             return True
         
+        # The index is rebuilt from the new leads on the next duplicate check
+        self.duplicate_index.clear()
+        
         try:
             if self.storage_type == "file":
                 # Save to CSV file
                 file_path = os.path.join(self.data_dir, "leads.csv")
                 leads_df.to_csv(file_path, index=False)
+                self._rebuild_lead_activity(leads_df)
                 self.logger.info(f"Saved {len(leads_df)} leads to {file_path}")
+                self._write_lead_cache(leads_df, self._leads_version())
                 return True
             elif self.storage_type == "database":
-                # Import SQLite
-                import sqlite3
-                
-                # Connect to database
-                conn = sqlite3.connect(self.db_path)
-                
                 # Save to database
-                leads_df.to_sql("leads", conn, if_exists="replace", index=False)
-                
-                # Close connection
-                conn.close()
+                with self.db.writer() as conn:
+                    # Written with the writer's own statements rather than to_sql, which
+                    # commits by itself and would end the transaction halfway
+                    conn.execute("DROP TABLE IF EXISTS leads")
+                    self._create_leads_table(conn, leads_df)
+                    self._insert_leads(conn, leads_df)
+                    self._rebuild_lead_activity(leads_df, conn)
+                    version = self._bump_leads_version(conn)
                 
                 self.logger.info(f"Saved {len(leads_df)} leads to database {self.db_path}")
+                self._write_lead_cache(leads_df, version)
                 return True
             else:
                 self.logger.error(f"Unsupported storage type: {self.storage_type}")
@@ -122,47 +643,100 @@ class DataManager:
             self.logger.error(f"Error saving leads: {str(e)}")
             return False
     
+    @staticmethod
+    def _create_leads_table(conn, leads_df):
+        """
+        Create the leads table with the frame's columns
+        
+        Args:
+            conn (sqlite3.Connection): Writer connection
+            leads_df (DataFrame): Leads whose columns and dtypes define the table
+        """
+        columns = ", ".join(f'"{column}" {sqlite_column_type(dtype)}' for column, dtype in leads_df.dtypes.items())
+        conn.execute(f"CREATE TABLE leads ({columns})")
+    
+    @staticmethod
+    def _insert_leads(conn, leads_df, or_ignore=False):
+        """
+        Insert leads into the leads table
+        
+        Args:
+            conn (sqlite3.Connection): Writer connection
+            leads_df (DataFrame): Leads to insert
+            or_ignore (bool): Skip leads whose profile URL is already stored
+        
+        Returns:
+            int: Number of leads inserted
+        """
+        columns = ", ".join(f'"{column}"' for column in leads_df.columns)
+        placeholders = ", ".join("?" for _ in leads_df.columns)
+        changes_before = conn.total_changes
+        conn.executemany(
+            f"INSERT {'OR IGNORE ' if or_ignore else ''}INTO leads ({columns}) VALUES ({placeholders})",
+            sqlite_rows(leads_df)
+        )
+        return conn.total_changes - changes_before
+    
+    @staticmethod
+    def _normalize_leads(leads_df):
+        """
+        Convert stored columns to their in-memory types
+        
+        Leads stored before connection counts were parsed hold them as text
+        ('500+', 'Unknown'), and CSV files read gappy integer columns as floats.
+        
+        Args:
+            leads_df (DataFrame): Leads as read from storage
+            
+        Returns:
+            DataFrame: Leads with integer connection counts
+        """
+        if 'connections' in leads_df.columns:
+            leads_df['connections'] = parse_connections(leads_df['connections'])
+        return leads_df
+    
+    @timed_storage("load_leads")
     def load_leads(self):
         """
         Load leads data from storage
         
+        Leads are read from the columnar cache when it matches the stored
+        leads, and the cache is rebuilt after loading from storage otherwise.
+        
         Returns:
             DataFrame: DataFrame containing leads data
         """
         try:
+            # Read the version first, so a write during the load leaves the cache stale rather than wrong
+            version = self._leads_version()
+            leads_df = self._read_lead_cache(version)
+            if leads_df is not None:
+                self.logger.info(f"Loaded {len(leads_df)} leads from cache {self._lead_cache_path()}")
+                return leads_df
+            
             if self.storage_type == "file":
                 # Load from CSV file
                 file_path = os.path.join(self.data_dir, "leads.csv")
                 if os.path.exists(file_path):
-                    leads_df = pd.read_csv(file_path)
+                    leads_df = self._normalize_leads(pd.read_csv(file_path))
                     self.logger.info(f"Loaded {len(leads_df)} leads from {file_path}")
+                    self._write_lead_cache(leads_df, version)
                     return leads_df
                 else:
                     self.logger.warning(f"Leads file not found: {file_path}")
                     return pd.DataFrame()
             elif self.storage_type == "database":
-                # Import SQLite
-                import sqlite3
-                
-                # Connect to database
-                conn = sqlite3.connect(self.db_path)
+                with self.db.reader() as conn:
+                    # Check if table exists
+                    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='leads'")
+                    leads_df = pd.read_sql("SELECT * FROM leads", conn) if cursor.fetchone() else None
                 
-                # Check if table exists
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='leads'")
-                if cursor.fetchone():
-                    # Load from database
-                    leads_df = pd.read_sql("SELECT * FROM leads", conn)
-                    
-                    # Close connection
-                    conn.close()
-                    
+                if leads_df is not None:
+                    leads_df = self._normalize_leads(leads_df)
                     self.logger.info(f"Loaded {len(leads_df)} leads from database {self.db_path}")
+                    self._write_lead_cache(leads_df, version)
                     return leads_df
                 else:
-                    # Close connection
-                    conn.close()
-                    
                     self.logger.warning(f"Leads table not found in database {self.db_path}")
                     return pd.DataFrame()
             else:
@@ -172,249 +746,2309 @@ class DataManager:
             self.logger.error(f"Error loading leads: {str(e)}")
             return pd.DataFrame()
     
-    def save_search_history(self, search_history):
+    @timed_storage("upsert_leads")
+    def upsert_leads(self, leads_df, run_id=None):
         """
-        Save search history to storage
+        Add leads to storage and refresh the leads already stored
+        
+        Leads are keyed by profile_url. A lead that is already stored gets its
+        last_fetched_at and fetch_count updated; its scraped fields are only
+        rewritten when their content hash has changed, and qualification and
+        notes edits are never overwritten. When a run_id is given, every lead
+        in the frame is also linked to that search run, flagged with whether
+        the run was the first to find it.
+        
+        In file mode new leads are appended to leads.csv, while refreshes of
+        stored leads are queued and written by apply_lead_refreshes, so a
+        batch never rewrites the whole file.
         
         Args:
-            search_history (list): List of search history entries
-            
+            leads_df (DataFrame): DataFrame containing cleaned leads data
+            run_id (str): Search run that found the leads (optional)
+        
         Returns:
-            bool: True if successful, False otherwise
+            int: Number of new leads stored, or None if the upsert failed
         """
+        if leads_df.empty:
+            return 0
+        
+        leads_df = leads_df.drop_duplicates(subset=['profile_url'], keep='first')
+        fetched_at = datetime.now().isoformat()
+        if 'is_qualified' in leads_df.columns:
+            qualified = leads_df['is_qualified'].fillna(False).astype(bool)
+        else:
+            qualified = pd.Series(False, index=leads_df.index)
+        leads_df = leads_df.assign(
+            content_hash=[lead_content_hash(lead) for lead in leads_df[LEAD_CONTENT_COLUMNS].to_dict("records")],
+            last_fetched_at=fetched_at,
+            fetch_count=1,
+            change_count=0,
+            created_at=fetched_at,
+            qualified_at=pd.Series(fetched_at, index=leads_df.index, dtype=object).where(qualified, None)
+        )
+        
         try:
             if self.storage_type == "file":
-                # Save to JSON file
-                file_path = os.path.join(self.data_dir, "search_history.json")
-                with open(file_path, "w") as f:
-                    json.dump(search_history, f)
-                
-                self.logger.info(f"Saved {len(search_history)} search history entries to {file_path}")
-                return True
-            elif self.storage_type == "database":
-                # Import SQLite
-                import sqlite3
-                
-                # Connect to database
-                conn = sqlite3.connect(self.db_path)
-                
-                # Create table if it doesn't exist
-                cursor = conn.cursor()
-                cursor.execute("""
-                CREATE TABLE IF NOT EXISTS search_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    keywords TEXT,
-                    location TEXT,
-                    date TEXT,
-                    results INTEGER
-                )
-                """)
+                file_path = target = os.path.join(self.data_dir, "leads.csv")
+                changed = 0
+                if not os.path.exists(file_path):
+                    leads_df.to_csv(file_path, index=False)
+                    is_new = pd.Series(True, index=leads_df.index)
+                    inserted = len(leads_df)
+                else:
+                    # Only the key and hash columns are needed to find the new and changed leads
+                    header = pd.read_csv(file_path, nrows=0).columns
+                    stored = pd.read_csv(file_path, usecols=[column for column in ['profile_url', 'content_hash'] if column in header])
+                    is_new = ~leads_df['profile_url'].isin(stored['profile_url'].fillna(''))
+                    new_leads = leads_df[is_new]
+                    inserted = len(new_leads)
+                    
+                    refreshed_leads = leads_df[~is_new]
+                    if not refreshed_leads.empty:
+                        # Queue the refreshes for apply_lead_refreshes instead of rewriting the file per batch
+                        if 'content_hash' in stored.columns:
+                            old_hash = refreshed_leads['profile_url'].map(
+                                stored.drop_duplicates(subset=['profile_url']).set_index('profile_url')['content_hash']
+                            )
+                            changed = int((old_hash.notna() & (old_hash != refreshed_leads['content_hash'])).sum())
+                        with open(self._lead_refreshes_file(), "a") as f:
+                            f.write(refreshed_leads.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+                    
+                    if set(new_leads.columns) <= set(header):
+                        # Append in the file's column order
+                        if not new_leads.empty:
+                            new_leads.reindex(columns=header).to_csv(file_path, mode="a", header=False, index=False)
+                    else:
+                        # There are new columns; the whole file has to be rewritten
+                        stored_df = pd.read_csv(file_path)
+                        pd.concat([stored_df, new_leads]).to_csv(file_path, index=False)
                 
-                # Clear existing data
-                cursor.execute("DELETE FROM search_history")
+                if run_id is not None:
+                    self._append_search_run_leads_file(run_id, leads_df['profile_url'], is_new)
                 
-                # Insert new data
-                for entry in search_history:
-                    cursor.execute(
-                        "INSERT INTO search_history (keywords, location, date, results) VALUES (?, ?, ?, ?)",
-                        (entry["keywords"], entry["location"], entry["date"], entry["results"])
+                self._add_lead_activity(pd.DataFrame({
+                    'at': [fetched_at],
+                    'created': [inserted],
+                    'qualified': [int((qualified & is_new).sum())]
+                }))
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    # Create the table from the frame's schema if it doesn't exist
+                    if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='leads'").fetchone():
+                        self._create_leads_table(conn, leads_df)
+                    
+                    # Add any columns the table is missing
+                    table_columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+                    for column in leads_df.columns:
+                        if column not in table_columns:
+                            conn.execute(f'ALTER TABLE leads ADD COLUMN "{column}"')
+                    
+                    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_profile_url ON leads (profile_url)")
+                    
+                    # Link the run before inserting, while "new" can still be told from the unique index
+                    if run_id is not None:
+                        self._ensure_search_run_leads_table(conn)
+                        conn.executemany(
+                            """
+                            INSERT OR IGNORE INTO search_run_leads (run_id, profile_url, found_at, is_new)
+                            SELECT ?, ?, ?, NOT EXISTS (SELECT 1 FROM leads WHERE profile_url = ?)
+                            """,
+                            ((run_id, url, fetched_at, url) for url in leads_df['profile_url'])
+                        )
+                    
+                    values = leads_df.astype(object).where(leads_df.notna(), None)
+                    
+                    # Rewrite the scraped fields of stored leads whose content changed
+                    content_columns = LEAD_CONTENT_COLUMNS + [column for column in LEAD_SCORE_COLUMNS if column in leads_df.columns]
+                    assignments = ", ".join(f'"{column}" = ?' for column in content_columns)
+                    update_rows = values[content_columns + ['content_hash', 'profile_url', 'content_hash']]
+                    changes_before = conn.total_changes
+                    conn.executemany(
+                        f"""
+                        UPDATE leads SET {assignments}, content_hash = ?, change_count = COALESCE(change_count, 0) + 1
+                        WHERE profile_url = ? AND content_hash IS NOT NULL AND content_hash != ?
+                        """,
+                        update_rows.itertuples(index=False, name=None)
                     )
+                    changed = conn.total_changes - changes_before
+                    
+                    # Leads stored before hashing get their hash without counting as a change
+                    conn.executemany(
+                        f"UPDATE leads SET {assignments}, content_hash = ? WHERE profile_url = ? AND content_hash IS NULL",
+                        update_rows.iloc[:, :-1].itertuples(index=False, name=None)
+                    )
+                    
+                    conn.executemany(
+                        "UPDATE leads SET last_fetched_at = ?, fetch_count = COALESCE(fetch_count, 0) + 1 WHERE profile_url = ?",
+                        ((fetched_at, url) for url in leads_df['profile_url'])
+                    )
+                    
+                    # Qualified leads are inserted separately to count them for the activity rollups
+                    inserted_by_group = {
+                        group: self._insert_leads(conn, leads_df[(qualified == group).to_numpy()], or_ignore=True)
+                        for group in (True, False)
+                    }
+                    inserted = inserted_by_group[True] + inserted_by_group[False]
+                    
+                    self._add_lead_activity(pd.DataFrame({
+                        'at': [fetched_at],
+                        'created': [inserted],
+                        'qualified': [inserted_by_group[True]]
+                    }), conn)
+                    self._bump_leads_version(conn)
                 
-                # Commit changes
-                conn.commit()
-                
-                # Close connection
-                conn.close()
-                
-                self.logger.info(f"Saved {len(search_history)} search history entries to database {self.db_path}")
-                return True
+                target = f"database {self.db_path}"
             else:
                 self.logger.error(f"Unsupported storage type: {self.storage_type}")
-                return False
+                return None
         except Exception as e:
-            self.logger.error(f"Error saving search history: {str(e)}")
-            return False
+            self.logger.error(f"Error upserting leads: {str(e)}")
+            return None
+        
+        refreshed = len(leads_df) - inserted
+        registry.increment("lead_refresh_total", changed, outcome="changed")
+        registry.increment("lead_refresh_total", refreshed - changed, outcome="unchanged")
+        self.logger.info(f"Upserted {inserted} new leads to {target}; {refreshed} refreshed, {changed} changed")
+        
+        # Check the batch for duplicates under other profile URLs; failures are logged, not raised
+        self.find_duplicate_leads(leads_df)
+        return inserted
     
-    def load_search_history(self):
+    @staticmethod
+    def _qualification_events(current, is_qualified, qualified_at):
         """
-        Load search history from storage
+        Find the leads whose qualification changes, and the activity that records it
+        
+        Args:
+            current (DataFrame): profile_url, is_qualified and qualified_at of the leads being updated
+            is_qualified (bool): New qualification
+            qualified_at (str): Time of the change
         
         Returns:
-            list: List of search history entries
+            tuple: (profile URLs whose qualification changes, activity events DataFrame)
         """
-        try:
-            if self.storage_type == "file":
-                # Load from JSON file
-                file_path = os.path.join(self.data_dir, "search_history.json")
-                if os.path.exists(file_path):
-                    with open(file_path, "r") as f:
-                        search_history = json.load(f)
-                    
-                    self.logger.info(f"Loaded {len(search_history)} search history entries from {file_path}")
-                    return search_history
-                else:
-                    self.logger.warning(f"Search history file not found: {file_path}")
-                    return []
-            elif self.storage_type == "database":
-                # Import SQLite
-                import sqlite3
+        was_qualified = qualified_mask(current['is_qualified'])
+        changed = current[was_qualified != is_qualified]
+        
+        if is_qualified:
+            events = pd.DataFrame({'at': [qualified_at], 'created': [0], 'qualified': [len(changed)]})
+        else:
+            # Unqualifying takes the lead out of the period it was qualified in
+            events = pd.DataFrame({'at': changed['qualified_at'].to_numpy(), 'created': 0, 'qualified': -1})
+        return changed['profile_url'].tolist(), events
+    
+    @timed_storage("update_leads")
+    def update_leads(self, profile_urls, changes, leads_df=None):
+        """
+        Set fields of stored leads, e.g. qualification or notes
+        
+        In database mode only the given leads are updated. In file mode the
+        leads file has to be rewritten; pass the current leads as leads_df to
+        save reading it first. Changing is_qualified also sets qualified_at
+        (to the given time, or now) for the leads whose qualification changes,
+        and updates the activity rollups.
+        
+        Args:
+            profile_urls (list): Profile URLs of the leads to update
+            changes (dict): Column names and the values to set
+            leads_df (DataFrame): Current leads, used in file mode (optional)
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        profile_urls = list(profile_urls)
+        if not profile_urls or not changes:
+            return True
+        
+        changes = dict(changes)
+        qualified_at = None
+        if 'is_qualified' in changes:
+            qualified_at = changes.pop('qualified_at', None) or datetime.now().isoformat()
+            is_qualified = bool(changes['is_qualified'])
+        
+        try:
+            if self.storage_type == "file":
+                leads_df = self.load_leads() if leads_df is None else leads_df.copy()
+                if leads_df.empty:
+                    self.logger.warning("No leads to update")
+                    return False
+                
+                mask = leads_df['profile_url'].isin(profile_urls)
+                if qualified_at is not None:
+                    for column in ('is_qualified', 'qualified_at'):
+                        if column not in leads_df.columns:
+                            leads_df[column] = None
+                    
+                    current = leads_df.loc[mask, ['profile_url', 'is_qualified', 'qualified_at']]
+                    changed_urls, events = self._qualification_events(current, is_qualified, qualified_at)
+                    changed = leads_df['profile_url'].isin(changed_urls)
+                    leads_df['qualified_at'] = leads_df['qualified_at'].astype(object).where(
+                        ~changed, qualified_at if is_qualified else None
+                    )
+                
+                for column, value in changes.items():
+                    if column not in leads_df.columns:
+                        leads_df[column] = None
+                    leads_df[column] = leads_df[column].astype(object).where(~mask, value)
+                
+                file_path = os.path.join(self.data_dir, "leads.csv")
+                leads_df.to_csv(file_path, index=False)
+                updated = int(mask.sum())
+                
+                if qualified_at is not None:
+                    self._add_lead_activity(events)
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    table_columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+                    if not table_columns:
+                        self.logger.warning(f"Leads table not found in database {self.db_path}")
+                        return False
+                    
+                    for column in list(changes) + (['qualified_at'] if qualified_at is not None else []):
+                        if column not in table_columns:
+                            conn.execute(f'ALTER TABLE leads ADD COLUMN "{column}"')
+                    
+                    if qualified_at is not None:
+                        rows = []
+                        for start in range(0, len(profile_urls), 500):
+                            chunk = profile_urls[start:start + 500]
+                            placeholders = ", ".join("?" for _ in chunk)
+                            rows.extend(conn.execute(
+                                f"SELECT profile_url, is_qualified, qualified_at FROM leads WHERE profile_url IN ({placeholders})",
+                                chunk
+                            ).fetchall())
+                        
+                        current = pd.DataFrame(rows, columns=['profile_url', 'is_qualified', 'qualified_at'])
+                        changed_urls, events = self._qualification_events(current, is_qualified, qualified_at)
+                        conn.executemany(
+                            "UPDATE leads SET qualified_at = ? WHERE profile_url = ?",
+                            ((qualified_at if is_qualified else None, url) for url in changed_urls)
+                        )
+                        self._add_lead_activity(events, conn)
+                    
+                    assignments = ", ".join(f'"{column}" = ?' for column in changes)
+                    values = list(changes.values())
+                    changes_before = conn.total_changes
+                    conn.executemany(
+                        f"UPDATE leads SET {assignments} WHERE profile_url = ?",
+                        (values + [url] for url in profile_urls)
+                    )
+                    updated = conn.total_changes - changes_before
+                    self._bump_leads_version(conn)
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error updating leads: {str(e)}")
+            return False
+        
+        self.logger.info(f"Updated {', '.join(changes)} for {updated} leads")
+        return True
+    
+    def _refresh_stored_leads(self, stored_df, fetched_df, fetched_at):
+        """
+        Apply re-fetched leads to the stored leads in place
+        
+        Args:
+            stored_df (DataFrame): Stored leads
+            fetched_df (DataFrame): Re-fetched leads that are already stored, with content hashes
+            fetched_at (str): Fetch timestamp
+            
+        Returns:
+            int: Number of leads whose content changed
+        """
+        if fetched_df.empty:
+            return 0
+        
+        content_columns = LEAD_CONTENT_COLUMNS + [column for column in LEAD_SCORE_COLUMNS if column in fetched_df.columns]
+        for column in content_columns + ['content_hash', 'last_fetched_at', 'fetch_count', 'change_count']:
+            if column not in stored_df.columns:
+                stored_df[column] = None
+        columns = content_columns + ['content_hash', 'last_fetched_at']
+        stored_df[columns] = stored_df[columns].astype(object)
+        
+        position = {url: i for i, url in enumerate(stored_df['profile_url'])}
+        rows = stored_df.index[fetched_df['profile_url'].map(position).to_numpy()]
+        
+        old_hash = stored_df.loc[rows, 'content_hash'].to_numpy()
+        new_hash = fetched_df['content_hash'].to_numpy()
+        differs = old_hash != new_hash
+        changed = differs & pd.notna(old_hash)
+        
+        stored_df.loc[rows[differs], content_columns + ['content_hash']] = \
+            fetched_df.loc[differs, content_columns + ['content_hash']].to_numpy()
+        stored_df.loc[rows, 'change_count'] = stored_df.loc[rows, 'change_count'].fillna(0).to_numpy() + changed
+        stored_df.loc[rows, 'fetch_count'] = stored_df.loc[rows, 'fetch_count'].fillna(0).to_numpy() + 1
+        stored_df.loc[rows, 'last_fetched_at'] = fetched_at
+        return int(changed.sum())
+    
+    def _lead_refreshes_file(self):
+        """
+        Get the path of the file queuing refreshes of stored leads in file mode
+        
+        Returns:
+            str: Path to the JSON Lines file
+        """
+        return os.path.join(self.data_dir, "lead_refreshes.jsonl")
+    
+    @timed_storage("apply_lead_refreshes")
+    def apply_lead_refreshes(self):
+        """
+        Write the queued refreshes of stored leads to storage
+        
+        In file mode upsert_leads queues re-fetched leads that are already
+        stored, and this applies them, batch by batch, in a single rewrite of
+        leads.csv. The ingest pipeline calls it when a run ends. In database
+        mode refreshes are written by upsert_leads and there is nothing to do.
+        
+        Returns:
+            int: Number of refreshes applied, or None if applying them failed
+        """
+        try:
+            if self.storage_type == "file":
+                refreshes_path = self._lead_refreshes_file()
+                file_path = os.path.join(self.data_dir, "leads.csv")
+                if not os.path.exists(refreshes_path):
+                    return 0
+                
+                refreshes_df = pd.DataFrame(list(iter_jsonl(refreshes_path)))
+                applied = 0
+                if not refreshes_df.empty and os.path.exists(file_path):
+                    stored_df = pd.read_csv(file_path)
+                    # Leads deleted since they were queued are skipped
+                    refreshes_df = refreshes_df[refreshes_df['profile_url'].isin(stored_df['profile_url'])]
+                    
+                    # Each upsert queued one batch with its own fetch time, applied in order
+                    for fetched_at, batch in refreshes_df.groupby('last_fetched_at', sort=False):
+                        self._refresh_stored_leads(stored_df, batch.reset_index(drop=True), fetched_at)
+                        applied += len(batch)
+                    
+                    if applied:
+                        stored_df.to_csv(file_path, index=False)
+                
+                os.remove(refreshes_path)
+                self.logger.info(f"Applied {applied} queued lead refreshes to {file_path}")
+                return applied
+            elif self.storage_type == "database":
+                return 0
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return None
+        except Exception as e:
+            self.logger.error(f"Error applying lead refreshes: {str(e)}")
+            return None
+    
+    def _append_search_run_leads_file(self, run_id, profile_urls, is_new):
+        """
+        Append the links between a search run and the leads it found to the links file
+        
+        Args:
+            run_id (str): Search run that found the leads
+            profile_urls (Series): Profile URLs of the leads
+            is_new (Series): Whether each lead was new when the run found it
+        """
+        file_path = os.path.join(self.data_dir, "search_run_leads.csv")
+        links_df = pd.DataFrame({
+            'run_id': run_id,
+            'profile_url': profile_urls.values,
+            'found_at': datetime.now().isoformat(),
+            'is_new': is_new.astype(int).values
+        })
+        
+        if os.path.exists(file_path):
+            # A lead found twice by the same run keeps its first link
+            linked = pd.read_csv(file_path, usecols=['run_id', 'profile_url'])
+            linked = linked.loc[linked['run_id'] == run_id, 'profile_url']
+            links_df = links_df[~links_df['profile_url'].isin(linked)]
+        
+        links_df.to_csv(file_path, mode="a", header=not os.path.exists(file_path), index=False)
+    
+    def _ensure_search_run_leads_table(self, conn):
+        """
+        Create the table linking search runs to the leads they found
+        
+        Args:
+            conn (sqlite3.Connection): Writer connection
+        """
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_run_leads (
+            run_id TEXT NOT NULL,
+            profile_url TEXT NOT NULL,
+            found_at TEXT NOT NULL,
+            is_new INTEGER NOT NULL,
+            PRIMARY KEY (run_id, profile_url)
+        ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_run_leads_profile_url ON search_run_leads (profile_url)")
+    
+    def _search_history_file(self):
+        """
+        Get the path of the search history file, migrating the legacy JSON file if needed
+        
+        Returns:
+            str: Path to the JSON Lines search history file
+        """
+        file_path = os.path.join(self.data_dir, "search_history.jsonl")
+        legacy_path = os.path.join(self.data_dir, "search_history.json")
+        
+        if not os.path.exists(file_path) and os.path.exists(legacy_path):
+            with open(legacy_path, "r") as f:
+                search_history = json.load(f)
+            self._write_search_history_file(file_path, search_history)
+            os.remove(legacy_path)
+            self.logger.info(f"Migrated {len(search_history)} search history entries to {file_path}")
+        
+        return file_path
+    
+    def _write_search_history_file(self, file_path, search_history):
+        """
+        Rewrite the search history file with the given entries
+        
+        Args:
+            file_path (str): Path to the JSON Lines file
+            search_history (list): List of search history entries
+        """
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            for entry in search_history:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, file_path)
+    
+    def _ensure_search_history_table(self, conn):
+        """
+        Create the search history table and its date index, adding any missing columns
+        
+        Args:
+            conn (sqlite3.Connection): Writer connection
+        """
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keywords TEXT,
+            location TEXT,
+            date TEXT,
+            results INTEGER
+        )
+        """)
+        
+        # Tables created before timing stats were recorded lack the newer columns
+        table_columns = {row[1] for row in conn.execute("PRAGMA table_info(search_history)")}
+        for column, column_type in SEARCH_HISTORY_COLUMNS.items():
+            if column not in table_columns:
+                conn.execute(f"ALTER TABLE search_history ADD COLUMN {column} {column_type}")
+        
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_date ON search_history (date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_run_id ON search_history (run_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_query ON search_history (keywords, location)")
+    
+    @staticmethod
+    def _search_history_row(entry):
+        return tuple(entry.get(column) for column in SEARCH_HISTORY_COLUMNS)
+    
+    @timed_storage("append_search_history")
+    def append_search_history(self, entry):
+        """
+        Append a single search to the search history
+        
+        Args:
+            entry (dict): Search history entry with keywords, location, date and
+                results, plus optional result_limit, new_leads, duration_seconds and run_id
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if self.storage_type == "file":
+                # Append one line instead of rewriting the file
+                file_path = self._search_history_file()
+                with open(file_path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+                return True
+            elif self.storage_type == "database":
+                columns = ", ".join(SEARCH_HISTORY_COLUMNS)
+                placeholders = ", ".join("?" for _ in SEARCH_HISTORY_COLUMNS)
+                with self.db.writer() as conn:
+                    self._ensure_search_history_table(conn)
+                    conn.execute(
+                        f"INSERT INTO search_history ({columns}) VALUES ({placeholders})",
+                        self._search_history_row(entry)
+                    )
+                return True
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error appending search history: {str(e)}")
+            return False
+    
+    @timed_storage("save_search_history")
+    def save_search_history(self, search_history):
+        """
+        Replace the stored search history, e.g. when migrating between storage types
+        
+        Args:
+            search_history (list): List of search history entries
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = self._search_history_file()
+                self._write_search_history_file(file_path, search_history)
                 
-                # Connect to database
-                conn = sqlite3.connect(self.db_path)
+                self.logger.info(f"Saved {len(search_history)} search history entries to {file_path}")
+                return True
+            elif self.storage_type == "database":
+                columns = ", ".join(SEARCH_HISTORY_COLUMNS)
+                placeholders = ", ".join("?" for _ in SEARCH_HISTORY_COLUMNS)
+                with self.db.writer() as conn:
+                    self._ensure_search_history_table(conn)
+                    
+                    # Clear existing data
+                    conn.execute("DELETE FROM search_history")
+                    
+                    # Insert new data
+                    conn.executemany(
+                        f"INSERT INTO search_history ({columns}) VALUES ({placeholders})",
+                        [self._search_history_row(entry) for entry in search_history]
+                    )
                 
-                # Check if table exists
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='search_history'")
-                if cursor.fetchone():
-                    # Load from database
-                    cursor.execute("SELECT keywords, location, date, results FROM search_history")
-                    rows = cursor.fetchall()
+                self.logger.info(f"Saved {len(search_history)} search history entries to database {self.db_path}")
+                return True
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error saving search history: {str(e)}")
+            return False
+    
+    def _query_search_history(self, sql, params=()):
+        """
+        Run a query against the search history table
+        
+        Args:
+            sql (str): Query to run
+            params (tuple): Query parameters
+            
+        Returns:
+            list: Result rows, or None if the table doesn't exist
+        """
+        with self.db.reader() as conn:
+            table_columns = {row[1] for row in conn.execute("PRAGMA table_info(search_history)")}
+        
+        if not table_columns:
+            return None
+        if not set(SEARCH_HISTORY_COLUMNS) <= table_columns:
+            with self.db.writer() as conn:
+                self._ensure_search_history_table(conn)
+        
+        with self.db.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+    
+    @timed_storage("load_search_history")
+    def load_search_history(self):
+        """
+        Load search history from storage
+        
+        Returns:
+            list: List of search history entries, oldest first
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = self._search_history_file()
+                if os.path.exists(file_path):
+                    with open(file_path, "r") as f:
+                        search_history = [json.loads(line) for line in f if line.strip()]
                     
+                    self.logger.info(f"Loaded {len(search_history)} search history entries from {file_path}")
+                    return search_history
+                else:
+                    self.logger.warning(f"Search history file not found: {file_path}")
+                    return []
+            elif self.storage_type == "database":
+                columns = ", ".join(SEARCH_HISTORY_COLUMNS)
+                rows = self._query_search_history(f"SELECT {columns} FROM search_history ORDER BY id")
+                
+                if rows is not None:
                     # Convert to list of dictionaries
-                    search_history = [
-                        {
-                            "keywords": row[0],
-                            "location": row[1],
-                            "date": row[2],
-                            "results": row[3]
-                        }
-                        for row in rows
-                    ]
-                    
-                    # Close connection
-                    conn.close()
+                    search_history = [dict(zip(SEARCH_HISTORY_COLUMNS, row)) for row in rows]
                     
                     self.logger.info(f"Loaded {len(search_history)} search history entries from database {self.db_path}")
                     return search_history
                 else:
-                    # Close connection
-                    conn.close()
-                    
                     self.logger.warning(f"Search history table not found in database {self.db_path}")
                     return []
             else:
                 self.logger.error(f"Unsupported storage type: {self.storage_type}")
-                return []
+                return []
+        except Exception as e:
+            self.logger.error(f"Error loading search history: {str(e)}")
+            return []
+    
+    @timed_storage("load_recent_searches")
+    def load_recent_searches(self, limit=5, offset=0):
+        """
+        Load one page of the search history, newest first
+        
+        Args:
+            limit (int): Maximum number of entries to return
+            offset (int): Number of newer entries to skip
+            
+        Returns:
+            list: List of search history entries
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = self._search_history_file()
+                if not os.path.exists(file_path):
+                    return []
+                
+                # Read backwards from the end, so a page costs the same however long the history is
+                return list(itertools.islice(iter_jsonl_reversed(file_path), offset, offset + limit))
+            elif self.storage_type == "database":
+                columns = ", ".join(SEARCH_HISTORY_COLUMNS)
+                rows = self._query_search_history(
+                    f"SELECT {columns} FROM search_history ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+                    (limit, offset)
+                )
+                return [dict(zip(SEARCH_HISTORY_COLUMNS, row)) for row in rows or []]
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return []
+        except Exception as e:
+            self.logger.error(f"Error loading recent searches: {str(e)}")
+            return []
+    
+    def count_search_history(self):
+        """
+        Count the stored search history entries
+        
+        Returns:
+            int: Number of entries
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.abspath(self._search_history_file())
+                if not os.path.exists(file_path):
+                    return 0
+                
+                stat = os.stat(file_path)
+                with _search_history_counts_lock:
+                    inode, counted, lines = _search_history_counts.get(file_path, (None, 0, 0))
+                    if inode != stat.st_ino or counted > stat.st_size:
+                        # The file was replaced or truncated; count it again
+                        counted, lines = 0, 0
+                    lines += count_lines(file_path, start=counted, end=stat.st_size)
+                    _search_history_counts[file_path] = (stat.st_ino, stat.st_size, lines)
+                return lines
+            elif self.storage_type == "database":
+                rows = self._query_search_history("SELECT COUNT(*) FROM search_history")
+                return rows[0][0] if rows else 0
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return 0
+        except Exception as e:
+            self.logger.error(f"Error counting search history: {str(e)}")
+            return 0
+    
+    def get_search_history_stats(self):
+        """
+        Calculate timing and result statistics over the search history
+        
+        Returns:
+            dict: Dictionary containing statistics
+        """
+        stats = {
+            'total_searches': 0,
+            'total_results': 0,
+            'avg_results': 0,
+            'total_new_leads': 0,
+            'avg_duration_seconds': None,
+            'max_duration_seconds': None
+        }
+        
+        try:
+            if self.storage_type == "file":
+                totals = self._search_history_file_totals()
+                if not totals['searches']:
+                    return stats
+                row = (
+                    totals['searches'],
+                    totals['results'],
+                    totals['results'] / totals['with_results'] if totals['with_results'] else None,
+                    totals['new_leads'],
+                    totals['duration'] / totals['with_duration'] if totals['with_duration'] else None,
+                    totals['max_duration']
+                )
+            elif self.storage_type == "database":
+                rows = self._query_search_history("""
+                SELECT COUNT(*), SUM(results), AVG(results), SUM(new_leads), AVG(duration_seconds), MAX(duration_seconds)
+                FROM search_history
+                """)
+                if not rows or not rows[0][0]:
+                    return stats
+                row = rows[0]
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return stats
+        except Exception as e:
+            self.logger.error(f"Error calculating search history statistics: {str(e)}")
+            return stats
+        
+        def number(value):
+            return None if value is None or pd.isna(value) else float(value)
+        
+        stats['total_searches'] = int(row[0])
+        stats['total_results'] = int(number(row[1]) or 0)
+        stats['avg_results'] = round(number(row[2]) or 0, 2)
+        stats['total_new_leads'] = int(number(row[3]) or 0)
+        stats['avg_duration_seconds'] = number(row[4])
+        stats['max_duration_seconds'] = number(row[5])
+        return stats
+    
+    def _search_history_file_totals(self):
+        """
+        Get running totals over the search history file
+        
+        The totals are kept per file and only the entries appended since the
+        last call are parsed; a replaced or truncated file is read again.
+        
+        Returns:
+            dict: Number of searches, sums and counts of results, new leads and durations
+        """
+        file_path = os.path.abspath(self._search_history_file())
+        totals = {
+            'searches': 0, 'results': 0, 'with_results': 0, 'new_leads': 0,
+            'duration': 0, 'with_duration': 0, 'max_duration': None
+        }
+        if not os.path.exists(file_path):
+            return totals
+        
+        def number(value):
+            return None if value is None or pd.isna(value) else float(value)
+        
+        with _search_history_totals_lock:
+            stat = os.stat(file_path)
+            inode, offset, cached = _search_history_totals.get(file_path, (None, 0, None))
+            if cached is not None and inode == stat.st_ino and offset <= stat.st_size:
+                totals = dict(cached)
+            else:
+                # The file is new, replaced or truncated; read it again
+                offset = 0
+            
+            with open(file_path, "rb") as f:
+                f.seek(offset)
+                appended = f.read(stat.st_size - offset)
+            # Leave a line that is still being written for the next call
+            complete = appended.rfind(b"\n") + 1
+            for line in appended[:complete].splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                totals['searches'] += 1
+                results = number(entry.get('results'))
+                if results is not None:
+                    totals['results'] += results
+                    totals['with_results'] += 1
+                totals['new_leads'] += number(entry.get('new_leads')) or 0
+                duration = number(entry.get('duration_seconds'))
+                if duration is not None:
+                    totals['duration'] += duration
+                    totals['with_duration'] += 1
+                    totals['max_duration'] = max(duration, totals['max_duration'] or duration)
+            
+            _search_history_totals[file_path] = (stat.st_ino, offset + complete, totals)
+        return dict(totals)
+    
+    def _has_table(self, name):
+        """
+        Check whether a table exists in the database
+        
+        Args:
+            name (str): Table name
+            
+        Returns:
+            bool: True if the table exists
+        """
+        with self.db.reader() as conn:
+            return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone() is not None
+    
+    @timed_storage("get_run_leads")
+    def get_run_leads(self, run_id, new_only=True):
+        """
+        Get the leads found by a search run
+        
+        Args:
+            run_id (str): Search run ID
+            new_only (bool): Only return leads the run was the first to find
+            
+        Returns:
+            DataFrame: Leads found by the run
+        """
+        try:
+            if self.storage_type == "file":
+                links_path = os.path.join(self.data_dir, "search_run_leads.csv")
+                leads_path = os.path.join(self.data_dir, "leads.csv")
+                if not os.path.exists(links_path) or not os.path.exists(leads_path):
+                    return pd.DataFrame()
+                
+                links = pd.read_csv(links_path)
+                links = links[links['run_id'] == run_id]
+                if new_only:
+                    links = links[links['is_new'] == 1]
+                
+                leads_df = pd.read_csv(leads_path)
+                return leads_df[leads_df['profile_url'].isin(links['profile_url'])].reset_index(drop=True)
+            elif self.storage_type == "database":
+                if not self._has_table("search_run_leads") or not self._has_table("leads"):
+                    return pd.DataFrame()
+                
+                query = """
+                SELECT leads.* FROM search_run_leads
+                JOIN leads ON leads.profile_url = search_run_leads.profile_url
+                WHERE search_run_leads.run_id = ?
+                """
+                if new_only:
+                    query += " AND search_run_leads.is_new = 1"
+                
+                with self.db.reader() as conn:
+                    return pd.read_sql(query, conn, params=(run_id,))
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return pd.DataFrame()
+        except Exception as e:
+            self.logger.error(f"Error loading leads for run {run_id}: {str(e)}")
+            return pd.DataFrame()
+    
+    @timed_storage("get_search_yield")
+    def get_search_yield(self):
+        """
+        Calculate how many new leads each keyword/location query has produced
+        
+        Only searches recorded with a run_id are counted.
+        
+        Returns:
+            DataFrame: One row per query with keywords, location, runs, leads_found,
+                new_leads, new_per_run and last_run, highest yield first
+        """
+        columns = ['keywords', 'location', 'runs', 'leads_found', 'new_leads', 'new_per_run', 'last_run']
+        
+        try:
+            if self.storage_type == "file":
+                search_history = pd.DataFrame(self.load_search_history(), columns=list(SEARCH_HISTORY_COLUMNS))
+                search_history = search_history.dropna(subset=['run_id'])
+                if search_history.empty:
+                    return pd.DataFrame(columns=columns)
+                
+                links_path = os.path.join(self.data_dir, "search_run_leads.csv")
+                if os.path.exists(links_path):
+                    links = pd.read_csv(links_path)
+                else:
+                    links = pd.DataFrame(columns=SEARCH_RUN_LEAD_COLUMNS)
+                
+                per_run = links.groupby('run_id').agg(leads_found=('profile_url', 'size'), new_leads=('is_new', 'sum'))
+                runs = search_history[['keywords', 'location', 'date', 'run_id']].join(per_run, on='run_id')
+                runs[['leads_found', 'new_leads']] = runs[['leads_found', 'new_leads']].fillna(0)
+                runs['location'] = runs['location'].fillna('')
+                
+                yield_df = runs.groupby(['keywords', 'location'], as_index=False).agg(
+                    runs=('run_id', 'nunique'),
+                    leads_found=('leads_found', 'sum'),
+                    new_leads=('new_leads', 'sum'),
+                    last_run=('date', 'max')
+                )
+                yield_df['new_per_run'] = yield_df['new_leads'] / yield_df['runs']
+            elif self.storage_type == "database":
+                if not self._has_table("search_history"):
+                    return pd.DataFrame(columns=columns)
+                
+                with self.db.reader() as conn:
+                    history_columns = {row[1] for row in conn.execute("PRAGMA table_info(search_history)")}
+                if 'run_id' not in history_columns or not self._has_table("search_run_leads"):
+                    with self.db.writer() as conn:
+                        self._ensure_search_history_table(conn)
+                        self._ensure_search_run_leads_table(conn)
+                
+                with self.db.reader() as conn:
+                    yield_df = pd.read_sql("""
+                    SELECT
+                        history.keywords,
+                        COALESCE(history.location, '') AS location,
+                        COUNT(DISTINCT history.run_id) AS runs,
+                        COUNT(links.profile_url) AS leads_found,
+                        COALESCE(SUM(links.is_new), 0) AS new_leads,
+                        MAX(history.date) AS last_run
+                    FROM search_history AS history
+                    LEFT JOIN search_run_leads AS links ON links.run_id = history.run_id
+                    WHERE history.run_id IS NOT NULL
+                    GROUP BY history.keywords, COALESCE(history.location, '')
+                    """, conn)
+                yield_df['new_per_run'] = yield_df['new_leads'] / yield_df['runs']
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return pd.DataFrame(columns=columns)
+        except Exception as e:
+            self.logger.error(f"Error calculating search yield: {str(e)}")
+            return pd.DataFrame(columns=columns)
+        
+        yield_df[['leads_found', 'new_leads']] = yield_df[['leads_found', 'new_leads']].astype(int)
+        yield_df['new_per_run'] = yield_df['new_per_run'].round(2)
+        return yield_df[columns].sort_values(['new_per_run', 'last_run'], ascending=False).reset_index(drop=True)
+    
+    @timed_storage("get_lead_freshness")
+    def get_lead_freshness(self):
+        """
+        Get when each stored lead was last fetched, with the searches that can fetch it again
+        
+        Only leads linked to a search run are included; a lead found by several
+        queries has one row per query.
+        
+        Returns:
+            DataFrame: DataFrame with keywords, location, result_limit, profile_url,
+                last_fetched_at, fetch_count and change_count
+        """
+        columns = ['keywords', 'location', 'result_limit', 'profile_url', 'last_fetched_at', 'fetch_count', 'change_count']
+        
+        try:
+            if self.storage_type == "file":
+                links_path = os.path.join(self.data_dir, "search_run_leads.csv")
+                leads_path = os.path.join(self.data_dir, "leads.csv")
+                search_history = pd.DataFrame(self.load_search_history(), columns=list(SEARCH_HISTORY_COLUMNS))
+                search_history = search_history.dropna(subset=['run_id'])
+                if search_history.empty or not os.path.exists(links_path) or not os.path.exists(leads_path):
+                    return pd.DataFrame(columns=columns)
+                
+                links = pd.read_csv(links_path, usecols=['run_id', 'profile_url', 'found_at'])
+                leads_df = pd.read_csv(leads_path).reindex(columns=['profile_url', 'last_fetched_at', 'fetch_count', 'change_count'])
+                
+                search_history['location'] = search_history['location'].fillna('')
+                search_history['result_limit'] = search_history['result_limit'].fillna(search_history['results'])
+                runs = search_history[['keywords', 'location', 'result_limit', 'run_id']].merge(links, on='run_id')
+                freshness = runs.groupby(['keywords', 'location', 'profile_url'], as_index=False).agg(
+                    result_limit=('result_limit', 'max'),
+                    found_at=('found_at', 'max')
+                ).merge(leads_df, on='profile_url')
+                freshness['last_fetched_at'] = freshness['last_fetched_at'].fillna(freshness['found_at'])
+            elif self.storage_type == "database":
+                if not all(self._has_table(table) for table in ("search_history", "search_run_leads", "leads")):
+                    return pd.DataFrame(columns=columns)
+                
+                # Leads stored before freshness was tracked count as fetched when they were found
+                with self.db.reader() as conn:
+                    lead_columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+                    tracked = {column: f"leads.{column}" if column in lead_columns else "NULL"
+                               for column in ('last_fetched_at', 'fetch_count', 'change_count')}
+                    freshness = pd.read_sql(f"""
+                    SELECT
+                        history.keywords,
+                        COALESCE(history.location, '') AS location,
+                        MAX(COALESCE(history.result_limit, history.results)) AS result_limit,
+                        links.profile_url,
+                        COALESCE({tracked['last_fetched_at']}, MAX(links.found_at)) AS last_fetched_at,
+                        {tracked['fetch_count']} AS fetch_count,
+                        {tracked['change_count']} AS change_count
+                    FROM search_history AS history
+                    JOIN search_run_leads AS links ON links.run_id = history.run_id
+                    JOIN leads ON leads.profile_url = links.profile_url
+                    WHERE history.run_id IS NOT NULL
+                    GROUP BY history.keywords, COALESCE(history.location, ''), links.profile_url
+                    """, conn)
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return pd.DataFrame(columns=columns)
+        except Exception as e:
+            self.logger.error(f"Error loading lead freshness: {str(e)}")
+            return pd.DataFrame(columns=columns)
+        
+        freshness[['fetch_count', 'change_count']] = freshness[['fetch_count', 'change_count']].fillna({'fetch_count': 1, 'change_count': 0})
+        return freshness[columns]
+    
+    @timed_storage("load_search_run_leads")
+    def load_search_run_leads(self):
+        """
+        Load the links between search runs and the leads they found
+        
+        Returns:
+            DataFrame: DataFrame with run_id, profile_url, found_at and is_new
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "search_run_leads.csv")
+                if os.path.exists(file_path):
+                    return pd.read_csv(file_path)
+                return pd.DataFrame(columns=SEARCH_RUN_LEAD_COLUMNS)
+            elif self.storage_type == "database":
+                if not self._has_table("search_run_leads"):
+                    return pd.DataFrame(columns=SEARCH_RUN_LEAD_COLUMNS)
+                with self.db.reader() as conn:
+                    return pd.read_sql(f"SELECT {', '.join(SEARCH_RUN_LEAD_COLUMNS)} FROM search_run_leads", conn)
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return pd.DataFrame(columns=SEARCH_RUN_LEAD_COLUMNS)
+        except Exception as e:
+            self.logger.error(f"Error loading search run links: {str(e)}")
+            return pd.DataFrame(columns=SEARCH_RUN_LEAD_COLUMNS)
+    
+    @timed_storage("save_search_run_leads")
+    def save_search_run_leads(self, links_df):
+        """
+        Replace the stored links between search runs and leads, e.g. when migrating between storage types
+        
+        Args:
+            links_df (DataFrame): DataFrame with run_id, profile_url, found_at and is_new
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        links_df = links_df.reindex(columns=SEARCH_RUN_LEAD_COLUMNS)
+        
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "search_run_leads.csv")
+                links_df.to_csv(file_path, index=False)
+                return True
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    self._ensure_search_run_leads_table(conn)
+                    conn.execute("DELETE FROM search_run_leads")
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO search_run_leads (run_id, profile_url, found_at, is_new) VALUES (?, ?, ?, ?)",
+                        links_df.astype(object).itertuples(index=False, name=None)
+                    )
+                return True
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error saving search run links: {str(e)}")
+            return False
+    
+    def _ensure_job_tables(self, conn):
+        """
+        Create the jobs, companies and job criteria tables and their indexes
+        
+        Args:
+            conn (sqlite3.Connection): Writer connection
+        """
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS companies (
+            id INTEGER PRIMARY KEY,
+            company_key TEXT NOT NULL UNIQUE,
+            name TEXT,
+            url TEXT
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            title TEXT,
+            company_id INTEGER REFERENCES companies (id),
+            location TEXT,
+            url TEXT,
+            description TEXT,
+            application_type TEXT,
+            posting_date TEXT,
+            first_seen_at TEXT
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_criteria (
+            job_id TEXT NOT NULL REFERENCES jobs (job_id),
+            name TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (job_id, name)
+        ) WITHOUT ROWID
+        """)
+        
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_name ON companies (name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company_id ON jobs (company_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (location)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_posting_date ON jobs (posting_date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_job_criteria_name_value ON job_criteria (name, value)")
+    
+    @timed_storage("upsert_jobs")
+    def upsert_jobs(self, jobs):
+        """
+        Store job listings, skipping jobs whose ID is already stored
+        
+        Listings are split into jobs, companies and criteria; each company is
+        stored once and shared by its jobs.
+        
+        Args:
+            jobs (list): Job listings as returned by the scraper's search_jobs
+        
+        Returns:
+            int: Number of new jobs stored, or None if the upsert failed
+        """
+        jobs_df, companies_df, criteria_df = normalize_jobs(jobs, self.companies)
+        self.companies.save()
+        if jobs_df.empty:
+            return 0
+        
+        try:
+            if self.storage_type == "file":
+                paths = self._job_files()
+                if os.path.exists(paths['jobs']):
+                    # Only the key columns are needed to find the new rows
+                    stored_ids = pd.read_csv(paths['jobs'], usecols=['job_id'], dtype=str)['job_id']
+                    jobs_df = jobs_df[~jobs_df['job_id'].isin(stored_ids)]
+                    criteria_df = criteria_df[criteria_df['job_id'].isin(jobs_df['job_id'])]
+                if os.path.exists(paths['companies']):
+                    stored_keys = pd.read_csv(paths['companies'], usecols=['company_key'], dtype=str)['company_key']
+                    companies_df = companies_df[~companies_df['company_key'].isin(stored_keys)]
+                
+                for name, df in (('jobs', jobs_df), ('companies', companies_df), ('criteria', criteria_df)):
+                    df.to_csv(paths[name], mode="a", header=not os.path.exists(paths[name]), index=False)
+                inserted = len(jobs_df)
+                target = paths['jobs']
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    self._ensure_job_tables(conn)
+                    
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO companies (company_key, name, url) VALUES (?, ?, ?)",
+                        companies_df.astype(object).where(companies_df.notna(), None).itertuples(index=False, name=None)
+                    )
+                    
+                    changes_before = conn.total_changes
+                    conn.executemany(
+                        """
+                        INSERT OR IGNORE INTO jobs
+                            (job_id, title, company_id, location, url, description, application_type, posting_date, first_seen_at)
+                        VALUES (?, ?, (SELECT id FROM companies WHERE company_key = ?), ?, ?, ?, ?, ?, ?)
+                        """,
+                        jobs_df.astype(object).where(jobs_df.notna(), None).itertuples(index=False, name=None)
+                    )
+                    inserted = conn.total_changes - changes_before
+                    
+                    # Criteria of jobs that were already stored are left as they are
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO job_criteria (job_id, name, value) VALUES (?, ?, ?)",
+                        criteria_df.astype(object).where(criteria_df.notna(), None).itertuples(index=False, name=None)
+                    )
+                target = f"database {self.db_path}"
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return None
+        except Exception as e:
+            self.logger.error(f"Error upserting jobs: {str(e)}")
+            return None
+        
+        self.logger.info(f"Upserted {inserted} new jobs to {target}")
+        return inserted
+    
+    def _job_files(self):
+        """
+        Get the paths of the job storage files
+        
+        Returns:
+            dict: Paths of the jobs, companies and criteria CSV files
+        """
+        return {
+            'jobs': os.path.join(self.data_dir, "jobs.csv"),
+            'companies': os.path.join(self.data_dir, "companies.csv"),
+            'criteria': os.path.join(self.data_dir, "job_criteria.csv")
+        }
+    
+    def _load_job_files(self):
+        """
+        Load the job storage files, with each job joined to its company
+        
+        Returns:
+            tuple: (jobs DataFrame, criteria DataFrame)
+        """
+        paths = self._job_files()
+        if not os.path.exists(paths['jobs']):
+            return pd.DataFrame(columns=JOB_COLUMNS), pd.DataFrame(columns=['job_id', 'name', 'value'])
+        
+        jobs_df = pd.read_csv(paths['jobs'], dtype={'job_id': str})
+        companies_df = pd.read_csv(paths['companies'], dtype=str)
+        jobs_df = jobs_df.merge(
+            companies_df.rename(columns={'name': 'company', 'url': 'company_url'}), on='company_key', how='left'
+        )
+        criteria_df = pd.read_csv(paths['criteria'], dtype=str) if os.path.exists(paths['criteria']) \
+            else pd.DataFrame(columns=['job_id', 'name', 'value'])
+        return jobs_df[JOB_COLUMNS], criteria_df
+    
+    @staticmethod
+    def _job_filter_sql(keywords=None, company=None, location=None, criteria=None):
+        """
+        Build the WHERE clause for a job query
+        
+        Returns:
+            tuple: (SQL condition, parameters)
+        """
+        conditions = []
+        params = []
+        if keywords:
+            conditions.append("jobs.title LIKE ?")
+            params.append(f"%{keywords}%")
+        if company:
+            conditions.append("companies.name = ?")
+            params.append(company)
+        if location:
+            conditions.append("jobs.location = ?")
+            params.append(location)
+        for name, value in (criteria or {}).items():
+            if value:
+                conditions.append("jobs.job_id IN (SELECT job_id FROM job_criteria WHERE name = ? AND value = ?)")
+                params.extend([name, value])
+        return (" AND ".join(conditions) or "1"), params
+    
+    @staticmethod
+    def _filter_job_frame(jobs_df, criteria_df, keywords=None, company=None, location=None, criteria=None):
+        """
+        Apply job query filters to loaded job files
+        
+        Returns:
+            DataFrame: Matching jobs
+        """
+        mask = pd.Series(True, index=jobs_df.index)
+        if keywords:
+            mask &= jobs_df['title'].str.contains(keywords, case=False, na=False, regex=False)
+        if company:
+            mask &= jobs_df['company'] == company
+        if location:
+            mask &= jobs_df['location'] == location
+        for name, value in (criteria or {}).items():
+            if value:
+                matching = criteria_df.loc[(criteria_df['name'] == name) & (criteria_df['value'] == value), 'job_id']
+                mask &= jobs_df['job_id'].isin(matching)
+        return jobs_df[mask]
+    
+    @staticmethod
+    def _with_criteria_columns(jobs_df, criteria_df):
+        """
+        Add one column per criterion to a page of jobs
+        
+        Returns:
+            DataFrame: Jobs with their criteria as columns
+        """
+        criteria_df = criteria_df[criteria_df['job_id'].isin(jobs_df['job_id'])]
+        if criteria_df.empty:
+            return jobs_df.reset_index(drop=True)
+        wide = criteria_df.pivot(index='job_id', columns='name', values='value')
+        return jobs_df.join(wide, on='job_id').reset_index(drop=True)
+    
+    @timed_storage("query_jobs")
+    def query_jobs(self, keywords=None, company=None, location=None, criteria=None, limit=50, offset=0):
+        """
+        Query stored jobs, newest postings first
+        
+        Args:
+            keywords (str): Text the job title must contain
+            company (str): Exact company name
+            location (str): Exact job location
+            criteria (dict): Criterion values the jobs must have, e.g. {"Seniority level": "Entry level"}
+            limit (int): Maximum number of jobs to return (None for all)
+            offset (int): Number of jobs to skip
+        
+        Returns:
+            DataFrame: Matching jobs with their company and one column per criterion
+        """
+        filters = dict(keywords=keywords, company=company, location=location, criteria=criteria)
+        
+        try:
+            if self.storage_type == "file":
+                jobs_df, criteria_df = self._load_job_files()
+                jobs_df = self._filter_job_frame(jobs_df, criteria_df, **filters)
+                jobs_df = jobs_df.sort_values(['posting_date', 'job_id'], ascending=[False, True])
+                jobs_df = jobs_df.iloc[offset:None if limit is None else offset + limit]
+                return self._with_criteria_columns(jobs_df, criteria_df)
+            elif self.storage_type == "database":
+                if not self._has_table("jobs"):
+                    return pd.DataFrame(columns=JOB_COLUMNS)
+                
+                where, params = self._job_filter_sql(**filters)
+                with self.db.reader() as conn:
+                    jobs_df = pd.read_sql(
+                        f"""
+                        SELECT
+                            jobs.job_id, jobs.title, companies.name AS company, companies.url AS company_url,
+                            jobs.location, jobs.posting_date, jobs.application_type, jobs.url, jobs.description
+                        FROM jobs
+                        LEFT JOIN companies ON companies.id = jobs.company_id
+                        WHERE {where}
+                        ORDER BY jobs.posting_date DESC, jobs.job_id
+                        LIMIT ? OFFSET ?
+                        """,
+                        conn,
+                        params=params + [-1 if limit is None else limit, offset]
+                    )
+                    
+                    # Only the criteria of the returned page are loaded
+                    criteria_df = pd.DataFrame(columns=['job_id', 'name', 'value'])
+                    if not jobs_df.empty:
+                        job_ids = jobs_df['job_id'].tolist()
+                        criteria_df = pd.concat([
+                            pd.read_sql(
+                                f"SELECT job_id, name, value FROM job_criteria WHERE job_id IN ({', '.join('?' for _ in chunk)})",
+                                conn,
+                                params=chunk
+                            )
+                            for chunk in (job_ids[i:i + 500] for i in range(0, len(job_ids), 500))
+                        ])
+                return self._with_criteria_columns(jobs_df, criteria_df)
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return pd.DataFrame(columns=JOB_COLUMNS)
+        except Exception as e:
+            self.logger.error(f"Error querying jobs: {str(e)}")
+            return pd.DataFrame(columns=JOB_COLUMNS)
+    
+    def count_jobs(self, keywords=None, company=None, location=None, criteria=None):
+        """
+        Count the stored jobs matching the given filters
+        
+        Args:
+            keywords (str): Text the job title must contain
+            company (str): Exact company name
+            location (str): Exact job location
+            criteria (dict): Criterion values the jobs must have
+        
+        Returns:
+            int: Number of matching jobs
+        """
+        filters = dict(keywords=keywords, company=company, location=location, criteria=criteria)
+        
+        try:
+            if self.storage_type == "file":
+                jobs_df, criteria_df = self._load_job_files()
+                return len(self._filter_job_frame(jobs_df, criteria_df, **filters))
+            elif self.storage_type == "database":
+                if not self._has_table("jobs"):
+                    return 0
+                
+                where, params = self._job_filter_sql(**filters)
+                with self.db.reader() as conn:
+                    return conn.execute(
+                        f"SELECT COUNT(*) FROM jobs LEFT JOIN companies ON companies.id = jobs.company_id WHERE {where}",
+                        params
+                    ).fetchone()[0]
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return 0
+        except Exception as e:
+            self.logger.error(f"Error counting jobs: {str(e)}")
+            return 0
+    
+    def get_job_facets(self):
+        """
+        Get the values available for filtering jobs
+        
+        Returns:
+            dict: Sorted values for 'companies', 'locations' and each criterion name
+        """
+        try:
+            if self.storage_type == "file":
+                jobs_df, criteria_df = self._load_job_files()
+                facets = {
+                    'companies': sorted(jobs_df['company'].dropna().unique()),
+                    'locations': sorted(jobs_df['location'].dropna().unique())
+                }
+                for name, values in criteria_df.dropna().groupby('name')['value']:
+                    facets[name] = sorted(values.unique())
+                return facets
+            elif self.storage_type == "database":
+                if not self._has_table("jobs"):
+                    return {'companies': [], 'locations': []}
+                
+                # Each of these reads only an index
+                with self.db.reader() as conn:
+                    facets = {
+                        'companies': [row[0] for row in conn.execute(
+                            "SELECT DISTINCT name FROM companies WHERE name IS NOT NULL ORDER BY name")],
+                        'locations': [row[0] for row in conn.execute(
+                            "SELECT DISTINCT location FROM jobs WHERE location IS NOT NULL ORDER BY location")]
+                    }
+                    for name, value in conn.execute(
+                            "SELECT DISTINCT name, value FROM job_criteria WHERE value IS NOT NULL ORDER BY name, value"):
+                        facets.setdefault(name, []).append(value)
+                return facets
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return {'companies': [], 'locations': []}
+        except Exception as e:
+            self.logger.error(f"Error loading job facets: {str(e)}")
+            return {'companies': [], 'locations': []}
+    
+    @timed_storage("load_jobs")
+    def load_jobs(self):
+        """
+        Load every stored job in the scraper's job format, e.g. to migrate between storage types
+        
+        Returns:
+            list: List of job listings
+        """
+        jobs_df = self.query_jobs(limit=None)
+        criteria_names = [column for column in jobs_df.columns if column not in JOB_COLUMNS]
+        
+        jobs = []
+        for row in jobs_df.astype(object).where(jobs_df.notna(), None).to_dict("records"):
+            jobs.append({
+                'id': row['job_id'],
+                'title': row['title'],
+                'company': row['company'],
+                'location': row['location'],
+                'url': row['url'],
+                'description': row['description'],
+                'criteria': {name: row[name] for name in criteria_names if row[name] is not None},
+                'application_type': row['application_type'],
+                'company_details': {"url": row['company_url']},
+                'posting_date': row['posting_date']
+            })
+        return jobs
+    
+    @timed_storage("delete_jobs")
+    def delete_jobs(self, job_ids=None):
+        """
+        Delete stored jobs and their criteria
+        
+        Args:
+            job_ids (list): IDs of the jobs to delete (None to delete every job)
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if self.storage_type == "file":
+                paths = self._job_files()
+                for name in ('jobs', 'criteria', 'companies'):
+                    if not os.path.exists(paths[name]):
+                        continue
+                    if job_ids is None:
+                        os.remove(paths[name])
+                    elif name != 'companies':
+                        df = pd.read_csv(paths[name], dtype={'job_id': str})
+                        df[~df['job_id'].isin([str(job_id) for job_id in job_ids])].to_csv(paths[name], index=False)
+                return True
+            elif self.storage_type == "database":
+                if not self._has_table("jobs"):
+                    return True
+                
+                with self.db.writer() as conn:
+                    if job_ids is None:
+                        conn.execute("DELETE FROM job_criteria")
+                        conn.execute("DELETE FROM jobs")
+                        conn.execute("DELETE FROM companies")
+                    else:
+                        rows = [(str(job_id),) for job_id in job_ids]
+                        conn.executemany("DELETE FROM job_criteria WHERE job_id = ?", rows)
+                        conn.executemany("DELETE FROM jobs WHERE job_id = ?", rows)
+                return True
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error deleting jobs: {str(e)}")
+            return False
+    
+    @timed_storage("save_filters")
+    def save_filters(self, filters):
+        """
+        Save filters to storage
+        
+        Args:
+            filters (list): List of filter dictionaries
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if self.storage_type == "file":
+                # Save to JSON file
+                file_path = os.path.join(self.data_dir, "filters.json")
+                with open(file_path, "w") as f:
+                    json.dump(filters, f)
+                
+                self.logger.info(f"Saved {len(filters)} filters to {file_path}")
+                return True
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    # Create table if it doesn't exist
+                    conn.execute("""
+                    CREATE TABLE IF NOT EXISTS filters (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        filter_data TEXT
+                    )
+                    """)
+                    
+                    # Clear existing data
+                    conn.execute("DELETE FROM filters")
+                    
+                    # Insert new data
+                    for filter_item in filters:
+                        conn.execute(
+                            "INSERT INTO filters (filter_data) VALUES (?)",
+                            (json.dumps(filter_item),)
+                        )
+                
+                self.logger.info(f"Saved {len(filters)} filters to database {self.db_path}")
+                return True
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error saving filters: {str(e)}")
+            return False
+    
+    @timed_storage("load_filters")
+    def load_filters(self):
+        """
+        Load filters from storage
+        
+        Returns:
+            list: List of filter dictionaries
+        """
+        try:
+            if self.storage_type == "file":
+                # Load from JSON file
+                file_path = os.path.join(self.data_dir, "filters.json")
+                if os.path.exists(file_path):
+                    with open(file_path, "r") as f:
+                        filters = json.load(f)
+                    
+                    self.logger.info(f"Loaded {len(filters)} filters from {file_path}")
+                    return filters
+                else:
+                    self.logger.warning(f"Filters file not found: {file_path}")
+                    return []
+            elif self.storage_type == "database":
+                with self.db.reader() as conn:
+                    # Check if table exists
+                    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='filters'")
+                    table_exists = cursor.fetchone() is not None
+                    if table_exists:
+                        # Load from database
+                        rows = conn.execute("SELECT filter_data FROM filters").fetchall()
+                
+                if table_exists:
+                    # Convert to list of dictionaries
+                    filters = [json.loads(row[0]) for row in rows]
+                    
+                    self.logger.info(f"Loaded {len(filters)} filters from database {self.db_path}")
+                    return filters
+                else:
+                    self.logger.warning(f"Filters table not found in database {self.db_path}")
+                    return []
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return []
+        except Exception as e:
+            self.logger.error(f"Error loading filters: {str(e)}")
+            return []
+    
+    @timed_storage("save_qualification_rules")
+    def save_qualification_rules(self, config):
+        """
+        Save the auto-qualification settings to storage
+        
+        Args:
+            config (dict): enabled flag plus the rules and threshold of QualificationRules.to_dict()
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # Fail before storing rules that cannot be compiled
+            QualificationRules.from_dict(config)
+            
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "qualification_rules.json")
+                with open(file_path, "w") as f:
+                    json.dump(config, f)
+                
+                self.logger.info(f"Saved {len(config.get('rules', []))} qualification rules to {file_path}")
+                return True
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    conn.execute("""
+                    CREATE TABLE IF NOT EXISTS qualification_rules (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        rules_data TEXT
+                    )
+                    """)
+                    conn.execute(
+                        "INSERT INTO qualification_rules (id, rules_data) VALUES (1, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET rules_data = excluded.rules_data",
+                        (json.dumps(config),)
+                    )
+                
+                self.logger.info(f"Saved {len(config.get('rules', []))} qualification rules to database {self.db_path}")
+                return True
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Error saving qualification rules: {str(e)}")
+            return False
+        finally:
+            # Compiled rules are reloaded on next use, also if saving failed halfway
+            with _qualification_rules_lock:
+                _qualification_rules.pop(self._qualification_rules_key()[0], None)
+    
+    def load_qualification_rules(self):
+        """
+        Load the auto-qualification settings from storage
+        
+        Returns:
+            dict: enabled flag, rules and threshold (empty if none are saved)
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "qualification_rules.json")
+                if not os.path.exists(file_path):
+                    return {}
+                with open(file_path, "r") as f:
+                    return json.load(f)
+            elif self.storage_type == "database":
+                with self.db.reader() as conn:
+                    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='qualification_rules'")
+                    row = conn.execute("SELECT rules_data FROM qualification_rules WHERE id = 1").fetchone() if cursor.fetchone() else None
+                return json.loads(row[0]) if row else {}
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return {}
+        except Exception as e:
+            self.logger.error(f"Error loading qualification rules: {str(e)}")
+            return {}
+    
+    def get_qualification_rules(self):
+        """
+        Get the compiled auto-qualification rules
+        
+        Rules are loaded and compiled once and shared by the process until
+        they are saved again (or, in file mode, their file changes).
+        
+        Returns:
+            QualificationRules: Saved rules, or None if auto-qualification is off
+        """
+        key, stamp = self._qualification_rules_key()
+        with _qualification_rules_lock:
+            cached = _qualification_rules.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        config = self.load_qualification_rules()
+        rules = QualificationRules.from_dict(config) if config.get('enabled') and config.get('rules') else None
+        with _qualification_rules_lock:
+            _qualification_rules[key] = (stamp, rules)
+        return rules
+    
+    def _qualification_rules_key(self):
+        """
+        Identify where the qualification rules are stored
+        
+        Returns:
+            tuple: (cache key, stamp of the rules file in file mode, or None)
+        """
+        if self.storage_type == "file":
+            file_path = os.path.abspath(os.path.join(self.data_dir, "qualification_rules.json"))
+            return file_path, file_stamp(file_path)
+        return os.path.abspath(self.db_path), None
+    
+    def _iter_lead_chunks(self, columns, chunk_size):
+        """
+        Read stored leads a chunk at a time, e.g. to re-score all of them
+        
+        Args:
+            columns (list): Columns to read; columns that are not stored are skipped
+            chunk_size (int): Number of leads per chunk
+        
+        Yields:
+            DataFrame: Chunk of leads
+        """
+        if self.storage_type == "file":
+            file_path = os.path.join(self.data_dir, "leads.csv")
+            if not os.path.exists(file_path):
+                return
+            yield from pd.read_csv(file_path, usecols=lambda column: column in columns, chunksize=chunk_size)
+        elif self.storage_type == "database":
+            with self.db.reader() as conn:
+                table_columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+            selected = ", ".join(f'"{column}"' for column in columns if column in table_columns)
+            if not selected:
+                return
+            
+            # Page by rowid, so each chunk is an index range scan however far in it is
+            last_rowid = 0
+            while True:
+                with self.db.reader() as conn:
+                    chunk = pd.read_sql(
+                        f"SELECT rowid AS _rowid, {selected} FROM leads WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                        conn,
+                        params=(last_rowid, chunk_size)
+                    )
+                if chunk.empty:
+                    return
+                last_rowid = int(chunk['_rowid'].iloc[-1])
+                yield chunk.drop(columns='_rowid')
+        else:
+            self.logger.error(f"Unsupported storage type: {self.storage_type}")
+    
+    @timed_storage("apply_qualification_rules")
+    def apply_qualification_rules(self, rules=None, chunk_size=10000):
+        """
+        Re-score every stored lead against the rules
+        
+        Leads are read and scored a chunk at a time, so the whole base never
+        has to be in memory at once. Unqualified leads the rules match are
+        qualified, and leads the rules qualified earlier but no longer match
+        are unqualified. Leads a user qualified or unqualified are left alone,
+        as are qualified leads stored before decisions recorded their source.
+        
+        Args:
+            rules (QualificationRules): Rules to apply (defaults to the saved rules)
+            chunk_size (int): Number of leads scored at a time
+        
+        Returns:
+            tuple: (leads newly qualified, leads unqualified), or None if re-scoring failed
+        """
+        rules = rules or self.get_qualification_rules()
+        if rules is None or not rules.rules:
+            return 0, 0
+        
+        columns = ['profile_url', 'is_qualified', 'qualified_by'] + sorted({rule.field for rule in rules.rules})
+        qualify = {'is_qualified': True, 'qualified_by': QUALIFIED_BY_RULE, 'qualified_at': datetime.now().isoformat()}
+        unqualify = {'is_qualified': False, 'qualified_by': None}
+        pending = ([], [])
+        try:
+            for chunk in self._iter_lead_chunks(columns, chunk_size):
+                chunk = self._normalize_leads(chunk)
+                already = qualified_mask(chunk['is_qualified']) if 'is_qualified' in chunk.columns else pd.Series(False, index=chunk.index)
+                qualified_by = chunk['qualified_by'] if 'qualified_by' in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+                matched = rules.qualify(chunk)
+                
+                urls = (
+                    chunk.loc[matched & ~already & qualified_by.ne(QUALIFIED_BY_MANUAL), 'profile_url'].tolist(),
+                    chunk.loc[~matched & already & qualified_by.eq(QUALIFIED_BY_RULE), 'profile_url'].tolist()
+                )
+                for urls_pending, chunk_urls in zip(pending, urls):
+                    urls_pending.extend(chunk_urls)
+                if self.storage_type == "database":
+                    # Each chunk is its own short write transaction
+                    if not (self.update_leads(urls[0], qualify) and self.update_leads(urls[1], unqualify)):
+                        return None
+            
+            qualified, unqualified = (len(urls_pending) for urls_pending in pending)
+            # The leads file is rewritten once per change, after every chunk is scored
+            if self.storage_type == "file" and not (self.update_leads(pending[0], qualify) and self.update_leads(pending[1], unqualify)):
+                return None
+        except Exception as e:
+            self.logger.error(f"Error applying qualification rules: {str(e)}")
+            return None
+        
+        self.logger.info(f"Qualification rules qualified {qualified} and unqualified {unqualified} stored leads")
+        return qualified, unqualified
+    
+    def _lead_scorer_path(self):
+        """
+        Get the path of the lead scoring model
+        
+        Returns:
+            str: Path to the JSON model file
+        """
+        if self.storage_type == "database":
+            return f"{os.path.splitext(self.db_path)[0]}.lead_scorer.json"
+        return os.path.join(self.data_dir, "lead_scorer.json")
+    
+    def get_lead_scorer(self):
+        """
+        Get the current lead scoring model
+        
+        The model is loaded once and shared by the process until its file
+        changes, so scoring a batch costs no file read.
+        
+        Returns:
+            LeadScorer: Trained model, or the hand-tuned one if none has been trained
+        """
+        file_path = os.path.abspath(self._lead_scorer_path())
+        stamp = file_stamp(file_path)
+        with _lead_scorers_lock:
+            cached = _lead_scorers.get(file_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        scorer = LeadScorer.default()
+        try:
+            if stamp is not None:
+                with open(file_path, "r") as f:
+                    scorer = LeadScorer.from_dict(json.load(f))
+        except Exception as e:
+            self.logger.error(f"Error loading lead scorer: {str(e)}")
+            return scorer
+        
+        with _lead_scorers_lock:
+            _lead_scorers[file_path] = (stamp, scorer)
+        return scorer
+    
+    @timed_storage("train_lead_scorer")
+    def train_lead_scorer(self, min_examples=20, chunk_size=10000):
+        """
+        Train the lead scoring model on the stored qualification decisions
+        
+        Only leads a user qualified or unqualified are examples: leads the
+        rules qualified would teach the model the rules, and leads nobody
+        reviewed are not decisions. Only the columns the model uses are read,
+        a chunk at a time. Stored scores go stale once the model changes;
+        rescore_leads brings them up to date.
+        
+        Args:
+            min_examples (int): Fewest manually qualified and unqualified leads needed to train
+            chunk_size (int): Number of leads read at a time
+        
+        Returns:
+            LeadScorer: Trained model, or None if there were too few examples or training failed
+        """
+        try:
+            columns = list(SCORE_TEXT_COLUMNS) + ['connections', 'is_qualified', 'qualified_by']
+            chunks = [
+                self._normalize_leads(chunk[chunk['qualified_by'].eq(QUALIFIED_BY_MANUAL)])
+                for chunk in self._iter_lead_chunks(columns, chunk_size) if 'qualified_by' in chunk.columns
+            ]
+            leads_df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+            labels = qualified_mask(leads_df['is_qualified']) if 'is_qualified' in leads_df.columns else pd.Series(False, index=leads_df.index)
+            
+            qualified = int(labels.sum())
+            if min(qualified, len(labels) - qualified) < min_examples:
+                self.logger.warning(f"Not enough qualification decisions to train the lead scorer: {qualified} of {len(labels)} reviewed leads qualified")
+                return None
+            
+            scorer = LeadScorer.fit(leads_df, labels)
+            file_path = self._lead_scorer_path()
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(scorer.to_dict(), f)
+            os.replace(tmp_path, file_path)
+            with _lead_scorers_lock:
+                _lead_scorers[os.path.abspath(file_path)] = (file_stamp(file_path), scorer)
+            
+            self.logger.info(f"Saved lead scorer {scorer.version} to {file_path}")
+            return scorer
+        except Exception as e:
+            self.logger.error(f"Error training lead scorer: {str(e)}")
+            return None
+    
+    @timed_storage("rescore_leads")
+    def rescore_leads(self, chunk_size=10000):
+        """
+        Score the stored leads that were scored by another model, or not at all
+        
+        Each lead records the version of the model that scored it, so after
+        training only leads with a stale score are scored and written again.
+        
+        Args:
+            chunk_size (int): Number of leads scored at a time
+        
+        Returns:
+            int: Number of leads rescored, or None if rescoring failed
+        """
+        scorer = self.get_lead_scorer()
+        rescored = 0
+        try:
+            if self.storage_type == "file":
+                leads_df = self.load_leads()
+                if leads_df.empty:
+                    return 0
+                
+                stale = leads_df.index
+                if 'score_model' in leads_df.columns:
+                    stale = stale[(leads_df['score_model'] != scorer.version).to_numpy()]
+                if stale.empty:
+                    return 0
+                
+                if 'lead_score' not in leads_df.columns:
+                    leads_df['lead_score'] = np.nan
+                for start in range(0, len(stale), chunk_size):
+                    rows = stale[start:start + chunk_size]
+                    leads_df.loc[rows, 'lead_score'] = scorer.score(leads_df.loc[rows]).to_numpy()
+                leads_df['score_model'] = scorer.version
+                rescored = len(stale)
+                
+                if not self.save_leads(leads_df):
+                    return None
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    table_columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+                    if not table_columns:
+                        return 0
+                    for column in LEAD_SCORE_COLUMNS:
+                        if column not in table_columns:
+                            conn.execute(f'ALTER TABLE leads ADD COLUMN "{column}"')
+                
+                columns = ['profile_url', 'score_model'] + list(SCORE_TEXT_COLUMNS) + ['connections']
+                for chunk in self._iter_lead_chunks(columns, chunk_size):
+                    chunk = self._normalize_leads(chunk[(chunk['score_model'] != scorer.version).to_numpy()])
+                    if chunk.empty:
+                        continue
+                    
+                    scores = scorer.score(chunk)
+                    # Each chunk is its own short write transaction
+                    with self.db.writer() as conn:
+                        conn.executemany(
+                            "UPDATE leads SET lead_score = ?, score_model = ? WHERE profile_url = ?",
+                            zip(scores.tolist(), [scorer.version] * len(chunk), chunk['profile_url'])
+                        )
+                        self._bump_leads_version(conn)
+                    rescored += len(chunk)
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return None
+        except Exception as e:
+            self.logger.error(f"Error rescoring leads: {str(e)}")
+            return None
+        
+        self.logger.info(f"Rescored {rescored} leads with lead scorer {scorer.version}")
+        return rescored
+    
+    def _ensure_duplicate_suggestions_table(self, conn):
+        """
+        Create the duplicate suggestions table if it doesn't exist
+        
+        Args:
+            conn (Connection): Writer connection
+        """
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS duplicate_suggestions (
+            profile_url TEXT NOT NULL,
+            duplicate_of TEXT NOT NULL,
+            similarity REAL,
+            reason TEXT,
+            found_at TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            PRIMARY KEY (profile_url, duplicate_of)
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_duplicate_suggestions_status ON duplicate_suggestions (status, similarity)")
+    
+    def _save_duplicate_suggestions(self, suggestions):
+        """
+        Store new duplicate suggestions, skipping pairs that were already suggested either way round
+        
+        Args:
+            suggestions (DataFrame): profile_url, duplicate_of, similarity and reason columns
+        
+        Returns:
+            int: Number of suggestions stored
+        """
+        if suggestions.empty:
+            return 0
+        
+        suggestions = suggestions.assign(found_at=datetime.now().isoformat(), status="pending")
+        if self.storage_type == "file":
+            file_path = os.path.join(self.data_dir, "duplicate_suggestions.csv")
+            if os.path.exists(file_path):
+                stored = pd.read_csv(file_path)
+                pairs = set(zip(stored['profile_url'], stored['duplicate_of'])) | set(zip(stored['duplicate_of'], stored['profile_url']))
+                is_new = [pair not in pairs for pair in zip(suggestions['profile_url'], suggestions['duplicate_of'])]
+                suggestions = suggestions[is_new]
+                suggestions[stored.columns].to_csv(file_path, mode="a", header=False, index=False)
+            else:
+                suggestions.to_csv(file_path, index=False)
+            return len(suggestions)
+        elif self.storage_type == "database":
+            with self.db.writer() as conn:
+                self._ensure_duplicate_suggestions_table(conn)
+                changes_before = conn.total_changes
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO duplicate_suggestions (profile_url, duplicate_of, similarity, reason, found_at, status)
+                    SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (
+                        SELECT 1 FROM duplicate_suggestions WHERE profile_url = ? AND duplicate_of = ?
+                    )
+                    """,
+                    (
+                        (url, duplicate_of, similarity, reason, found_at, status, duplicate_of, url)
+                        for url, duplicate_of, similarity, reason, found_at, status in suggestions[
+                            ['profile_url', 'duplicate_of', 'similarity', 'reason', 'found_at', 'status']
+                        ].itertuples(index=False, name=None)
+                    )
+                )
+                return conn.total_changes - changes_before
+        else:
+            self.logger.error(f"Unsupported storage type: {self.storage_type}")
+            return 0
+    
+    @timed_storage("find_duplicate_leads")
+    def find_duplicate_leads(self, leads_df=None):
+        """
+        Look for leads that are probably the same person under another profile URL
+        
+        The first call in a process indexes every stored lead and checks
+        them all against each other; later calls only check the given leads
+        against the index, so each ingested batch costs time in proportion
+        to its size. Found pairs are stored as pending merge suggestions.
+        
+        Args:
+            leads_df (DataFrame): Newly stored leads (None to re-check every stored lead)
+        
+        Returns:
+            int: Number of new suggestions, or None if the check failed
+        """
+        index = self.duplicate_index
+        try:
+            with index.lock:
+                if leads_df is None or not index.loaded:
+                    index.clear()
+                    stored_df = self.load_leads()
+                    suggestions = index.add(stored_df) if not stored_df.empty else pd.DataFrame(columns=SUGGESTION_COLUMNS)
+                    index.loaded = True
+                    self.logger.info(f"Indexed {len(index)} leads for duplicate detection")
+                elif not leads_df.empty:
+                    suggestions = index.add(leads_df)
+                else:
+                    return 0
+            
+            saved = self._save_duplicate_suggestions(suggestions)
+        except Exception as e:
+            self.logger.error(f"Error finding duplicate leads: {str(e)}")
+            return None
+        
+        if saved:
+            self.logger.info(f"Found {saved} possible duplicate leads")
+        return saved
+    
+    def get_duplicate_suggestions(self, status="pending", limit=None, offset=0):
+        """
+        Get the stored duplicate suggestions, most similar first
+        
+        Args:
+            status (str): 'pending', 'dismissed' or 'merged' (None for all)
+            limit (int): Maximum number of suggestions to return (None for all)
+            offset (int): Number of suggestions to skip
+        
+        Returns:
+            DataFrame: profile_url, duplicate_of, similarity, reason, found_at and status columns
+        """
+        columns = SUGGESTION_COLUMNS + ['found_at', 'status']
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "duplicate_suggestions.csv")
+                if not os.path.exists(file_path):
+                    return pd.DataFrame(columns=columns)
+                suggestions = pd.read_csv(file_path)
+                if status is not None:
+                    suggestions = suggestions[suggestions['status'] == status]
+                suggestions = suggestions.sort_values('similarity', ascending=False, kind="stable")
+                suggestions = suggestions.iloc[offset:None if limit is None else offset + limit]
+            elif self.storage_type == "database":
+                with self.db.reader() as conn:
+                    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='duplicate_suggestions'")
+                    if not cursor.fetchone():
+                        return pd.DataFrame(columns=columns)
+                    where = " WHERE status = ?" if status is not None else ""
+                    suggestions = pd.read_sql(
+                        f"SELECT * FROM duplicate_suggestions{where} ORDER BY similarity DESC LIMIT ? OFFSET ?",
+                        conn,
+                        params=([status] if status is not None else []) + [-1 if limit is None else limit, offset]
+                    )
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return pd.DataFrame(columns=columns)
+            
+            return suggestions[columns].reset_index(drop=True)
+        except Exception as e:
+            self.logger.error(f"Error loading duplicate suggestions: {str(e)}")
+            return pd.DataFrame(columns=columns)
+    
+    def count_duplicate_suggestions(self, status="pending"):
+        """
+        Count the stored duplicate suggestions
+        
+        Args:
+            status (str): 'pending', 'dismissed' or 'merged' (None for all)
+        
+        Returns:
+            int: Number of suggestions
+        """
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "duplicate_suggestions.csv")
+                if not os.path.exists(file_path):
+                    return 0
+                statuses = pd.read_csv(file_path, usecols=['status'])['status']
+                return int(len(statuses) if status is None else (statuses == status).sum())
+            elif self.storage_type == "database":
+                with self.db.reader() as conn:
+                    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='duplicate_suggestions'")
+                    if not cursor.fetchone():
+                        return 0
+                    if status is None:
+                        return conn.execute("SELECT COUNT(*) FROM duplicate_suggestions").fetchone()[0]
+                    return conn.execute("SELECT COUNT(*) FROM duplicate_suggestions WHERE status = ?", (status,)).fetchone()[0]
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return 0
         except Exception as e:
-            self.logger.error(f"Error loading search history: {str(e)}")
-            return []
+            self.logger.error(f"Error counting duplicate suggestions: {str(e)}")
+            return 0
     
-    def save_filters(self, filters):
+    def _resolve_duplicate_suggestions(self, profile_urls, status, conn=None):
         """
-        Save filters to storage
+        Set the status of every pending suggestion involving the given leads
         
         Args:
-            filters (list): List of filter dictionaries
-            
+            profile_urls (list): Profile URLs of the leads
+            status (str): 'dismissed' or 'merged'
+            conn (Connection): Writer connection of the current transaction (database mode)
+        """
+        if self.storage_type == "database":
+            self._ensure_duplicate_suggestions_table(conn)
+            placeholders = ", ".join("?" for _ in profile_urls)
+            conn.execute(
+                f"UPDATE duplicate_suggestions SET status = ? WHERE status = 'pending' "
+                f"AND (profile_url IN ({placeholders}) OR duplicate_of IN ({placeholders}))",
+                [status] + list(profile_urls) * 2
+            )
+        else:
+            file_path = os.path.join(self.data_dir, "duplicate_suggestions.csv")
+            if not os.path.exists(file_path):
+                return
+            suggestions = pd.read_csv(file_path)
+            involved = suggestions['profile_url'].isin(profile_urls) | suggestions['duplicate_of'].isin(profile_urls)
+            suggestions.loc[involved & (suggestions['status'] == 'pending'), 'status'] = status
+            suggestions.to_csv(file_path, index=False)
+    
+    def dismiss_duplicate_suggestion(self, profile_url, duplicate_of):
+        """
+        Mark a duplicate suggestion as not a duplicate, so it is not suggested again
+        
+        Args:
+            profile_url (str): Profile URL of the suggested duplicate
+            duplicate_of (str): Profile URL of the lead it was matched with
+        
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             if self.storage_type == "file":
-                # Save to JSON file
-                file_path = os.path.join(self.data_dir, "filters.json")
-                with open(file_path, "w") as f:
-                    json.dump(filters, f)
-                
-                self.logger.info(f"Saved {len(filters)} filters to {file_path}")
-                return True
+                file_path = os.path.join(self.data_dir, "duplicate_suggestions.csv")
+                suggestions = pd.read_csv(file_path)
+                pair = (suggestions['profile_url'] == profile_url) & (suggestions['duplicate_of'] == duplicate_of)
+                suggestions.loc[pair, 'status'] = 'dismissed'
+                suggestions.to_csv(file_path, index=False)
             elif self.storage_type == "database":
-                # Import SQLite
-                import sqlite3
-                
-                # Connect to database
-                conn = sqlite3.connect(self.db_path)
-                
-                # Create table if it doesn't exist
-                cursor = conn.cursor()
-                cursor.execute("""
-                CREATE TABLE IF NOT EXISTS filters (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    filter_data TEXT
-                )
-                """)
-                
-                # Clear existing data
-                cursor.execute("DELETE FROM filters")
-                
-                # Insert new data
-                for filter_item in filters:
-                    cursor.execute(
-                        "INSERT INTO filters (filter_data) VALUES (?)",
-                        (json.dumps(filter_item),)
+                with self.db.writer() as conn:
+                    conn.execute(
+                        "UPDATE duplicate_suggestions SET status = 'dismissed' WHERE profile_url = ? AND duplicate_of = ?",
+                        (profile_url, duplicate_of)
                     )
-                
-                # Commit changes
-                conn.commit()
-                
-                # Close connection
-                conn.close()
-                
-                self.logger.info(f"Saved {len(filters)} filters to database {self.db_path}")
-                return True
             else:
                 self.logger.error(f"Unsupported storage type: {self.storage_type}")
                 return False
+            return True
         except Exception as e:
-            self.logger.error(f"Error saving filters: {str(e)}")
+            self.logger.error(f"Error dismissing duplicate suggestion: {str(e)}")
             return False
     
-    def load_filters(self):
+    @staticmethod
+    def _merged_lead(keep, duplicate):
         """
-        Load filters from storage
+        Combine the user-edited fields of two leads for the same person
+        
+        Args:
+            keep (dict): Lead that is kept
+            duplicate (dict): Lead merged into it
         
         Returns:
-            list: List of filter dictionaries
+            tuple: (changes to the kept lead, activity events removing the duplicate)
+        """
+        keep_qualified = bool(qualified_mask(pd.Series([keep.get('is_qualified')])).iloc[0])
+        duplicate_qualified = bool(qualified_mask(pd.Series([duplicate.get('is_qualified')])).iloc[0])
+        
+        notes = [note for note in (keep.get('notes'), duplicate.get('notes')) if isinstance(note, str) and note.strip()]
+        changes = {
+            'notes': "\n".join(dict.fromkeys(notes)),
+            'fetch_count': int(pd.to_numeric(pd.Series([keep.get('fetch_count'), duplicate.get('fetch_count')]), errors="coerce").fillna(1).sum())
+        }
+        
+        events = [{'at': duplicate.get('created_at'), 'created': -1, 'qualified': 0}]
+        if duplicate_qualified and keep_qualified:
+            events.append({'at': duplicate.get('qualified_at'), 'created': 0, 'qualified': -1})
+        elif duplicate_qualified:
+            # The kept lead takes over the duplicate's qualification
+            changes['is_qualified'] = True
+            changes['qualified_at'] = duplicate.get('qualified_at')
+            changes['qualified_by'] = duplicate.get('qualified_by')
+        if duplicate_qualified == keep_qualified and duplicate.get('qualified_by') == QUALIFIED_BY_MANUAL:
+            # A user's decision on either lead keeps the rules from overriding it
+            changes['qualified_by'] = QUALIFIED_BY_MANUAL
+        return changes, pd.DataFrame(events)
+    
+    @timed_storage("merge_leads")
+    def merge_leads(self, keep_url, duplicate_url):
         """
+        Merge a duplicate lead into another lead for the same person
+        
+        The kept lead keeps its scraped fields; it becomes qualified if
+        either lead was, gets the notes of both and the fetches of both. The
+        duplicate is deleted and its pending suggestions are resolved.
+        
+        Args:
+            keep_url (str): Profile URL of the lead to keep
+            duplicate_url (str): Profile URL of the lead to merge into it
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if keep_url == duplicate_url:
+            return False
+        
         try:
             if self.storage_type == "file":
-                # Load from JSON file
-                file_path = os.path.join(self.data_dir, "filters.json")
-                if os.path.exists(file_path):
-                    with open(file_path, "r") as f:
-                        filters = json.load(f)
-                    
-                    self.logger.info(f"Loaded {len(filters)} filters from {file_path}")
-                    return filters
-                else:
-                    self.logger.warning(f"Filters file not found: {file_path}")
-                    return []
-            elif self.storage_type == "database":
-                # Import SQLite
-                import sqlite3
+                leads_df = self.load_leads()
+                rows = leads_df.index[leads_df['profile_url'] == keep_url] if not leads_df.empty else []
+                duplicate_rows = leads_df.index[leads_df['profile_url'] == duplicate_url] if not leads_df.empty else []
+                if not len(rows) or not len(duplicate_rows):
+                    self.logger.warning(f"Leads to merge not found: {keep_url}, {duplicate_url}")
+                    return False
                 
-                # Connect to database
-                conn = sqlite3.connect(self.db_path)
+                changes, events = self._merged_lead(leads_df.loc[rows[0]].to_dict(), leads_df.loc[duplicate_rows[0]].to_dict())
+                for column, value in changes.items():
+                    if column not in leads_df.columns:
+                        leads_df[column] = None
+                    leads_df[column] = leads_df[column].astype(object)
+                    leads_df.loc[rows[0], column] = value
+                leads_df = leads_df.drop(index=duplicate_rows).reset_index(drop=True)
                 
-                # Check if table exists
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='filters'")
-                if cursor.fetchone():
-                    # Load from database
-                    cursor.execute("SELECT filter_data FROM filters")
-                    rows = cursor.fetchall()
-                    
-                    # Convert to list of dictionaries
-                    filters = [json.loads(row[0]) for row in rows]
-                    
-                    # Close connection
-                    conn.close()
+                leads_df.to_csv(os.path.join(self.data_dir, "leads.csv"), index=False)
+                self._add_lead_activity(events)
+                self._resolve_duplicate_suggestions([duplicate_url], "merged")
+                self._write_lead_cache(leads_df, self._leads_version())
+            elif self.storage_type == "database":
+                with self.db.writer() as conn:
+                    leads = pd.read_sql(
+                        "SELECT * FROM leads WHERE profile_url IN (?, ?)", conn, params=(keep_url, duplicate_url)
+                    ).set_index('profile_url', drop=False)
+                    if keep_url not in leads.index or duplicate_url not in leads.index:
+                        self.logger.warning(f"Leads to merge not found: {keep_url}, {duplicate_url}")
+                        return False
                     
-                    self.logger.info(f"Loaded {len(filters)} filters from database {self.db_path}")
-                    return filters
-                else:
-                    # Close connection
-                    conn.close()
+                    changes, events = self._merged_lead(leads.loc[keep_url].to_dict(), leads.loc[duplicate_url].to_dict())
+                    table_columns = set(leads.columns)
+                    for column in changes:
+                        if column not in table_columns:
+                            conn.execute(f'ALTER TABLE leads ADD COLUMN "{column}"')
                     
-                    self.logger.warning(f"Filters table not found in database {self.db_path}")
-                    return []
+                    assignments = ", ".join(f'"{column}" = ?' for column in changes)
+                    conn.execute(f"UPDATE leads SET {assignments} WHERE profile_url = ?", list(changes.values()) + [keep_url])
+                    conn.execute("DELETE FROM leads WHERE profile_url = ?", (duplicate_url,))
+                    self._add_lead_activity(events, conn)
+                    self._resolve_duplicate_suggestions([duplicate_url], "merged", conn)
+                    self._bump_leads_version(conn)
             else:
                 self.logger.error(f"Unsupported storage type: {self.storage_type}")
-                return []
+                return False
         except Exception as e:
-            self.logger.error(f"Error loading filters: {str(e)}")
-            return []
+            self.logger.error(f"Error merging leads: {str(e)}")
+            return False
+        
+        self.duplicate_index.discard(duplicate_url)
+        self.logger.info(f"Merged lead {duplicate_url} into {keep_url}")
+        return True
     
+    @timed_storage("export_leads")
     def export_leads(self, leads_df, format="csv", output_dir=None):
         """
         Export leads to a file in the specified format
@@ -467,6 +3101,439 @@ class DataManager:
             self.logger.error(f"Error exporting leads: {str(e)}")
             return None
     
+    def filter_leads(self, leads_df, name=None, title=None, company=None, location=None,
+                     industry=None, company_size=None, connections=None, qualified="All"):
+        """
+        Filter leads by case-insensitive substring matches on individual fields
+        
+        Args:
+            leads_df (DataFrame): DataFrame containing leads data
+            name (str): Text the lead's name must contain
+            title (str): Text the lead's job title must contain
+            company (str): Text the lead's company must contain
+            location (str): Text the lead's location must contain
+            industry (str): Text the lead's industry must contain
+            company_size (str): Text the lead's company size must contain
+            connections (str): Text the lead's connection count must contain
+            qualified (str): Qualification status to keep ('All', 'Qualified' or 'Unqualified')
+            
+        Returns:
+            DataFrame: Filtered DataFrame
+        """
+        if leads_df.empty:
+            return leads_df
+        
+        # Combine all criteria into one mask so the frame is only indexed once
+        mask = pd.Series(True, index=leads_df.index)
+        
+        for column, value in [('name', name), ('title', title), ('company', company), ('location', location),
+                              ('industry', industry), ('company_size', company_size)]:
+            if value:
+                mask &= leads_df[column].astype(str).str.contains(value, case=False, regex=False)
+        
+        if connections:
+            mask &= leads_df['connections'].astype(str).str.contains(connections, case=False, regex=False)
+        
+        if qualified == "Qualified":
+            mask &= leads_df['is_qualified'] == True
+        elif qualified == "Unqualified":
+            mask &= leads_df['is_qualified'] == False
+        
+        return leads_df[mask]
+    
+    def apply_filter(self, leads_df, filter_data):
+        """
+        Apply a saved filter to the leads data
+        
+        Args:
+            leads_df (DataFrame): DataFrame containing leads data
+            filter_data (dict): Saved filter with lists of job titles, companies,
+                industries and locations, plus qualification flags
+            
+        Returns:
+            DataFrame: Filtered DataFrame
+        """
+        if leads_df.empty:
+            return leads_df
+        
+        mask = pd.Series(True, index=leads_df.index)
+        
+        # A lead matches a list criterion if the field contains any of its terms
+        for column, key in [('title', 'job_titles'), ('company', 'companies'),
+                            ('industry', 'industries'), ('location', 'locations')]:
+            terms = filter_data.get(key) or []
+            if terms:
+                pattern = "|".join(re.escape(term) for term in terms)
+                mask &= leads_df[column].astype(str).str.contains(pattern, case=False, regex=True)
+        
+        include_qualified = filter_data.get('include_qualified', True)
+        include_unqualified = filter_data.get('include_unqualified', True)
+        if include_qualified and not include_unqualified:
+            mask &= leads_df['is_qualified'] == True
+        elif include_unqualified and not include_qualified:
+            mask &= leads_df['is_qualified'] == False
+        
+        return leads_df[mask]
+    
+    def count_companies(self, leads_df):
+        """
+        Count leads per company, with name variants such as "Google" and "Google LLC" counted together
+        
+        Args:
+            leads_df (DataFrame): DataFrame containing leads data
+            
+        Returns:
+            Series: Number of leads per company name, largest first
+        """
+        if leads_df.empty or 'company' not in leads_df.columns:
+            return pd.Series(dtype="int64", name="count")
+        
+        resolved = self.companies.resolve_frame(leads_df['company'])
+        return resolved['company_name'].value_counts()
+    
+    def _lead_activity_rows(self, events):
+        """
+        Bucket lead events into activity rollup rows
+        
+        Args:
+            events (DataFrame): at (ISO timestamp), created and qualified (changes in count) columns
+        
+        Returns:
+            list: (period, period_start, created, qualified) tuples
+        """
+        events = events[(events['created'] != 0) | (events['qualified'] != 0)]
+        rows = []
+        for period in LEAD_ACTIVITY_PERIODS:
+            starts = activity_period_start(events['at'], period)
+            grouped = events.assign(period_start=starts.to_numpy()).dropna(subset=['period_start'])
+            grouped = grouped.groupby('period_start')[['created', 'qualified']].sum()
+            rows.extend((period, start, int(created), int(qualified)) for start, created, qualified in grouped.itertuples())
+        return rows
+    
+    def _ensure_lead_activity_table(self, conn):
+        """
+        Create the lead activity rollup table if it doesn't exist
+        
+        Args:
+            conn (Connection): Writer connection
+        """
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lead_activity (
+                period TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                created INTEGER NOT NULL DEFAULT 0,
+                qualified INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (period, period_start)
+            ) WITHOUT ROWID
+            """
+        )
+    
+    def _add_lead_activity(self, events, conn=None):
+        """
+        Add lead events to the daily and weekly activity rollups
+        
+        Args:
+            events (DataFrame): at (ISO timestamp), created and qualified (changes in count) columns
+            conn (Connection): Writer connection of the current transaction (database mode)
+        """
+        rows = self._lead_activity_rows(events)
+        if not rows:
+            return
+        
+        if self.storage_type == "database":
+            self._ensure_lead_activity_table(conn)
+            conn.executemany(
+                """
+                INSERT INTO lead_activity (period, period_start, created, qualified) VALUES (?, ?, ?, ?)
+                ON CONFLICT (period, period_start) DO UPDATE SET
+                    created = created + excluded.created,
+                    qualified = qualified + excluded.qualified
+                """,
+                rows
+            )
+        else:
+            file_path = os.path.join(self.data_dir, "lead_activity.csv")
+            activity = pd.DataFrame(rows, columns=LEAD_ACTIVITY_COLUMNS)
+            if os.path.exists(file_path):
+                activity = pd.concat([pd.read_csv(file_path), activity])
+            activity = activity.groupby(['period', 'period_start'], as_index=False)[['created', 'qualified']].sum()
+            activity.to_csv(file_path, index=False)
+    
+    def _rebuild_lead_activity(self, leads_df, conn=None):
+        """
+        Recompute the activity rollups from the created_at and qualified_at of all leads
+        
+        Args:
+            leads_df (DataFrame): All stored leads
+            conn (Connection): Writer connection of the current transaction (database mode)
+        """
+        events = []
+        if 'created_at' in leads_df.columns:
+            events.append(pd.DataFrame({'at': leads_df['created_at'].to_numpy(), 'created': 1, 'qualified': 0}))
+        if 'qualified_at' in leads_df.columns and 'is_qualified' in leads_df.columns:
+            qualified_at = leads_df.loc[qualified_mask(leads_df['is_qualified']), 'qualified_at']
+            events.append(pd.DataFrame({'at': qualified_at.to_numpy(), 'created': 0, 'qualified': 1}))
+        rows = self._lead_activity_rows(pd.concat(events, ignore_index=True)) if events else []
+        
+        if self.storage_type == "database":
+            self._ensure_lead_activity_table(conn)
+            conn.execute("DELETE FROM lead_activity")
+            conn.executemany(
+                "INSERT INTO lead_activity (period, period_start, created, qualified) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        else:
+            file_path = os.path.join(self.data_dir, "lead_activity.csv")
+            pd.DataFrame(rows, columns=LEAD_ACTIVITY_COLUMNS).to_csv(file_path, index=False)
+    
+    def get_lead_activity(self, period="day", since=None):
+        """
+        Get the number of leads created and qualified per day or week
+        
+        Only the activity rollups are read, so this takes the same time
+        however many leads are stored. Leads stored before created_at was
+        tracked are not counted.
+        
+        Args:
+            period (str): 'day' or 'week'
+            since (str): ISO date of the first period to include (optional)
+        
+        Returns:
+            DataFrame: period_start, created and qualified, one row per period from the first to the last with activity
+        """
+        empty = pd.DataFrame(columns=['period_start', 'created', 'qualified'])
+        if period not in LEAD_ACTIVITY_PERIODS:
+            self.logger.error(f"Unsupported activity period: {period}")
+            return empty
+        
+        try:
+            if self.storage_type == "file":
+                file_path = os.path.join(self.data_dir, "lead_activity.csv")
+                if not os.path.exists(file_path):
+                    return empty
+                activity = pd.read_csv(file_path)
+                activity = activity[(activity['period'] == period) & (activity['period_start'] >= (since or ''))]
+                activity = activity.sort_values('period_start')[['period_start', 'created', 'qualified']]
+            elif self.storage_type == "database":
+                if not self._has_table("lead_activity"):
+                    return empty
+                with self.db.reader() as conn:
+                    activity = pd.read_sql(
+                        """
+                        SELECT period_start, created, qualified FROM lead_activity
+                        WHERE period = ? AND period_start >= ?
+                        ORDER BY period_start
+                        """,
+                        conn,
+                        params=(period, since or '')
+                    )
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return empty
+        except Exception as e:
+            self.logger.error(f"Error loading lead activity: {str(e)}")
+            return empty
+        
+        if activity.empty:
+            return empty
+        
+        # Include the periods without any activity
+        starts = pd.to_datetime(activity['period_start'])
+        periods = pd.date_range(starts.min(), starts.max(), freq="D" if period == "day" else "7D")
+        activity = activity[['created', 'qualified']].set_index(starts).reindex(periods, fill_value=0)
+        return activity.rename_axis('period_start').reset_index().assign(
+            period_start=lambda df: df['period_start'].dt.strftime("%Y-%m-%d")
+        )
+    
+    def _cached_rollup(self, name, compute):
+        """
+        Get an aggregate of the stored leads, computing it once per leads version
+        
+        Args:
+            name (tuple): Identifies the aggregate and its parameters
+            compute (callable): Function computing the aggregate from storage
+        
+        Returns:
+            object: The aggregate, or None if no leads are stored
+        """
+        version = self._leads_version()
+        if version is None:
+            return None
+        
+        key = (self._lead_cache_path(), version) + name
+        with _lead_rollups_lock:
+            rollup = _lead_rollups.get(key)
+        if rollup is not None:
+            registry.increment("lead_rollup_total", outcome="hit")
+            return rollup
+        
+        rollup = compute()
+        registry.increment("lead_rollup_total", outcome="miss")
+        
+        with _lead_rollups_lock:
+            _lead_rollups[key] = rollup
+            while len(_lead_rollups) > LEAD_ROLLUP_CACHE_SIZE:
+                _lead_rollups.popitem(last=False)
+        return rollup
+    
+    def _lead_rollup(self, column):
+        """
+        Count stored leads per value of a column, largest first
+        
+        Database mode counts with a GROUP BY query; file mode counts the
+        loaded leads. Rollups are kept until the stored leads change, so
+        charts and detail tables only slice them. Companies are counted per
+        company entity, so name variants are counted together.
+        
+        Args:
+            column (str): Column to group by (one of LEAD_GROUP_COLUMNS)
+        
+        Returns:
+            Series: Number of leads per value, including a NaN group for leads without one
+        """
+        if column not in LEAD_GROUP_COLUMNS:
+            raise ValueError(f"Unsupported group column: {column}")
+        
+        empty = pd.Series(dtype="int64", name="count")
+        
+        def compute():
+            if self.storage_type == "file":
+                leads_df = self.load_leads()
+                if column not in leads_df.columns:
+                    return empty
+                counts = leads_df[column].value_counts(dropna=False)
+            elif self.storage_type == "database":
+                with self.db.reader() as conn:
+                    table_columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+                    if column not in table_columns:
+                        return empty
+                    groups = pd.read_sql(f'SELECT "{column}" AS value, COUNT(*) AS count FROM leads GROUP BY "{column}"', conn)
+                counts = groups.set_index('value')['count']
+            else:
+                self.logger.error(f"Unsupported storage type: {self.storage_type}")
+                return empty
+            
+            if column == "company" and not counts.empty:
+                # Only the distinct names are resolved, not every lead
+                resolved = self.companies.resolve_frame(counts.index.to_series(index=counts.index))
+                counts = counts.groupby(resolved['company_name'].to_numpy(), dropna=False).sum()
+            
+            return counts.sort_values(ascending=False, kind="stable").rename("count").rename_axis(column)
+        
+        name = ("counts", column, self.companies.revision if column == "company" else None)
+        counts = self._cached_rollup(name, compute)
+        return empty if counts is None else counts
+    
+    def get_connections_histogram(self, buckets=None):
+        """
+        Count stored leads per connection count bucket
+        
+        The buckets are filled from the per-value connection counts, so only
+        the distinct values are binned, and the histogram is kept until the
+        stored leads change.
+        
+        Args:
+            buckets (list): Ascending lower edges of the buckets; the last bucket is open-ended (defaults to CONNECTION_BUCKETS)
+        
+        Returns:
+            DataFrame: bucket, lower, upper and count columns, plus an 'Unknown' bucket for leads without a count
+        """
+        edges = tuple(sorted({int(edge) for edge in (buckets or CONNECTION_BUCKETS)}))
+        
+        def compute():
+            counts = self._lead_rollup('connections')
+            values = parse_connections(counts.index.to_series(index=counts.index))
+            return connection_histogram(values, weights=counts.to_numpy(), buckets=edges)
+        
+        try:
+            histogram = self._cached_rollup(("connections_histogram", edges), compute)
+        except Exception as e:
+            self.logger.error(f"Error bucketing connections: {str(e)}")
+            histogram = None
+        return connection_histogram(pd.Series(dtype="Int64"), buckets=edges) if histogram is None else histogram.copy()
+    
+    def get_lead_counts(self, column, top_n=None, other_label="Other"):
+        """
+        Count leads per value of a column, sized for a chart
+        
+        Args:
+            column (str): Column to group by (one of LEAD_GROUP_COLUMNS)
+            top_n (int): Number of largest groups to keep; the rest are counted as one group (optional)
+            other_label (str): Label of the group counting the rest
+        
+        Returns:
+            DataFrame: The column and a count column, largest first
+        """
+        try:
+            counts = self._lead_rollup(column)
+            counts = counts[counts.index.notna()]
+            if top_n is not None and len(counts) > top_n:
+                other = pd.Series([counts.iloc[top_n:].sum()], index=[other_label])
+                counts = pd.concat([counts.iloc[:top_n], other])
+            return counts.rename_axis(column).reset_index(name='count')
+        except Exception as e:
+            self.logger.error(f"Error counting leads by {column}: {str(e)}")
+            return pd.DataFrame(columns=[column, 'count'])
+    
+    def get_lead_count_page(self, column, limit=50, offset=0):
+        """
+        Get one page of the lead counts per value of a column, largest first
+        
+        Args:
+            column (str): Column to group by (one of LEAD_GROUP_COLUMNS)
+            limit (int): Number of groups per page
+            offset (int): Number of groups to skip
+        
+        Returns:
+            DataFrame: The column and a count column
+        """
+        try:
+            counts = self._lead_rollup(column)
+            counts = counts[counts.index.notna()]
+            return counts.iloc[offset:offset + limit].rename_axis(column).reset_index(name='count')
+        except Exception as e:
+            self.logger.error(f"Error counting leads by {column}: {str(e)}")
+            return pd.DataFrame(columns=[column, 'count'])
+    
+    def count_lead_groups(self, column):
+        """
+        Count the distinct values of a column among the stored leads
+        
+        Args:
+            column (str): Column to group by (one of LEAD_GROUP_COLUMNS)
+        
+        Returns:
+            int: Number of distinct values
+        """
+        try:
+            return int(self._lead_rollup(column).index.notna().sum())
+        except Exception as e:
+            self.logger.error(f"Error counting {column} values: {str(e)}")
+            return 0
+    
+    def get_lead_summary(self):
+        """
+        Count the stored leads and the qualified leads
+        
+        Returns:
+            dict: total_leads, qualified_leads and qualification_rate
+        """
+        try:
+            counts = self._lead_rollup('is_qualified')
+        except Exception as e:
+            self.logger.error(f"Error summarizing leads: {str(e)}")
+            counts = pd.Series(dtype="int64")
+        
+        total_leads = int(counts.sum())
+        # Stored as True/False in CSV files and 1/0 in the database
+        qualified_leads = int(sum(count for value, count in counts.items() if value == True))
+        return {
+            'total_leads': total_leads,
+            'qualified_leads': qualified_leads,
+            'qualification_rate': round((qualified_leads / total_leads) * 100, 2) if total_leads > 0 else 0
+        }
+    
     def get_lead_statistics(self, leads_df):
         """
         Calculate statistics for the leads data
@@ -493,8 +3560,8 @@ class DataManager:
         qualified_leads = len(leads_df[leads_df['is_qualified'] == True])
         qualification_rate = round((qualified_leads / total_leads) * 100, 2) if total_leads > 0 else 0
         
-        # Calculate top companies
-        top_companies = leads_df['company'].value_counts().head(5).to_dict()
+        # Calculate top companies, counting name variants of a company together
+        top_companies = self.count_companies(leads_df).head(5).to_dict()
         
         # Calculate top titles
         top_titles = leads_df['title'].value_counts().head(5).to_dict()
@@ -502,8 +3569,9 @@ class DataManager:
         # Calculate top locations
         top_locations = leads_df['location'].value_counts().head(5).to_dict()
         
-        # Calculate connections distribution
-        connections_distribution = leads_df['connections'].value_counts().to_dict()
+        # Calculate connections distribution per bucket
+        histogram = connection_histogram(parse_connections(leads_df['connections']))
+        connections_distribution = dict(zip(histogram['bucket'], histogram['count'].tolist()))
         
         return {
             'total_leads': total_leads,
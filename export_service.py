@@ -0,0 +1,289 @@
+import io
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import pandas as pd
+
+from metrics import registry
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger("export_service")
+
+# File extension and MIME type for each export format
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "json": (".json", "application/json")
+}
+
+ExportArtifact = namedtuple("ExportArtifact", ["format", "file_name", "mime", "data"])
+
+
+def data_version(df):
+    """
+    Compute a version for a DataFrame that changes whenever its contents do.
+
+    Args:
+        df (DataFrame): Data to version
+
+    Returns:
+        str: Version string
+    """
+    try:
+        content = int(pd.util.hash_pandas_object(df, index=False).sum())
+    except TypeError:
+        # Unhashable cell values; fall back to the rendered CSV
+        content = hash(df.to_csv(index=False))
+    return f"{len(df)}-{hash(tuple(df.columns))}-{content:x}"
+
+
+def render_export(df, format):
+    """
+    Render a DataFrame in an export format.
+
+    Args:
+        df (DataFrame): Data to export
+        format (str): 'csv', 'excel' or 'json'
+
+    Returns:
+        bytes: File contents
+    """
+    if format == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if format == "excel":
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        return buffer.getvalue()
+    if format == "json":
+        return df.to_json(orient="records", indent=4).encode("utf-8")
+    raise ValueError(f"Unsupported export format: {format}")
+
+
+def _write_snapshot(df):
+    """
+    Copy a DataFrame into a shared memory block that export workers read from.
+
+    The snapshot is an Arrow IPC stream when pyarrow is installed and the
+    columns convert cleanly, and a pickle otherwise.
+
+    Args:
+        df (DataFrame): Data to snapshot
+
+    Returns:
+        tuple: (SharedMemory, codec, size)
+    """
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # Measure first so the stream is written straight into shared memory
+            mock = pa.MockOutputStream()
+            with pa.ipc.new_stream(mock, table.schema) as writer:
+                writer.write_table(table)
+            size = mock.size()
+
+            shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            sink = pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf))
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            sink.close()
+            return shm, "arrow", size
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.debug(f"Falling back to pickle snapshot: {e}")
+
+    payload = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    shm = shared_memory.SharedMemory(create=True, size=max(len(payload), 1))
+    shm.buf[:len(payload)] = payload
+    return shm, "pickle", len(payload)
+
+
+def _read_snapshot(buffer, codec):
+    if codec == "arrow":
+        with pa.ipc.open_stream(pa.py_buffer(buffer)) as reader:
+            return reader.read_all().to_pandas()
+    return pickle.loads(buffer)
+
+
+def _render_snapshot(shm_name, codec, size, format):
+    """
+    Render an export from a shared memory snapshot. Runs in a worker process.
+
+    Args:
+        shm_name (str): Name of the shared memory block
+        codec (str): 'arrow' or 'pickle'
+        size (int): Number of bytes used in the block
+        format (str): Export format
+
+    Returns:
+        bytes: File contents
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = shm.buf[:size]
+    try:
+        df = _read_snapshot(buffer, codec)
+        data = render_export(df, format)
+        # Arrow columns may still point into the block, which blocks closing it
+        del df
+        return data
+    finally:
+        buffer.release()
+        shm.close()
+
+
+class ExportService:
+    """
+    Renders exports in several formats at once in a pool of worker processes.
+
+    The data is copied once into a shared memory snapshot, which every
+    worker reads; no per-format copy of the DataFrame is made in the app
+    process. Rendered files are cached by data version and format, so
+    exporting unchanged data again returns the cached files. Small exports,
+    single formats and single-CPU machines render in-process, where workers
+    would cost more than they save.
+    """
+
+    def __init__(self, max_workers=None, min_parallel_rows=5000, cache_size=12):
+        """
+        Initialize the service.
+
+        Args:
+            max_workers (int): Number of worker processes (defaults to one per format, up to the CPU count)
+            min_parallel_rows (int): Smallest export rendered in worker processes
+            cache_size (int): Maximum number of rendered files kept
+        """
+        self.max_workers = max_workers or min(len(EXPORT_FORMATS), os.cpu_count() or 1)
+        self.min_parallel_rows = min_parallel_rows
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Forking a threaded server process is unsafe; start clean workers instead
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _cached(self, version, format):
+        with self._lock:
+            artifact = self._cache.get((version, format))
+            if artifact is not None:
+                self._cache.move_to_end((version, format))
+            return artifact
+
+    def _store(self, version, artifact):
+        with self._lock:
+            self._cache[(version, artifact.format)] = artifact
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def is_cached(self, df, formats, version=None):
+        """
+        Check whether exports of the data are already rendered.
+
+        Args:
+            df (DataFrame): Data to export
+            formats (list): Export formats
+            version (str): Data version (computed from the data if not given)
+
+        Returns:
+            bool: True if every format is cached
+        """
+        version = version or data_version(df)
+        return all(self._cached(version, format) is not None for format in formats)
+
+    def _render_parallel(self, df, formats):
+        shm, codec, size = _write_snapshot(df)
+        try:
+            executor = self._get_executor()
+            futures = {
+                format: executor.submit(_render_snapshot, shm.name, codec, size, format)
+                for format in formats
+            }
+            return {format: future.result() for format, future in futures.items()}
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def export(self, df, formats, version=None, file_prefix="linkedin_leads"):
+        """
+        Render the data in each format, reusing cached files where possible.
+
+        Args:
+            df (DataFrame): Data to export
+            formats (list): Export formats ('csv', 'excel', 'json')
+            version (str): Data version (computed from the data if not given)
+            file_prefix (str): Start of the download file names
+
+        Returns:
+            list: ExportArtifact per format, in the order given
+        """
+        for format in formats:
+            if format not in EXPORT_FORMATS:
+                raise ValueError(f"Unsupported export format: {format}")
+
+        version = version or data_version(df)
+        artifacts = {format: self._cached(version, format) for format in formats}
+        missing = [format for format, artifact in artifacts.items() if artifact is None]
+        registry.increment("export_cache_hits_total", len(formats) - len(missing))
+
+        if missing:
+            with registry.timer("export_render_seconds", formats=",".join(missing)):
+                rendered = None
+                if self.max_workers > 1 and len(missing) > 1 and len(df) >= self.min_parallel_rows:
+                    try:
+                        rendered = self._render_parallel(df, missing)
+                    except BrokenProcessPool as e:
+                        logger.error(f"Export workers failed, rendering in-process: {str(e)}")
+                        self.shutdown()
+                if rendered is None:
+                    rendered = {format: render_export(df, format) for format in missing}
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            for format in missing:
+                extension, mime = EXPORT_FORMATS[format]
+                artifacts[format] = ExportArtifact(format, f"{file_prefix}_{timestamp}{extension}", mime, rendered[format])
+                self._store(version, artifacts[format])
+            logger.info(f"Rendered {len(df)} rows as {', '.join(missing)}")
+
+        return [artifacts[format] for format in formats]
+
+    def shutdown(self):
+        """
+        Stop the worker processes. They are started again on the next parallel export.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_export_service():
+    """
+    Get the process-wide export service, creating it if needed.
+
+    Returns:
+        ExportService: Service shared by every session in the process
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ExportService()
+        return _service
@@ -0,0 +1,248 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from metrics import registry
+
+logger = logging.getLogger("ingest_pipeline")
+
+# Marks the end of the record stream for the writer
+_DONE = object()
+
+
+class IngestResult:
+    """
+    Outcome of an ingest run.
+    """
+
+    def __init__(self, search_count=0):
+        self.run_ids = [None] * search_count
+        self.counts = [0] * search_count
+        self.new_counts = [0] * search_count
+        self.errors = {}
+        self.records = 0
+        self.stored = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.leads = []
+
+    @property
+    def leads_df(self):
+        """
+        DataFrame: Cleaned leads written during the run, without duplicates
+        """
+        if not self.leads:
+            return pd.DataFrame()
+        leads_df = pd.concat(self.leads, ignore_index=True)
+        return leads_df.drop_duplicates(subset=['profile_url'], keep='first').reset_index(drop=True)
+
+
+class IngestPipeline:
+    """
+    Producer/consumer pipeline from the scraper to storage.
+
+    Scrape workers push records onto a bounded queue as pages are parsed,
+    while a single writer thread drains it in batches, cleaning each batch and
+    upserting it through the DataManager. Batches are flushed when they reach
+    `batch_size` or when `flush_interval` seconds have passed since the first
+    record in the batch arrived. When storage falls behind, the queue fills
+    up and the scrape workers block on it, which slows fetching down to the
+    rate the writer can keep up with.
+
+    Every search gets a run ID, and each stored lead is linked to the run
+    that found it, so the yield of each query can be measured afterwards.
+
+    When the run ends, refreshes of leads that were already stored are
+    applied through `DataManager.apply_lead_refreshes`, which in file mode
+    rewrites the leads file once per run rather than once per batch.
+    """
+
+    def __init__(self, data_manager, batch_size=100, flush_interval=2.0, max_queue_size=500):
+        """
+        Initialize the pipeline.
+
+        Args:
+            data_manager (DataManager): Data manager that cleans and stores the leads
+            batch_size (int): Maximum number of records per write
+            flush_interval (float): Maximum seconds a record waits before its batch is written
+            max_queue_size (int): Maximum number of records waiting to be written
+        """
+        self.data_manager = data_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+
+    def _produce(self, scraper_factory, index, search, records, result):
+        """
+        Run one search and push its records onto the queue.
+
+        Args:
+            scraper_factory (callable): Function returning a new scraper
+            index (int): Position of the search in the run
+            search (dict): Search with keywords, location and limit
+            records (Queue): Queue of records waiting to be written
+            result (IngestResult): Result to record the search's outcome in
+        """
+        count = 0
+
+        try:
+            # Each worker gets its own scraper, since sessions are not thread-safe
+            scraper = scraper_factory()
+            for record in scraper.iter_profiles(search['keywords'], search.get('location'), limit=search.get('limit', 10)):
+                start = time.perf_counter()
+                records.put((index, record))
+                registry.observe("ingest_queue_wait_seconds", time.perf_counter() - start)
+                count += 1
+        except Exception as e:
+            logger.error(f"Search for '{search['keywords']}' failed: {str(e)}")
+            result.errors[index] = str(e)
+
+        result.counts[index] = count
+
+    def _write(self, batch, result):
+        """
+        Clean a batch of records and upsert it, linking each lead to its search run.
+
+        Args:
+            batch (list): (search index, record) pairs to write
+            result (IngestResult): Result to record the write's outcome in
+        """
+        result.batches += 1
+        registry.increment("ingest_batches_total")
+        registry.increment("ingest_records_total", len(batch))
+
+        by_search = {}
+        for index, record in batch:
+            by_search.setdefault(index, []).append(record)
+
+        failed = False
+        with registry.timer("ingest_batch_seconds"):
+            for index, search_records in by_search.items():
+                # A failing batch must not stop the writer, or the scrape workers would block on a full queue
+                try:
+                    leads_df = self.data_manager.clean_data(pd.DataFrame(search_records))
+                    stored = self.data_manager.upsert_leads(leads_df, run_id=result.run_ids[index])
+                except Exception as e:
+                    logger.error(f"Error writing batch: {str(e)}")
+                    stored = None
+
+                if stored is None:
+                    failed = True
+                    logger.error(f"Failed to store {len(search_records)} records from search {index}")
+                    continue
+
+                result.stored += stored
+                result.new_counts[index] += stored
+                result.leads.append(leads_df)
+
+        if failed:
+            result.failed_batches += 1
+
+    def _consume(self, records, result):
+        """
+        Drain the queue in batches until the end of the stream.
+
+        Args:
+            records (Queue): Queue of records waiting to be written
+            result (IngestResult): Result to record the writes' outcome in
+        """
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                record = records.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            if record is _DONE:
+                break
+
+            if record is not None:
+                result.records += 1
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch, result)
+                batch = []
+                deadline = None
+
+        if batch:
+            self._write(batch, result)
+
+    def prioritize(self, searches, min_yield=None):
+        """
+        Order searches by the number of new leads their query has produced per run.
+
+        Queries that have never been run come first, so they get measured.
+        The rest follow from highest to lowest yield.
+
+        Args:
+            searches (list): Searches, each a dict with keywords, location and limit
+            min_yield (float): Skip measured queries averaging fewer new leads per run than this (optional)
+
+        Returns:
+            list: Searches in the order they should be run
+        """
+        yield_df = self.data_manager.get_search_yield()
+        yields = {
+            (row.keywords, row.location): row.new_per_run
+            for row in yield_df.itertuples(index=False)
+        }
+
+        scheduled = []
+        for position, search in enumerate(searches):
+            query_yield = yields.get((search['keywords'], search.get('location') or ''))
+            if query_yield is not None and min_yield is not None and query_yield < min_yield:
+                logger.info(f"Skipping low-yield search '{search['keywords']}' ({query_yield} new leads per run)")
+                continue
+            priority = float("inf") if query_yield is None else query_yield
+            scheduled.append((-priority, position, search))
+
+        scheduled.sort(key=lambda item: item[:2])
+        return [search for _, _, search in scheduled]
+
+    def run(self, searches, scraper_factory, workers=2):
+        """
+        Run searches concurrently and store their results as they arrive.
+
+        Args:
+            searches (list): Searches, each a dict with keywords, location and limit,
+                plus an optional run_id (one is generated otherwise)
+            scraper_factory (callable): Function returning a new scraper
+            workers (int): Number of searches to run at the same time
+
+        Returns:
+            IngestResult: Run IDs, record counts, new lead counts and errors by search position, and the stored leads
+        """
+        result = IngestResult(len(searches))
+        result.run_ids = [search.get('run_id') or uuid.uuid4().hex for search in searches]
+        records = queue.Queue(maxsize=self.max_queue_size)
+
+        writer = threading.Thread(target=self._consume, args=(records, result), name="ingest-writer", daemon=True)
+        writer.start()
+
+        with registry.timer("ingest_run_seconds"):
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(searches)))) as executor:
+                for index, search in enumerate(searches):
+                    executor.submit(self._produce, scraper_factory, index, search, records, result)
+
+            records.put(_DONE)
+            writer.join()
+
+            # Write the refreshes of stored leads queued by the batches in one go
+            self.data_manager.apply_lead_refreshes()
+
+        logger.info(
+            f"Ingested {result.records} records from {len(searches)} searches: "
+            f"{result.stored} new leads stored in {result.batches} batches"
+        )
+        return result
@@ -0,0 +1,325 @@
+import glob
+import gzip
+import io
+import json
+import os
+import re
+
+from metrics import registry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# File extension for each compression
+COMPRESSION_EXTENSIONS = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def dumps(record):
+    """
+    Serialize a record to one line of JSON, using orjson when it is installed.
+
+    Args:
+        record (dict): Record to serialize
+
+    Returns:
+        bytes: JSON line including the trailing newline
+    """
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def loads(line):
+    """
+    Parse one line of JSON, using orjson when it is installed.
+
+    Args:
+        line (bytes): JSON line
+
+    Returns:
+        dict: Parsed record
+    """
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _compression_for(file_path):
+    if file_path.endswith(".gz"):
+        return "gzip"
+    if file_path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _open_compressed(raw, compression, mode):
+    """
+    Wrap a binary file in a (de)compressing stream.
+
+    Args:
+        raw (file): Underlying binary file
+        compression (str): None, 'gzip' or 'zstd'
+        mode (str): 'r' to decompress or 'w' to compress
+
+    Returns:
+        file: Binary stream
+    """
+    if compression is None:
+        return raw
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode=mode + "b")
+    if compression == "zstd":
+        import zstandard
+
+        if mode == "w":
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        # Appended files hold one frame per writer session
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False))
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+class JsonlWriter:
+    """
+    Appends records to JSON Lines files as they arrive.
+
+    Records are written one per line, optionally gzip- or zstd-compressed,
+    so nothing but the current record has to be held in memory. Writing to
+    an existing file appends to it. With `max_bytes` set, output is split
+    into numbered parts (`name-0001.jsonl.gz`, `name-0002.jsonl.gz`, ...),
+    starting a new part once the current one reaches that size on disk.
+    Compressors buffer their output, so compressed parts can end up somewhat
+    larger than `max_bytes`.
+    """
+
+    def __init__(self, file_path, compression=None, max_bytes=None):
+        """
+        Initialize the writer.
+
+        Args:
+            file_path (str): Output path without extension, or with the extension matching the compression
+            compression (str): None, 'gzip' or 'zstd'
+            max_bytes (int): Size at which to start a new part file (None for a single file)
+        """
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd":
+            # Fail early rather than on the first record
+            import zstandard  # noqa: F401
+
+        extension = COMPRESSION_EXTENSIONS[compression]
+        self.base_path = file_path[:-len(extension)] if file_path.endswith(extension) else file_path
+        self.extension = extension
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.records = 0
+        self.paths = []
+
+        self._part = self._last_part() if max_bytes else None
+        self._raw = None
+        self._stream = None
+
+    def _part_path(self, part):
+        if part is None:
+            return self.base_path + self.extension
+        return f"{self.base_path}-{part:04d}{self.extension}"
+
+    def _last_part(self):
+        """
+        Find the highest existing part number, so a new writer continues where the last one stopped.
+
+        Returns:
+            int: Part number (1 if there are no parts yet)
+        """
+        output_dir = os.path.dirname(self.base_path) or "."
+        if not os.path.isdir(output_dir):
+            return 1
+
+        pattern = re.compile(re.escape(os.path.basename(self.base_path)) + r"-(\d{4})" + re.escape(self.extension) + "$")
+        parts = [int(match.group(1)) for match in map(pattern.match, os.listdir(output_dir)) if match]
+        return max(parts, default=1)
+
+    def _open(self):
+        path = self._part_path(self._part)
+        output_dir = os.path.dirname(path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        self._raw = open(path, "ab")
+        self._stream = _open_compressed(self._raw, self.compression, "w")
+        if path not in self.paths:
+            self.paths.append(path)
+
+    def _close_stream(self):
+        if self._stream is not None:
+            if self._stream is not self._raw:
+                self._stream.close()
+            self._raw.close()
+            self._stream = None
+            self._raw = None
+
+    def write(self, record):
+        """
+        Append a record.
+
+        Args:
+            record (dict): Record to write
+        """
+        if self._stream is None:
+            self._open()
+        elif self.max_bytes and self._raw.tell() >= self.max_bytes:
+            self._close_stream()
+            self._part += 1
+            self._open()
+
+        line = dumps(record)
+        self._stream.write(line)
+        self.records += 1
+        registry.increment("jsonl_bytes_written_total", len(line), compression=str(self.compression))
+
+    def write_many(self, records):
+        """
+        Append records from any iterable, e.g. a generator yielding results page by page.
+
+        Args:
+            records (iterable): Records to write
+
+        Returns:
+            int: Number of records written
+        """
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def close(self):
+        """
+        Flush and close the current file.
+        """
+        self._close_stream()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def jsonl_paths(file_path):
+    """
+    Find the files written for an output path, including every numbered part.
+
+    Args:
+        file_path (str): Path of a file, or an output path as given to JsonlWriter
+
+    Returns:
+        list: Existing file paths in write order
+    """
+    if os.path.exists(file_path):
+        return [file_path]
+
+    paths = []
+    for extension in COMPRESSION_EXTENSIONS.values():
+        base_path = file_path[:-len(extension)] if file_path.endswith(extension) else file_path
+        if os.path.exists(base_path + extension):
+            paths.append(base_path + extension)
+        paths.extend(sorted(glob.glob(glob.escape(base_path) + "-[0-9][0-9][0-9][0-9]" + extension)))
+    return paths
+
+
+def iter_jsonl(file_path):
+    """
+    Stream records back from JSON Lines files, one at a time.
+
+    Args:
+        file_path (str): Path of a file, or an output path as given to JsonlWriter (reads every part)
+
+    Yields:
+        dict: Record
+    """
+    for path in jsonl_paths(file_path):
+        with open(path, "rb") as raw:
+            stream = _open_compressed(raw, _compression_for(path), "r")
+            for line in stream:
+                if line.strip():
+                    yield loads(line)
+
+
+def iter_jsonl_reversed(file_path, block_size=1 << 16):
+    """
+    Stream records back from an uncompressed JSON Lines file, last record first.
+    
+    The file is read backwards a block at a time, so reading the newest
+    records costs the same however long the file is.
+    
+    Args:
+        file_path (str): Path of the file
+        block_size (int): Number of bytes read at a time
+    
+    Yields:
+        dict: Record
+    """
+    with open(file_path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # The first piece may continue a line that starts in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield loads(line)
+        if remainder.strip():
+            yield loads(remainder)
+
+
+def count_lines(file_path, start=0, end=None, block_size=1 << 20):
+    """
+    Count the newline-terminated lines in a byte range of a file.
+    
+    Args:
+        file_path (str): Path of the file
+        start (int): Byte offset to count from, e.g. the size already counted
+        end (int): Byte offset to stop at (defaults to the end of the file)
+        block_size (int): Number of bytes read at a time
+    
+    Returns:
+        int: Number of lines
+    """
+    count = 0
+    with open(file_path, "rb") as f:
+        end = f.seek(0, os.SEEK_END) if end is None else end
+        f.seek(start)
+        while start < end:
+            block = f.read(min(block_size, end - start))
+            if not block:
+                break
+            start += len(block)
+            count += block.count(b"\n")
+    return count
+
+
+def iter_jsonl_batches(file_path, batch_size=1000):
+    """
+    Stream records back from JSON Lines files in batches, e.g. for re-ingesting them into storage.
+
+    Args:
+        file_path (str): Path of a file, or an output path as given to JsonlWriter
+        batch_size (int): Number of records per batch
+
+    Yields:
+        list: Batch of records
+    """
+    batch = []
+    for record in iter_jsonl(file_path):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
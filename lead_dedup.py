@@ -0,0 +1,299 @@
+import logging
+import re
+import threading
+import unicodedata
+import zlib
+from collections import defaultdict
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from company_resolver import normalize_company_name
+from metrics import registry
+
+logger = logging.getLogger("lead_dedup")
+
+LINKEDIN_PROFILE_PATH = re.compile(r"^/(?:[a-z]{2}/)?in/([^/]+)", re.IGNORECASE)
+
+# Largest prime below 2**32; (a * x + b) % prime then fits in uint64 for 32-bit shingle hashes
+MINHASH_PRIME = np.uint64(4294967291)
+
+SUGGESTION_COLUMNS = ['profile_url', 'duplicate_of', 'similarity', 'reason']
+
+
+def canonical_profile_url(url):
+    """
+    Reduce a profile URL to one form per profile.
+
+    Scheme, locale subdomains (de.linkedin.com), query strings, fragments,
+    letter case and trailing slashes are normalized, so every variant of a
+    LinkedIn profile URL becomes https://www.linkedin.com/in/<slug>/.
+    URLs of other sites get a lowercase scheme and host and lose their
+    query string and fragment.
+
+    Args:
+        url (str): Profile URL as scraped
+
+    Returns:
+        str: Canonical URL ('' for missing URLs)
+    """
+    if not isinstance(url, str) or not url.strip():
+        return ""
+
+    url = url.strip()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.hostname or ""
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        match = LINKEDIN_PROFILE_PATH.match(parts.path)
+        if match:
+            return f"https://www.linkedin.com/in/{unquote(match.group(1)).lower()}/"
+
+    path = parts.path.rstrip("/")
+    return f"{parts.scheme.lower()}://{host}{path}/" if host else url
+
+
+def canonical_profile_urls(urls):
+    """
+    Canonicalize a column of profile URLs, converting each distinct URL once.
+
+    Args:
+        urls (Series): Profile URLs
+
+    Returns:
+        Series: Canonical URLs, aligned with the input
+    """
+    codes, uniques = pd.factorize(urls)
+    canonical = np.array([canonical_profile_url(url) for url in uniques] + [""], dtype=object)
+    return pd.Series(canonical[codes], index=urls.index, name=urls.name)
+
+
+def _normalize_person_name(name):
+    if not isinstance(name, str):
+        return ""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def match_key(name, company):
+    """
+    Build the text that fuzzy matching compares leads on.
+
+    Args:
+        name (str): Person name
+        company (str): Company name
+
+    Returns:
+        str: Normalized "name|company", or '' if the lead has no usable name
+    """
+    name = _normalize_person_name(name)
+    if not name or name == "unknown":
+        return ""
+    return f"{name}|{normalize_company_name(company)}"
+
+
+def _shingle_hashes(text, size=3):
+    padded = f" {text} "
+    shingles = {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+    return np.array(sorted(zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64)
+
+
+class DuplicateIndex:
+    """
+    Finds leads that are probably the same person under different profile URLs.
+
+    Leads are matched two ways: by canonical profile URL, and by MinHash
+    signatures of their normalized name and company, bucketed with
+    locality-sensitive hashing. Each signature is split into bands, and
+    leads sharing any band land in the same bucket. Only leads sharing a
+    bucket are compared, so adding a lead costs a few dictionary lookups
+    however many leads are indexed. Pairs whose estimated Jaccard
+    similarity reaches the threshold are reported.
+
+    The index is kept in memory and grows incrementally: `add` reports the
+    duplicates of each new lead among the leads added before it.
+    """
+
+    def __init__(self, num_perm=64, bands=8, threshold=0.8, max_candidates=50, seed=1):
+        """
+        Initialize the index.
+
+        Args:
+            num_perm (int): MinHash signature length (a multiple of bands)
+            bands (int): Number of LSH bands; more bands find less similar pairs
+            threshold (float): Lowest estimated name+company similarity reported
+            max_candidates (int): Most recent leads compared per bucket, so very common names stay cheap
+            seed (int): Seed of the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(MINHASH_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(MINHASH_PRIME), size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """
+        Remove every lead from the index.
+        """
+        with self.lock:
+            self.urls = []
+            # Signature per lead id, grown by doubling; rows of removed leads and leads without a name are not live
+            self.signatures = np.zeros((1024, self.num_perm), dtype=np.uint64)
+            self.live = np.zeros(1024, dtype=bool)
+            self.ids = {}
+            self.canonical = {}
+            self.buckets = [defaultdict(list) for _ in range(self.bands)]
+            self.loaded = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def signatures_for(self, keys, chunk_size=2000):
+        """
+        Compute MinHash signatures, hashing each distinct key once.
+
+        The permutations are applied to the shingles of a chunk of keys at
+        once and reduced per key with `np.minimum.reduceat`.
+
+        Args:
+            keys (list): Match keys (see `match_key`); empty keys get no signature
+            chunk_size (int): Number of distinct keys hashed at a time
+
+        Returns:
+            dict: Signature (uint64 array) per non-empty key
+        """
+        distinct = sorted({key for key in keys if key})
+        signatures = {}
+        for start in range(0, len(distinct), chunk_size):
+            chunk = distinct[start:start + chunk_size]
+            hashes = [_shingle_hashes(key) for key in chunk]
+            offsets = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+            permuted = (np.concatenate(hashes)[:, None] * self._a + self._b) % MINHASH_PRIME
+            for key, signature in zip(chunk, np.minimum.reduceat(permuted, offsets, axis=0)):
+                signatures[key] = signature
+        return signatures
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, leads_df):
+        """
+        Index leads and report the duplicates of each new one.
+
+        Leads already in the index are skipped. Each new lead is compared
+        with the indexed leads and with the new leads before it.
+
+        Args:
+            leads_df (DataFrame): Leads with profile_url, name and company columns
+
+        Returns:
+            DataFrame: profile_url, duplicate_of (the lead indexed first), similarity and reason ('url' or 'name')
+        """
+        suggestions = []
+        with self.lock, registry.timer("duplicate_index_add_seconds"):
+            # Dictionary lookups per new lead, rather than a scan of every indexed URL
+            is_new = np.fromiter((url not in self.ids for url in leads_df['profile_url']), dtype=bool, count=len(leads_df))
+            leads = leads_df[is_new].drop_duplicates(subset=['profile_url'])
+            names = leads['name'] if 'name' in leads.columns else pd.Series("", index=leads.index)
+            companies = leads['company'] if 'company' in leads.columns else pd.Series("", index=leads.index)
+
+            keys = [match_key(name, company) for name, company in zip(names, companies)]
+            signatures = self.signatures_for(keys)
+            canonical_urls = canonical_profile_urls(leads['profile_url'])
+
+            band_keys = {key: self._band_keys(signature) for key, signature in signatures.items()}
+
+            for url, canonical, key in zip(leads['profile_url'], canonical_urls, keys):
+                if not isinstance(url, str) or not url:
+                    continue
+                lead_id = len(self.urls)
+                signature = signatures.get(key)
+
+                match = self.canonical.get(canonical) if canonical else None
+                if match is not None and self.urls[match] is not None:
+                    suggestions.append((url, self.urls[match], 1.0, "url"))
+                elif signature is not None:
+                    suggestions.extend(self._similar(url, signature, band_keys[key]))
+
+                if lead_id == len(self.live):
+                    self.signatures = np.concatenate([self.signatures, np.zeros_like(self.signatures)])
+                    self.live = np.concatenate([self.live, np.zeros_like(self.live)])
+                self.urls.append(url)
+                self.ids[url] = lead_id
+                if canonical:
+                    self.canonical.setdefault(canonical, lead_id)
+                if signature is not None:
+                    self.signatures[lead_id] = signature
+                    self.live[lead_id] = True
+                    for band, band_key in enumerate(band_keys[key]):
+                        self.buckets[band][band_key].append(lead_id)
+
+        registry.increment("duplicate_suggestions_total", len(suggestions))
+        return pd.DataFrame(suggestions, columns=SUGGESTION_COLUMNS)
+
+    def _similar(self, url, signature, band_keys):
+        candidates = set()
+        for band, band_key in enumerate(band_keys):
+            candidates.update(self.buckets[band].get(band_key, [])[-self.max_candidates:])
+        if not candidates:
+            return []
+
+        # Compare with every candidate at once
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        candidates = candidates[self.live[candidates]]
+        similarities = (self.signatures[candidates] == signature).mean(axis=1)
+        matched = similarities >= self.threshold
+        return [
+            (url, self.urls[candidate], round(float(similarity), 3), "name")
+            for candidate, similarity in zip(candidates[matched], similarities[matched])
+        ]
+
+    def discard(self, url):
+        """
+        Remove a lead from the index, e.g. after it was merged into another.
+
+        Args:
+            url (str): Profile URL of the lead
+        """
+        with self.lock:
+            lead_id = self.ids.pop(url, None)
+            if lead_id is None:
+                return
+            if self.live[lead_id]:
+                for band, band_key in enumerate(self._band_keys(self.signatures[lead_id])):
+                    bucket = self.buckets[band][band_key]
+                    bucket.remove(lead_id)
+                    if not bucket:
+                        del self.buckets[band][band_key]
+            self.urls[lead_id] = None
+            self.live[lead_id] = False
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_duplicate_index(key):
+    """
+    Get the process-wide duplicate index for a lead storage location, creating it if needed.
+
+    Args:
+        key (str): Identifies the storage, e.g. the path of its leads cache
+
+    Returns:
+        DuplicateIndex: Index shared by everything that uses the storage
+    """
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = DuplicateIndex()
+        return index
@@ -0,0 +1,190 @@
+import logging
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from data_manager import QUALIFIED_BY_MANUAL, qualified_mask
+from metrics import registry
+
+logger = logging.getLogger("lead_store")
+
+
+class LeadSnapshot:
+    """
+    An immutable, versioned view of the stored leads.
+
+    The frame is shared by every session and must not be modified; use
+    `view()` to get a frame that can be.
+    """
+
+    def __init__(self, version, df):
+        """
+        Initialize the snapshot.
+
+        Args:
+            version (int): Version number, increased with every change to the leads
+            df (DataFrame): Leads data
+        """
+        self.version = version
+        self.df = df
+        self._score_order = None
+
+    def score_order(self):
+        """
+        Get the leads ordered by lead score, highest first.
+
+        The order is computed once per snapshot and shared by every session,
+        so sorting a filtered view by score only has to select from it.
+
+        Returns:
+            Index: Row labels of the snapshot, highest score first (unscored leads last)
+        """
+        if self._score_order is None:
+            if 'lead_score' in self.df.columns:
+                scores = pd.to_numeric(self.df['lead_score'], errors="coerce")
+                self._score_order = scores.sort_values(ascending=False, kind="stable", na_position="last").index
+            else:
+                self._score_order = self.df.index
+        return self._score_order
+
+    def view(self):
+        """
+        Get a frame of the leads for one session.
+
+        The frame is a shallow copy: it shares every column with the
+        snapshot until the session assigns a column of its own, so holding
+        it costs almost no memory. With pandas copy-on-write enabled (the
+        default from pandas 3), in-place edits such as `.loc` assignments
+        also copy only the columns they touch.
+
+        Returns:
+            DataFrame: Leads data
+        """
+        return self.df.copy(deep=False)
+
+
+class LeadStore:
+    """
+    Process-wide snapshot of the stored leads, shared by every session.
+
+    Leads are loaded from storage once and kept as a read-only snapshot.
+    Edits are written to storage and published as a new snapshot version
+    that shares all unchanged columns with the previous one, so sessions
+    pick up each other's edits by comparing versions instead of reloading.
+    """
+
+    def __init__(self, data_manager):
+        """
+        Initialize the store.
+
+        Args:
+            data_manager (DataManager): Data manager the leads are loaded from and saved to
+        """
+        self.data_manager = data_manager
+        self._snapshot = None
+        self._lock = threading.RLock()
+
+    def _publish(self, df):
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        self._snapshot = LeadSnapshot(version, df)
+        registry.increment("lead_snapshot_versions_total")
+        return self._snapshot
+
+    def snapshot(self):
+        """
+        Get the current snapshot, loading the leads on first use.
+
+        Returns:
+            LeadSnapshot: Current snapshot
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return self.refresh()
+            return self._snapshot
+
+    def refresh(self):
+        """
+        Reload the leads from storage, e.g. after a search stored new leads.
+
+        Returns:
+            LeadSnapshot: New snapshot
+        """
+        with self._lock:
+            snapshot = self._publish(self.data_manager.load_leads())
+            logger.info(f"Loaded lead snapshot version {snapshot.version} with {len(snapshot.df)} leads")
+            return snapshot
+
+    def replace(self, leads_df):
+        """
+        Save a complete set of leads and publish it.
+
+        Args:
+            leads_df (DataFrame): Leads data
+
+        Returns:
+            LeadSnapshot: New snapshot, or None if saving failed
+        """
+        with self._lock:
+            if not self.data_manager.save_leads(leads_df):
+                return None
+            return self._publish(leads_df.copy())
+
+    def update_leads(self, profile_urls, **changes):
+        """
+        Set fields of leads in storage and in a new snapshot.
+
+        Only the changed columns are copied; the new snapshot shares all
+        other columns with the previous one. Changing is_qualified also
+        stamps qualified_at, as in storage, and records the change as a
+        user's decision, which qualification rules do not override.
+
+        Args:
+            profile_urls (list): Profile URLs of the leads to update
+            **changes: Column names and the values to set
+
+        Returns:
+            LeadSnapshot: New snapshot, or None if saving failed
+        """
+        with self._lock:
+            if 'is_qualified' in changes:
+                changes.setdefault('qualified_by', QUALIFIED_BY_MANUAL)
+            if 'is_qualified' in changes and 'qualified_at' not in changes:
+                # Storage and snapshot get the same timestamp
+                changes['qualified_at'] = datetime.now().isoformat()
+
+            current = self.snapshot()
+            if not self.data_manager.update_leads(profile_urls, changes, leads_df=current.df):
+                return None
+
+            df = current.df.copy(deep=False)
+            mask = df['profile_url'].isin(profile_urls)
+            if 'is_qualified' in changes:
+                # Only leads whose qualification changes get a new qualified_at
+                is_qualified = bool(changes['is_qualified'])
+                qualified_at = changes.pop('qualified_at')
+                changed = mask
+                if 'is_qualified' in df.columns:
+                    changed = mask & (qualified_mask(df['is_qualified']) != is_qualified)
+                if 'qualified_at' not in df.columns:
+                    df['qualified_at'] = None
+                df['qualified_at'] = df['qualified_at'].astype(object).where(~changed, qualified_at if is_qualified else None)
+            for column, value in changes.items():
+                if column in df.columns:
+                    df[column] = df[column].where(~mask, value)
+                else:
+                    df[column] = pd.Series(None, index=df.index, dtype=object).where(~mask, value)
+            return self._publish(df)
+
+    def update_lead(self, profile_url, **changes):
+        """
+        Set fields of a single lead, e.g. `update_lead(url, is_qualified=True)`.
+
+        Args:
+            profile_url (str): Profile URL of the lead
+            **changes: Column names and the values to set
+
+        Returns:
+            LeadSnapshot: New snapshot, or None if saving failed
+        """
+        return self.update_leads([profile_url], **changes)
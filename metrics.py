@@ -0,0 +1,295 @@
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("metrics")
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond parsing to slow page fetches
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus style.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets (tuple): Sorted bucket upper bounds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Record a value.
+
+        Args:
+            value (float): Observed value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value, or None if nothing was observed
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count > 0:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters and histograms keyed by name and labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def increment(self, name, amount=1, **labels):
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Metric name
+            amount (float): Amount to add
+            **labels: Label values identifying the series
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Metric name
+            value (float): Observed value
+            **labels: Label values identifying the series
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Time a block of code into a histogram, in seconds.
+
+        Args:
+            name (str): Metric name
+            **labels: Label values identifying the series
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """
+        Decorator that times every call of a function into a histogram.
+
+        Args:
+            name (str): Metric name
+            **labels: Label values identifying the series
+
+        Returns:
+            callable: Decorator
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        """
+        Discard all recorded metrics.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Get a JSON-serializable copy of all metrics.
+
+        Returns:
+            dict: Counters and histogram summaries
+        """
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': h.count,
+                    'sum': h.sum,
+                    'mean': h.sum / h.count if h.count else None,
+                    'p50': h.quantile(0.5),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                    'buckets': dict(zip([str(b) for b in h.buckets] + ["+Inf"], h.counts))
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return {'timestamp': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def render_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        def format_labels(labels, extra=None):
+            items = list(labels) + (extra or [])
+            if not items:
+                return ""
+            escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in items]
+            return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for (name, labels), h in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, bucket_count in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {h.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, file_path):
+        """
+        Write a snapshot of all metrics to a JSON file.
+
+        Args:
+            file_path (str): Path of the output file
+
+        Returns:
+            str: Path to the written file
+        """
+        output_dir = os.path.dirname(file_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, file_path)
+        return file_path
+
+
+# Process-wide registry shared by the scraper, data manager and app
+registry = MetricsRegistry()
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=9100, host="127.0.0.1", metrics_registry=None):
+    """
+    Serve metrics over HTTP from a background thread.
+
+    `/metrics` returns the Prometheus text format and `/metrics.json` a JSON
+    snapshot. Only one server is started per process; later calls return it.
+
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind to
+        metrics_registry (MetricsRegistry): Registry to serve (defaults to the shared registry)
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    global _server
+    metrics_registry = metrics_registry or registry
+
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(metrics_registry.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = metrics_registry.render_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        _server = ThreadingHTTPServer((host, port), Handler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return _server
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import secrets
+import threading
+
+import numpy as np
+
+from mock_data_generator import MockDataGenerator, job_frame_to_records
+from source_backends import SourceBackend
+
+logger = logging.getLogger("mock_backend")
+
+
+def stable_hash(*parts):
+    """
+    Hash values into a 64-bit integer that is stable across processes.
+
+    Python's built-in `hash()` is salted per process, so it cannot be used to
+    derive seeds that must match between runs.
+
+    Args:
+        *parts: Values to hash (converted with repr)
+
+    Returns:
+        int: 64-bit unsigned hash
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class IdAllocator:
+    """
+    Collision-free allocator of random-looking integer IDs.
+
+    IDs are produced by passing a counter through a keyed bijection on 40-bit
+    integers, so every allocation from one allocator is distinct while still
+    looking random. Two allocators with the same key produce the same sequence.
+    """
+
+    BITS = 40
+    MASK = (1 << BITS) - 1
+
+    def __init__(self, key):
+        """
+        Initialize the allocator.
+
+        Args:
+            key: Value identifying the ID sequence (e.g. seed and namespace)
+        """
+        self.multiplier = np.uint64((stable_hash("multiplier", key) & self.MASK) | 1)
+        self.offset = np.uint64(stable_hash("offset", key) & self.MASK)
+        self.next_index = 0
+        self._lock = threading.Lock()
+
+    def allocate(self, count):
+        """
+        Allocate `count` new IDs.
+
+        Args:
+            count (int): Number of IDs to allocate
+
+        Returns:
+            ndarray: Array of unique unsigned integers below 2**40
+        """
+        with self._lock:
+            # Checked before reserving, so concurrent callers can never be handed indexes past the mask
+            if self.next_index + count > self.MASK + 1:
+                raise RuntimeError("ID space exhausted")
+            start = self.next_index
+            self.next_index += count
+
+        mask = np.uint64(self.MASK)
+        ids = np.arange(start, start + count, dtype=np.uint64)
+        # An odd multiplier and an xorshift are both invertible modulo 2**40,
+        # so the composition maps distinct counters to distinct IDs.
+        ids = (ids * self.multiplier + self.offset) & mask
+        ids ^= ids >> np.uint64(self.BITS // 2)
+        ids = (ids * self.multiplier) & mask
+        return ids
+
+
+class MockBackend(SourceBackend):
+    """
+    Reproducible source of mock LinkedIn profiles and job listings.
+
+    The backend owns its RNG and ID allocators instead of using the global
+    `random` module. In normal mode successive searches continue one random
+    stream and never reuse an ID. In replay mode every search is derived only
+    from (keywords, location, limit, seed), so identical searches return
+    identical records, which makes cache-hit and dedup measurements comparable
+    between runs.
+    """
+
+    name = "mock"
+
+    def __init__(self, seed=None, replay=False):
+        """
+        Initialize the mock backend.
+
+        Args:
+            seed (int): Seed for all random draws (a random seed is chosen if None)
+            replay (bool): Whether identical searches should return identical results
+        """
+        self.seed = seed if seed is not None else secrets.randbits(63)
+        self.replay = replay
+        self.generator = MockDataGenerator(seed=self.seed)
+        self.profile_ids = IdAllocator((self.seed, "profiles"))
+        self.job_ids = IdAllocator((self.seed, "jobs"))
+
+        logger.info(f"Mock backend initialized (seed={self.seed}, replay={self.replay})")
+
+    def _query_state(self, kind, keywords, location, limit):
+        """
+        Get the generator and ID allocator to use for a search.
+
+        Args:
+            kind (str): Type of record ('profiles' or 'jobs')
+            keywords (str): Search keywords
+            location (str): Location filter
+            limit (int): Number of records requested
+
+        Returns:
+            tuple: (MockDataGenerator, IdAllocator)
+        """
+        if not self.replay:
+            allocator = self.profile_ids if kind == "profiles" else self.job_ids
+            return self.generator, allocator
+
+        query_key = (self.seed, kind, keywords, location, limit)
+        generator = MockDataGenerator(seed=[self.seed, stable_hash(query_key) >> 1])
+        return generator, IdAllocator(query_key)
+
+    def search_profiles(self, keywords, location=None, limit=10):
+        """
+        Generate mock profiles for a search.
+
+        Args:
+            keywords (str): Search keywords
+            location (str): Location filter
+            limit (int): Number of profiles to generate
+
+        Returns:
+            list: List of mock profile data
+        """
+        generator, allocator = self._query_state("profiles", keywords, location, limit)
+        profiles_df = generator.generate_profiles(limit, keywords, location, ids=allocator.allocate(limit))
+        return profiles_df.to_dict("records")
+
+    def search_jobs(self, keywords, location, limit=25):
+        """
+        Generate mock job listings for a search.
+
+        Args:
+            keywords (str): Job search keywords
+            location (str): Job location
+            limit (int): Number of job listings to generate
+
+        Returns:
+            list: List of mock job listings
+        """
+        generator, allocator = self._query_state("jobs", keywords, location, limit)
+        jobs_df = generator.generate_job_listings(limit, keywords, location, ids=allocator.allocate(limit))
+        return job_frame_to_records(jobs_df)
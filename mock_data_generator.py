@@ -0,0 +1,416 @@
+import argparse
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("mock_data_generator")
+
+# Shared vocabularies for mock LinkedIn data. These are module-level so they are
+# built once per process instead of once per generated batch.
+FIRST_NAMES = [
+    "James", "John", "Robert", "Michael", "William", "David", "Richard", "Joseph", "Thomas", "Charles",
+    "Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Barbara", "Susan", "Jessica", "Sarah", "Karen"
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Jones", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor",
+    "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Garcia", "Martinez", "Robinson"
+]
+
+TITLE_TEMPLATES = [
+    "Senior {}", "{}", "Lead {}", "{} Manager", "Principal {}",
+    "{} Specialist", "Staff {}", "{} Consultant", "Associate {}", "{} Architect"
+]
+
+COMPANIES = [
+    "Google", "Microsoft", "Amazon", "Facebook", "Apple",
+    "Netflix", "Uber", "Airbnb", "Salesforce", "LinkedIn",
+    "IBM", "Oracle", "Intel", "Cisco", "Adobe",
+    "Twitter", "Spotify", "Slack", "Zoom", "Dropbox"
+]
+
+INDUSTRIES = [
+    "Technology", "Software Development", "Internet", "Information Services", "Computer Software",
+    "Financial Services", "Marketing and Advertising", "Higher Education", "Hospital & Health Care",
+    "Telecommunications", "Management Consulting", "Information Technology"
+]
+
+COMPANY_SIZES = [
+    "1-10 employees", "11-50 employees", "51-200 employees", "201-500 employees",
+    "501-1,000 employees", "1,001-5,000 employees", "5,001-10,000 employees", "10,001+ employees"
+]
+
+DESCRIPTION_TEMPLATES = [
+    "We are looking for a talented {title} to join our team. The ideal candidate will have experience with {technologies} and a passion for {domain}. You will be responsible for {responsibilities}.",
+    "Join our team as a {title}! In this role, you will {responsibilities}. We're looking for someone with experience in {technologies} and knowledge of {domain}.",
+    "Exciting opportunity for a {title} to work on cutting-edge projects. You'll be {responsibilities} while collaborating with cross-functional teams. Required skills: {technologies}.",
+    "We're seeking an experienced {title} to help us {domain}. In this role, you'll be {responsibilities}. The ideal candidate has {experience} years of experience with {technologies}."
+]
+
+TECHNOLOGIES_BY_ROLE = {
+    "software engineer": ["Python", "JavaScript", "Java", "C++", "React", "Node.js", "AWS", "Docker", "Kubernetes"],
+    "data scientist": ["Python", "R", "SQL", "TensorFlow", "PyTorch", "Machine Learning", "Data Visualization", "Statistics"],
+    "product manager": ["Agile", "Scrum", "JIRA", "Product Roadmapping", "User Stories", "Market Research", "A/B Testing"],
+    "designer": ["Figma", "Sketch", "Adobe XD", "UI/UX", "Wireframing", "Prototyping", "User Research"],
+    "marketing": ["SEO", "SEM", "Content Marketing", "Social Media", "Google Analytics", "Email Marketing", "Growth Hacking"]
+}
+
+DOMAINS = [
+    "building scalable applications",
+    "improving user experience",
+    "optimizing performance",
+    "developing new features",
+    "maintaining existing systems",
+    "creating innovative solutions",
+    "solving complex problems",
+    "enhancing product capabilities"
+]
+
+RESPONSIBILITIES = [
+    "designing and implementing new features",
+    "collaborating with cross-functional teams",
+    "troubleshooting and debugging issues",
+    "writing clean, maintainable code",
+    "participating in code reviews",
+    "mentoring junior team members",
+    "optimizing application performance",
+    "ensuring high-quality deliverables"
+]
+
+SENIORITY_LEVELS = ["Entry level", "Associate", "Mid-Senior level", "Director", "Executive"]
+EMPLOYMENT_TYPES = ["Full-time", "Part-time", "Contract", "Temporary", "Internship"]
+JOB_FUNCTIONS = ["Engineering", "Information Technology", "Product Management", "Design", "Marketing"]
+JOB_INDUSTRIES = ["Technology", "Software Development", "Internet", "Information Services", "Computer Software"]
+APPLICATION_TYPES = ["Direct", "LinkedIn Easy Apply"]
+
+# Number of distinct technology triples drawn per job batch. Descriptions are
+# formatted once per distinct combination rather than once per row.
+TECHNOLOGY_SAMPLES = 64
+
+
+def build_job_titles(keywords):
+    """
+    Build the list of job titles derived from the search keywords.
+
+    Args:
+        keywords (str): Search keywords
+
+    Returns:
+        list: List of job titles
+    """
+    base_title = keywords.lower().title()
+    return [template.format(base_title) for template in TITLE_TEMPLATES]
+
+
+def get_role_technologies(keywords):
+    """
+    Pick the technology list matching the search keywords.
+
+    Args:
+        keywords (str): Search keywords
+
+    Returns:
+        list: List of technologies for the closest known role
+    """
+    base_title = keywords.lower()
+    role_key = next((k for k in TECHNOLOGIES_BY_ROLE.keys() if k in base_title), "software engineer")
+    return TECHNOLOGIES_BY_ROLE[role_key]
+
+
+def job_frame_to_records(jobs_df):
+    """
+    Convert a flat job listings DataFrame into LinkedIn-shaped job dictionaries.
+
+    Args:
+        jobs_df (DataFrame): DataFrame produced by MockDataGenerator.generate_job_listings
+
+    Returns:
+        list: List of job listing dictionaries with nested criteria and company details
+    """
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'company': row['company'],
+            'location': row['location'],
+            'url': row['url'],
+            'description': row['description'],
+            'criteria': {
+                "Seniority level": row['seniority_level'],
+                "Employment type": row['employment_type'],
+                "Job function": row['job_function'],
+                "Industries": row['industries']
+            },
+            'application_type': row['application_type'],
+            'company_details': {"url": row['company_url']},
+            'posting_date': row['posting_date']
+        }
+        for row in jobs_df.to_dict("records")
+    ]
+
+
+class MockDataGenerator:
+    """
+    Seeded, vectorized generator for synthetic LinkedIn profiles and job listings.
+
+    All random draws are made with NumPy over whole columns, so millions of
+    records can be produced as a DataFrame (or streamed to disk in chunks) for
+    load-testing storage and UI code. Output is deterministic for a given seed,
+    count and chunk size.
+    """
+
+    def __init__(self, seed=None):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int): Seed for the random number generator (None for a random seed)
+        """
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def _choice(self, values, count):
+        """
+        Draw `count` values uniformly from a list as an object array.
+
+        Args:
+            values (list): Values to draw from
+            count (int): Number of values to draw
+
+        Returns:
+            ndarray: Array of drawn values
+        """
+        return np.asarray(values, dtype=object)[self.rng.integers(0, len(values), size=count)]
+
+    def generate_profiles(self, count, keywords="software engineer", location=None, ids=None):
+        """
+        Generate mock profiles as a DataFrame.
+
+        Args:
+            count (int): Number of profiles to generate
+            keywords (str): Search keywords used to derive job titles
+            location (str): Location assigned to every profile
+            ids (ndarray): Unique integers used as profile URL suffixes (random if None)
+
+        Returns:
+            DataFrame: DataFrame of mock profiles with the same columns as the scraper output
+        """
+        first_idx = self.rng.integers(0, len(FIRST_NAMES), size=count)
+        last_idx = self.rng.integers(0, len(LAST_NAMES), size=count)
+        name_idx = first_idx * len(LAST_NAMES) + last_idx
+
+        # Every name and URL slug prefix is built once per combination, then gathered.
+        names = np.array([f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES], dtype=object)
+        slugs = np.array(
+            [f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-" for first in FIRST_NAMES for last in LAST_NAMES],
+            dtype=object
+        )
+        if ids is None:
+            ids = self.rng.integers(10000, 100000, size=count)
+        suffixes = np.asarray(ids).astype(str).astype(object)
+
+        return pd.DataFrame({
+            'name': names[name_idx],
+            'title': self._choice(build_job_titles(keywords), count),
+            'company': self._choice(COMPANIES, count),
+            'location': location or "San Francisco, CA",
+            'profile_url': slugs[name_idx] + suffixes + "/",
+            'connections': self.rng.integers(50, 501, size=count) * 10,
+            # Qualification is left to the qualification rules applied when leads are cleaned
+            'is_qualified': False,
+            'industry': self._choice(INDUSTRIES, count),
+            'company_size': self._choice(COMPANY_SIZES, count)
+        })
+
+    def generate_job_listings(self, count, keywords="software engineer", location="San Francisco, CA", ids=None):
+        """
+        Generate mock job listings as a flat DataFrame.
+
+        Nested fields of the scraper's job dictionaries are flattened into
+        `seniority_level`, `employment_type`, `job_function`, `industries` and
+        `company_url`; use `job_frame_to_records` to restore the nested shape.
+
+        Args:
+            count (int): Number of job listings to generate
+            keywords (str): Job search keywords
+            location (str): Location assigned to every job listing
+            ids (ndarray): Unique integers used as job numbers (random if None)
+
+        Returns:
+            DataFrame: DataFrame of mock job listings
+        """
+        base_title = keywords.lower()
+        job_titles = build_job_titles(keywords)
+        technologies = get_role_technologies(keywords)
+
+        if ids is None:
+            ids = self.rng.integers(1000000, 10000000, size=count)
+        job_numbers = np.asarray(ids).astype(str).astype(object)
+        job_ids = "linkedin-job-" + job_numbers
+        company_idx = self.rng.integers(0, len(COMPANIES), size=count)
+        company_urls = np.array(
+            [f"https://www.linkedin.com/company/{company.lower().replace(' ', '-')}/" for company in COMPANIES],
+            dtype=object
+        )
+
+        # Draw a small pool of technology triples, then describe each row by a
+        # combined code so descriptions are only formatted once per combination.
+        tech_pool = [
+            ", ".join(self.rng.choice(technologies, size=min(3, len(technologies)), replace=False))
+            for _ in range(TECHNOLOGY_SAMPLES)
+        ]
+        template_idx = self.rng.integers(0, len(DESCRIPTION_TEMPLATES), size=count)
+        tech_idx = self.rng.integers(0, len(tech_pool), size=count)
+        domain_idx = self.rng.integers(0, len(DOMAINS), size=count)
+        responsibility_idx = self.rng.integers(0, len(RESPONSIBILITIES), size=count)
+        experience = self.rng.integers(2, 9, size=count)
+
+        codes = np.ravel_multi_index(
+            (template_idx, tech_idx, domain_idx, responsibility_idx, experience - 2),
+            (len(DESCRIPTION_TEMPLATES), len(tech_pool), len(DOMAINS), len(RESPONSIBILITIES), 7)
+        )
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        t_idx, k_idx, d_idx, r_idx, e_idx = np.unravel_index(
+            unique_codes,
+            (len(DESCRIPTION_TEMPLATES), len(tech_pool), len(DOMAINS), len(RESPONSIBILITIES), 7)
+        )
+        descriptions = np.array([
+            DESCRIPTION_TEMPLATES[t].format(
+                title=base_title,
+                technologies=tech_pool[k],
+                domain=DOMAINS[d],
+                responsibilities=RESPONSIBILITIES[r],
+                experience=e + 2
+            )
+            for t, k, d, r, e in zip(t_idx, k_idx, d_idx, r_idx, e_idx)
+        ], dtype=object)
+
+        return pd.DataFrame({
+            'id': job_ids,
+            'title': self._choice(job_titles, count),
+            'company': np.asarray(COMPANIES, dtype=object)[company_idx],
+            'location': location,
+            'url': "https://www.linkedin.com/jobs/view/" + job_ids + "/",
+            'description': descriptions[inverse.ravel()],
+            'seniority_level': self._choice(SENIORITY_LEVELS, count),
+            'employment_type': self._choice(EMPLOYMENT_TYPES, count),
+            'job_function': self._choice(JOB_FUNCTIONS, count),
+            'industries': self._choice(JOB_INDUSTRIES, count),
+            'application_type': self._choice(APPLICATION_TYPES, count),
+            'company_url': company_urls[company_idx],
+            'posting_date': self.rng.integers(1, 31, size=count).astype(str).astype(object) + " days ago"
+        })
+
+    def iter_chunks(self, kind, count, chunk_size=100000, keywords="software engineer", location=None):
+        """
+        Generate records in fixed-size chunks.
+
+        Args:
+            kind (str): Type of record to generate ('profiles' or 'jobs')
+            count (int): Total number of records to generate
+            chunk_size (int): Maximum number of records per chunk
+            keywords (str): Search keywords used to derive job titles
+            location (str): Location assigned to every record
+
+        Yields:
+            DataFrame: Chunk of generated records
+        """
+        if kind == "profiles":
+            generate = self.generate_profiles
+        elif kind == "jobs":
+            generate = self.generate_job_listings
+        else:
+            raise ValueError(f"Unsupported record kind: {kind}")
+
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            if kind == "jobs":
+                yield generate(size, keywords, location or "San Francisco, CA")
+            else:
+                yield generate(size, keywords, location)
+            remaining -= size
+
+    def write(self, kind, count, file_path, format="csv", chunk_size=100000, keywords="software engineer", location=None):
+        """
+        Stream generated records to disk chunk by chunk.
+
+        Args:
+            kind (str): Type of record to generate ('profiles' or 'jobs')
+            count (int): Total number of records to generate
+            file_path (str): Path of the output file
+            format (str): Output format ('csv' or 'arrow')
+            chunk_size (int): Number of records generated and written at a time
+            keywords (str): Search keywords used to derive job titles
+            location (str): Location assigned to every record
+
+        Returns:
+            str: Path to the written file, or None if writing failed
+        """
+        output_dir = os.path.dirname(file_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        chunks = self.iter_chunks(kind, count, chunk_size, keywords, location)
+
+        try:
+            if format.lower() == "csv":
+                for i, chunk in enumerate(chunks):
+                    chunk.to_csv(file_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+            elif format.lower() == "arrow":
+                import pyarrow as pa
+
+                writer = None
+                try:
+                    for chunk in chunks:
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        if writer is None:
+                            writer = pa.ipc.new_file(file_path, table.schema)
+                        writer.write_table(table)
+                finally:
+                    if writer is not None:
+                        writer.close()
+            else:
+                logger.error(f"Unsupported output format: {format}")
+                return None
+        except ImportError:
+            logger.error("pyarrow is required for Arrow output")
+            return None
+        except Exception as e:
+            logger.error(f"Error writing mock {kind}: {str(e)}")
+            return None
+
+        logger.info(f"Wrote {count} mock {kind} to {file_path}")
+        return file_path
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Generate synthetic LinkedIn data for load testing")
+    parser.add_argument("kind", choices=["profiles", "jobs"], help="Type of record to generate")
+    parser.add_argument("count", type=int, help="Number of records to generate")
+    parser.add_argument("--output", help="Output file (default: data/mock_<kind>.<format>)")
+    parser.add_argument("--format", choices=["csv", "arrow"], default="csv", help="Output format")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Records per chunk")
+    parser.add_argument("--keywords", default="software engineer", help="Keywords used for job titles")
+    parser.add_argument("--location", default=None, help="Location assigned to every record")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join("data", f"mock_{args.kind}.{args.format}")
+    MockDataGenerator(seed=args.seed).write(
+        args.kind,
+        args.count,
+        output,
+        format=args.format,
+        chunk_size=args.chunk_size,
+        keywords=args.keywords,
+        location=args.location
+    )
@@ -0,0 +1,365 @@
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import quote
+
+logger = logging.getLogger("proxy_pool")
+
+# Statuses that mean the target has throttled or blocked the proxy
+BLOCK_STATUSES = (429, 999)
+
+
+def credential_env_names(host, port):
+    """
+    Get the environment variables a proxy's credentials are read from.
+    
+    Config files name these variables instead of holding the credentials,
+    e.g. PROXY_PROXY1_EXAMPLE_COM_22225_USERNAME for proxy1.example.com:22225.
+    
+    Args:
+        host (str): Proxy host name
+        port (int): Proxy port
+    
+    Returns:
+        tuple: (username variable, password variable)
+    """
+    prefix = "PROXY_" + re.sub(r"[^A-Z0-9]+", "_", f"{host}_{port}".upper()).strip("_")
+    return f"{prefix}_USERNAME", f"{prefix}_PASSWORD"
+
+
+class ProxyEndpoint:
+    """
+    A single proxy endpoint and its health statistics.
+
+    Latency, success rate and block rate are tracked as exponentially weighted
+    moving averages, so recent behaviour counts more than old behaviour.
+    """
+
+    def __init__(self, host, port, username=None, password=None):
+        """
+        Initialize the proxy endpoint.
+
+        Args:
+            host (str): Proxy host name
+            port (int): Proxy port
+            username (str): Proxy username (optional)
+            password (str): Proxy password (optional)
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        # Environment variables named by the config file that could not be resolved
+        self.missing_credentials = []
+
+        self.latency = None
+        self.success_rate = 1.0
+        self.block_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+
+    @property
+    def key(self):
+        """
+        str: Identifier of the endpoint (host:port)
+        """
+        return f"{self.host}:{self.port}"
+
+    @property
+    def url(self):
+        """
+        str: Proxy URL including credentials
+        """
+        if self.username:
+            # Quoted, so credentials containing '@', ':' or '/' keep the URL intact
+            return f"http://{quote(self.username, safe='')}:{quote(self.password or '', safe='')}@{self.host}:{self.port}"
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def proxies(self):
+        """
+        dict: Proxy mapping in the format expected by requests
+        """
+        return {'http': self.url, 'https': self.url}
+
+    def score(self):
+        """
+        Score the endpoint's health; higher is better.
+
+        Returns:
+            float: Health score
+        """
+        # Unmeasured endpoints score as if they were instant, so they get tried early
+        latency = self.latency if self.latency is not None else 0.0
+        return self.success_rate * (1.0 - self.block_rate) / (1.0 + latency) / (1.0 + self.in_flight)
+
+    def to_dict(self):
+        """
+        Get the endpoint's connection settings for a config file.
+
+        Credentials are left out; endpoints that have them name the
+        environment variables to read them from instead (see
+        `credential_env_names`).
+
+        Returns:
+            dict: Host and port, plus username_env and password_env for endpoints with credentials
+        """
+        config = {'host': self.host, 'port': self.port}
+        if self.username or self.password:
+            config['username_env'], config['password_env'] = credential_env_names(self.host, self.port)
+        return config
+
+    @classmethod
+    def from_dict(cls, config, fallback=None):
+        """
+        Create an endpoint from a config file entry.
+
+        Credentials are read from the environment variables named by
+        username_env and password_env, or taken from `fallback` when a
+        variable is not set. Variables that resolve to neither are listed in
+        the endpoint's `missing_credentials`. Entries holding username and
+        password themselves are still accepted.
+
+        Args:
+            config (dict): host and port, plus optional username_env/password_env or username/password
+            fallback (tuple): (username, password) to use for unset variables, e.g. from the settings form
+
+        Returns:
+            ProxyEndpoint: The endpoint
+        """
+        credentials = {}
+        missing = []
+        for position, field in enumerate(("username", "password")):
+            env_name = config.get(f"{field}_env")
+            if env_name:
+                credentials[field] = os.environ.get(env_name) or (fallback[position] if fallback else None)
+                if not credentials[field]:
+                    missing.append(env_name)
+                    logger.warning(f"Environment variable {env_name} for proxy {config['host']}:{config['port']} is not set")
+            else:
+                credentials[field] = config.get(field)
+
+        endpoint = cls(config['host'], config['port'], **credentials)
+        endpoint.missing_credentials = missing
+        return endpoint
+
+
+class ProxyPool:
+    """
+    Rotating pool of proxy endpoints with health scoring.
+
+    Each request is assigned to an endpoint at random, weighted by health
+    score, with requests already in flight counting against an endpoint. The
+    healthiest endpoints get most of the traffic while the rest keep being
+    rotated through and re-measured. Endpoints that fail repeatedly or are
+    mostly blocked are quarantined for a while.
+    """
+
+    def __init__(self, endpoints, alpha=0.2, failure_threshold=3, block_threshold=0.5, quarantine_seconds=300.0,
+                 rng=None):
+        """
+        Initialize the proxy pool.
+
+        Args:
+            endpoints (list): List of ProxyEndpoint objects
+            alpha (float): Weight of the newest observation in the moving averages
+            failure_threshold (int): Consecutive failures that quarantine an endpoint
+            block_threshold (float): Block rate above which an endpoint is quarantined
+            quarantine_seconds (float): How long a quarantined endpoint is skipped
+            rng (random.Random): Random number generator for endpoint selection
+        """
+        self.endpoints = list(endpoints)
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.block_threshold = block_threshold
+        self.quarantine_seconds = quarantine_seconds
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, file_path, fallback_credentials=None):
+        """
+        Create a pool from a JSON config file.
+
+        The file contains a "proxies" list of objects with host and port, plus
+        username_env and password_env naming the environment variables that
+        hold the credentials, and optional pool settings (alpha,
+        failure_threshold, block_threshold, quarantine_seconds).
+
+        Args:
+            file_path (str): Path to the config file
+            fallback_credentials (dict): (username, password) by endpoint key (host:port), used when
+                the environment variables are not set
+
+        Returns:
+            ProxyPool: The configured pool
+        """
+        with open(file_path, "r") as f:
+            config = json.load(f)
+
+        fallback_credentials = fallback_credentials or {}
+        endpoints = [
+            ProxyEndpoint.from_dict(proxy, fallback_credentials.get(f"{proxy['host']}:{proxy['port']}"))
+            for proxy in config.get("proxies", [])
+        ]
+        settings = {k: config[k] for k in ("alpha", "failure_threshold", "block_threshold", "quarantine_seconds") if k in config}
+        logger.info(f"Loaded {len(endpoints)} proxies from {file_path}")
+        return cls(endpoints, **settings)
+
+    @classmethod
+    def from_lines(cls, text, **settings):
+        """
+        Create a pool from text with one proxy per line.
+
+        Lines have the form host:port or host:port:username:password. Blank
+        lines and lines starting with # are ignored.
+
+        Args:
+            text (str): Proxy list
+            **settings: Pool settings passed to the constructor
+
+        Returns:
+            ProxyPool: The configured pool
+        """
+        endpoints = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            parts = line.split(":", 3)
+            if len(parts) == 2:
+                endpoints.append(ProxyEndpoint(parts[0], parts[1]))
+            elif len(parts) == 4:
+                endpoints.append(ProxyEndpoint(*parts))
+            else:
+                logger.warning(f"Ignoring invalid proxy line: {line}")
+
+        return cls(endpoints, **settings)
+
+    def save_config(self, file_path):
+        """
+        Write the pool's endpoints and settings to a JSON config file.
+        
+        Credentials are not written; see `ProxyEndpoint.to_dict`.
+
+        Args:
+            file_path (str): Path to the config file
+
+        Returns:
+            str: Path to the written file
+        """
+        config = {
+            'alpha': self.alpha,
+            'failure_threshold': self.failure_threshold,
+            'block_threshold': self.block_threshold,
+            'quarantine_seconds': self.quarantine_seconds,
+            'proxies': [endpoint.to_dict() for endpoint in self.endpoints]
+        }
+        with open(file_path, "w") as f:
+            json.dump(config, f, indent=2)
+        return file_path
+
+    def acquire(self, exclude=None):
+        """
+        Assign a request to an available endpoint, favouring healthy ones.
+
+        Args:
+            exclude (set): Keys of endpoints not to use
+
+        Returns:
+            ProxyEndpoint: Endpoint to use, or None if every endpoint is quarantined or excluded
+        """
+        exclude = exclude or ()
+        now = time.monotonic()
+        with self._lock:
+            available = [e for e in self.endpoints if e.quarantined_until <= now and e.key not in exclude]
+            if not available:
+                return None
+
+            weights = [e.score() for e in available]
+            if sum(weights) > 0:
+                endpoint = self.rng.choices(available, weights=weights)[0]
+            else:
+                endpoint = self.rng.choice(available)
+            endpoint.in_flight += 1
+            return endpoint
+
+    def cancel(self, endpoint):
+        """
+        Release an endpoint that was acquired but not used.
+
+        Args:
+            endpoint (ProxyEndpoint): Endpoint returned by acquire()
+        """
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+
+    def release(self, endpoint, latency=None, status_code=None):
+        """
+        Record the outcome of a request and release the endpoint.
+
+        Args:
+            endpoint (ProxyEndpoint): Endpoint returned by acquire()
+            latency (float): Request duration in seconds (None if the request failed)
+            status_code (int): HTTP status code (None for a connection error)
+        """
+        success = status_code == 200
+        blocked = status_code in BLOCK_STATUSES
+        alpha = self.alpha
+
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            endpoint.requests += 1
+
+            if latency is not None:
+                endpoint.latency = latency if endpoint.latency is None else (1 - alpha) * endpoint.latency + alpha * latency
+            endpoint.success_rate = (1 - alpha) * endpoint.success_rate + alpha * (1.0 if success else 0.0)
+            endpoint.block_rate = (1 - alpha) * endpoint.block_rate + alpha * (1.0 if blocked else 0.0)
+            endpoint.consecutive_failures = 0 if success else endpoint.consecutive_failures + 1
+
+            if endpoint.consecutive_failures >= self.failure_threshold or endpoint.block_rate > self.block_threshold:
+                endpoint.quarantined_until = time.monotonic() + self.quarantine_seconds
+                endpoint.consecutive_failures = 0
+                # Give the endpoint a fresh start once the quarantine ends
+                endpoint.block_rate = 0.0
+                endpoint.success_rate = 0.5
+                logger.warning(f"Quarantined proxy {endpoint.key} for {self.quarantine_seconds:.0f}s")
+
+    def missing_credentials(self):
+        """
+        List the credential environment variables the pool's endpoints could not resolve.
+        
+        Returns:
+            list: Variable names; requests through those endpoints will fail authentication
+        """
+        return [name for endpoint in self.endpoints for name in endpoint.missing_credentials]
+    
+    def stats(self):
+        """
+        Get the health statistics of every endpoint.
+
+        Returns:
+            list: List of dictionaries, one per endpoint
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'proxy': endpoint.key,
+                    'score': round(endpoint.score(), 4),
+                    'latency_ms': round(endpoint.latency * 1000, 1) if endpoint.latency is not None else None,
+                    'success_rate': round(endpoint.success_rate, 3),
+                    'block_rate': round(endpoint.block_rate, 3),
+                    'in_flight': endpoint.in_flight,
+                    'requests': endpoint.requests,
+                    'quarantined_for_s': max(0, round(endpoint.quarantined_until - now))
+                }
+                for endpoint in self.endpoints
+            ]
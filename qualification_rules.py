@@ -0,0 +1,181 @@
+import logging
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from company_resolver import normalize_company_name
+from metrics import registry
+
+logger = logging.getLogger("qualification_rules")
+
+# Lead columns rules can test, and the operators each accepts
+RULE_FIELDS = {
+    "title": ("contains", "equals"),
+    "company": ("contains", "equals"),
+    "industry": ("contains", "equals"),
+    "company_size": ("contains", "equals"),
+    "location": ("contains", "equals"),
+    "connections": ("at_least", "at_most")
+}
+
+QualificationRule = namedtuple("QualificationRule", ["field", "operator", "value", "weight"])
+
+
+def _text_key(field, value):
+    """
+    Reduce a text value to the form compared by 'equals' rules.
+
+    Company names are normalized like the company resolver does, so an
+    'equals' rule for "Google" also matches "Google LLC".
+
+    Args:
+        field (str): Lead column the value belongs to
+        value (str): Value as scraped or entered
+
+    Returns:
+        str: Comparison key
+    """
+    if field == "company":
+        return normalize_company_name(value)
+    return value.strip().lower() if isinstance(value, str) else ""
+
+
+class QualificationRules:
+    """
+    Weighted rules that decide which leads are qualified.
+
+    Each rule tests one lead column: text columns match any of a list of
+    terms ('contains' or 'equals'), and connections are compared with a
+    number ('at_least' or 'at_most'). A lead's score is the sum of the
+    weights of the rules it matches, and leads scoring at least the
+    threshold are qualified.
+
+    Rules are compiled once into regular expressions and key sets, and
+    applied to whole frames: text rules are evaluated on the distinct values
+    of a column and broadcast back to the rows, so a batch of leads with a
+    few dozen distinct titles costs a few dozen matches.
+    """
+
+    def __init__(self, rules, threshold=1.0):
+        """
+        Initialize the rules.
+
+        Args:
+            rules (list): QualificationRule objects (or tuples/dicts with the same fields)
+            threshold (float): Minimum score of a qualified lead
+        """
+        self.rules = []
+        for rule in rules:
+            rule = QualificationRule(**rule) if isinstance(rule, dict) else QualificationRule(*rule)
+            if rule.field not in RULE_FIELDS:
+                raise ValueError(f"Unsupported rule field: {rule.field}")
+            if rule.operator not in RULE_FIELDS[rule.field]:
+                raise ValueError(f"Unsupported operator for {rule.field}: {rule.operator}")
+            self.rules.append(rule._replace(weight=float(rule.weight)))
+
+        self.threshold = float(threshold)
+        self._compiled = [self._compile(rule) for rule in self.rules]
+
+    @staticmethod
+    def _compile(rule):
+        if rule.operator in ("at_least", "at_most"):
+            return float(rule.value)
+
+        terms = [rule.value] if isinstance(rule.value, str) else list(rule.value)
+        terms = [term.strip() for term in terms if isinstance(term, str) and term.strip()]
+        if rule.operator == "contains":
+            # One alternation per rule; None matches nothing
+            return re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) if terms else None
+        return {_text_key(rule.field, term) for term in terms} - {""}
+
+    def _rule_mask(self, rule, compiled, df):
+        """
+        Test one rule against every lead.
+
+        Args:
+            rule (QualificationRule): Rule to test
+            compiled: Compiled form of the rule
+            df (DataFrame): Leads
+
+        Returns:
+            ndarray: Boolean match per lead
+        """
+        if rule.field not in df.columns or compiled is None:
+            return np.zeros(len(df), dtype=bool)
+
+        column = df[rule.field]
+        if rule.operator in ("at_least", "at_most"):
+            numbers = pd.to_numeric(column, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            # Leads without a count match neither operator
+            with np.errstate(invalid="ignore"):
+                return numbers >= compiled if rule.operator == "at_least" else numbers <= compiled
+
+        codes, uniques = pd.factorize(column)
+        values = pd.Series(uniques, dtype=object)
+        if rule.operator == "contains":
+            matches = values.map(lambda value: isinstance(value, str) and compiled.search(value) is not None)
+        else:
+            matches = values.map(lambda value: _text_key(rule.field, value) in compiled)
+        # Missing values have code -1, which picks the trailing False
+        return np.append(matches.to_numpy(dtype=bool), False)[codes]
+
+    def score(self, df):
+        """
+        Score leads against the rules.
+
+        Args:
+            df (DataFrame): Leads
+
+        Returns:
+            Series: Sum of the weights of the matched rules per lead
+        """
+        scores = np.zeros(len(df), dtype="float64")
+        for rule, compiled in zip(self.rules, self._compiled):
+            scores += rule.weight * self._rule_mask(rule, compiled, df)
+        return pd.Series(scores, index=df.index, name="qualification_score")
+
+    def qualify(self, df):
+        """
+        Decide which leads the rules qualify.
+
+        Args:
+            df (DataFrame): Leads
+
+        Returns:
+            Series: True for leads scoring at least the threshold (all False without rules)
+        """
+        if not self.rules:
+            return pd.Series(False, index=df.index, name="is_qualified")
+
+        with registry.timer("qualification_rules_seconds"):
+            qualified = (self.score(df) >= self.threshold).rename("is_qualified")
+        registry.increment("qualification_rules_leads_total", len(df))
+        registry.increment("qualification_rules_qualified_total", int(qualified.sum()))
+        return qualified
+
+    def to_dict(self):
+        """
+        Get the rules in a JSON-serializable form.
+
+        Returns:
+            dict: rules and threshold
+        """
+        return {
+            'rules': [rule._asdict() for rule in self.rules],
+            'threshold': self.threshold
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create rules from the output of `to_dict`.
+
+        Args:
+            data (dict): rules and threshold
+
+        Returns:
+            QualificationRules: Compiled rules
+        """
+        return cls(data.get('rules', []), data.get('threshold', 1.0))
@@ -0,0 +1,145 @@
+import heapq
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ingest_pipeline import IngestPipeline
+from metrics import registry
+
+logger = logging.getLogger("recrawl_scheduler")
+
+DAY_SECONDS = 86400.0
+
+
+class RecrawlScheduler:
+    """
+    Plans and runs re-crawls of stored leads that have gone stale.
+
+    A lead can only be fetched again by re-running a search that found it,
+    so the scheduler picks queries rather than single leads. Each lead gets a
+    refresh interval between `min_interval` and `max_interval` depending on
+    how often its content has changed when it was fetched again: leads that
+    keep changing are refreshed often, leads that never change rarely. A lead
+    is stale once it has gone unfetched for longer than its interval. A query's
+    priority is the sum of how overdue its stale leads are, and queries without
+    stale leads are not re-run.
+
+    Re-fetched leads whose content hash is unchanged only get their fetch
+    time updated (see `DataManager.upsert_leads`).
+    """
+
+    def __init__(self, data_manager, min_interval=DAY_SECONDS, max_interval=30 * DAY_SECONDS):
+        """
+        Initialize the scheduler.
+
+        Args:
+            data_manager (DataManager): Data manager holding the leads and their provenance
+            min_interval (float): Refresh interval in seconds for leads that change on every fetch
+            max_interval (float): Refresh interval in seconds for leads that never change
+        """
+        self.data_manager = data_manager
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+    def refresh_intervals(self, freshness):
+        """
+        Calculate each lead's refresh interval from how often it has changed.
+
+        Args:
+            freshness (DataFrame): Lead freshness with fetch_count and change_count
+
+        Returns:
+            Series: Refresh interval in seconds per lead
+        """
+        # Smoothed, so a lead fetched only once starts in the middle of the range
+        change_rate = ((freshness['change_count'] + 1) / (freshness['fetch_count'] + 1)).clip(0.0, 1.0)
+        return self.max_interval - (self.max_interval - self.min_interval) * change_rate
+
+    def plan(self, now=None, max_searches=None):
+        """
+        List the searches that are due, most overdue first.
+
+        Args:
+            now (datetime): Time to plan for (defaults to the current time)
+            max_searches (int): Maximum number of searches to return (optional)
+
+        Returns:
+            list: Searches, each a dict with keywords, location, limit, stale_leads and priority
+        """
+        now = now or datetime.now()
+        freshness = self.data_manager.get_lead_freshness()
+        if freshness.empty:
+            return []
+
+        last_fetched = pd.to_datetime(freshness['last_fetched_at'], format="ISO8601", errors="coerce")
+        age = (now - last_fetched).dt.total_seconds().fillna(np.inf)
+        freshness['overdue'] = age / self.refresh_intervals(freshness)
+
+        stale = freshness[freshness['overdue'] >= 1.0]
+        queries = stale.groupby(['keywords', 'location'], as_index=False).agg(
+            stale_leads=('profile_url', 'size'),
+            priority=('overdue', 'sum'),
+            limit=('result_limit', 'max')
+        )
+
+        heap = [
+            (-query.priority, query.keywords, query.location, query.stale_leads, query.limit)
+            for query in queries.itertuples(index=False)
+        ]
+        heapq.heapify(heap)
+
+        planned = []
+        while heap and (max_searches is None or len(planned) < max_searches):
+            priority, keywords, location, stale_leads, limit = heapq.heappop(heap)
+            planned.append({
+                'keywords': keywords,
+                'location': location,
+                'limit': int(limit) if pd.notna(limit) else 10,
+                'stale_leads': int(stale_leads),
+                'priority': round(-priority, 2)
+            })
+        return planned
+
+    def run(self, scraper_factory, max_searches=None, workers=2, pipeline=None, now=None):
+        """
+        Re-run the searches that are due and record them in the search history.
+
+        Args:
+            scraper_factory (callable): Function returning a new scraper
+            max_searches (int): Maximum number of searches to run (optional)
+            workers (int): Number of searches to run at the same time
+            pipeline (IngestPipeline): Pipeline to store the results with (optional)
+            now (datetime): Time to plan for (defaults to the current time)
+
+        Returns:
+            IngestResult: Result of the re-crawl, or None if nothing was due
+        """
+        planned = self.plan(now, max_searches)
+        if not planned:
+            logger.info("No leads are due for a re-crawl")
+            return None
+
+        pipeline = pipeline or IngestPipeline(self.data_manager)
+        searches = [{'keywords': p['keywords'], 'location': p['location'], 'limit': p['limit']} for p in planned]
+        result = pipeline.run(searches, scraper_factory, workers=workers)
+
+        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for index, search in enumerate(searches):
+            if index in result.errors:
+                continue
+            self.data_manager.append_search_history({
+                'keywords': search['keywords'],
+                'location': search['location'],
+                'date': date,
+                'results': result.counts[index],
+                'result_limit': search['limit'],
+                'new_leads': result.new_counts[index],
+                'run_id': result.run_ids[index]
+            })
+
+        registry.increment("recrawl_searches_total", len(searches))
+        registry.increment("recrawl_stale_leads_total", sum(p['stale_leads'] for p in planned))
+        logger.info(f"Re-crawled {len(searches)} searches covering {sum(p['stale_leads'] for p in planned)} stale leads")
+        return result
@@ -0,0 +1,308 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (str): Header value, either delay seconds or an HTTP date
+        now (datetime): Current time, for HTTP dates (defaults to now in UTC)
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class StatusPolicy:
+    """
+    How the scraper reacts to one kind of failed response.
+    """
+
+    def __init__(self, retry=True, base_delay=5.0, max_delay=60.0, honor_retry_after=False, trips_breaker=False):
+        """
+        Initialize the status policy.
+
+        Args:
+            retry (bool): Whether the request should be retried
+            base_delay (float): Minimum backoff delay in seconds
+            max_delay (float): Maximum backoff delay in seconds
+            honor_retry_after (bool): Whether to wait as long as the Retry-After header asks
+            trips_breaker (bool): Whether the failure counts towards opening the circuit breaker
+        """
+        self.retry = retry
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.honor_retry_after = honor_retry_after
+        self.trips_breaker = trips_breaker
+
+
+# Statuses that mean the target is throttling or blocking us get a much longer
+# backoff than transient server errors and count towards the circuit breaker.
+DEFAULT_STATUS_POLICIES = {
+    429: StatusPolicy(retry=True, base_delay=30.0, max_delay=300.0, honor_retry_after=True, trips_breaker=True),
+    999: StatusPolicy(retry=True, base_delay=40.0, max_delay=600.0, trips_breaker=True),
+    500: StatusPolicy(retry=True, base_delay=5.0, max_delay=60.0),
+    502: StatusPolicy(retry=True, base_delay=5.0, max_delay=60.0),
+    503: StatusPolicy(retry=True, base_delay=5.0, max_delay=120.0, honor_retry_after=True),
+    504: StatusPolicy(retry=True, base_delay=5.0, max_delay=60.0),
+}
+
+# Policy for connection errors and timeouts
+NETWORK_ERROR_POLICY = StatusPolicy(retry=True, base_delay=5.0, max_delay=60.0, trips_breaker=True)
+
+# Policy for any other non-200 status (e.g. 403, 404), which retrying will not fix
+DEFAULT_POLICY = StatusPolicy(retry=False)
+
+
+class RetryPolicy:
+    """
+    Decides whether and how long to wait before retrying a request.
+
+    Delays use decorrelated jitter: each delay is drawn uniformly between the
+    policy's base delay and three times the previous delay, capped at the
+    policy's maximum. This spreads out retries from concurrent workers instead
+    of having them retry in lockstep.
+    """
+
+    def __init__(self, max_attempts=3, status_policies=None, rng=None):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts (int): Maximum number of attempts per request, including the first
+            status_policies (dict): Policies by HTTP status (defaults to DEFAULT_STATUS_POLICIES)
+            rng (random.Random): Random number generator for jitter
+        """
+        self.max_attempts = max_attempts
+        self.status_policies = status_policies if status_policies is not None else dict(DEFAULT_STATUS_POLICIES)
+        self.rng = rng or random.Random()
+
+    def policy_for(self, status_code):
+        """
+        Get the policy for a response status.
+
+        Args:
+            status_code (int): HTTP status code, or None for a network error
+
+        Returns:
+            StatusPolicy: Policy to apply
+        """
+        if status_code is None:
+            return NETWORK_ERROR_POLICY
+        return self.status_policies.get(status_code, DEFAULT_POLICY)
+
+    def next_delay(self, policy, previous_delay=None, retry_after=None):
+        """
+        Compute the delay before the next attempt.
+
+        Args:
+            policy (StatusPolicy): Policy for the failure being retried
+            previous_delay (float): Delay used before the previous retry (None for the first retry)
+            retry_after (float): Seconds requested by the server's Retry-After header
+
+        Returns:
+            float: Seconds to wait, or None if the server asks for a longer wait than the policy allows
+        """
+        previous_delay = previous_delay or policy.base_delay
+        delay = min(policy.max_delay, self.rng.uniform(policy.base_delay, previous_delay * 3))
+
+        if policy.honor_retry_after and retry_after is not None:
+            if retry_after > policy.max_delay:
+                return None
+            delay = max(delay, retry_after)
+
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a target keeps blocking requests.
+
+    After `failure_threshold` consecutive blocking failures the breaker opens
+    and rejects requests for `recovery_timeout` seconds. It then lets a single
+    probe request through; success closes the breaker, failure reopens it.
+    Failures that say nothing about blocking (e.g. a 500) leave the count
+    alone, and a probe ending in one is retried with the next request.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=120.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker
+            recovery_timeout (float): Seconds to stay open before probing again
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            bool: True if the request may proceed
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                # Let exactly one probe through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Record a successful request.
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_inconclusive(self):
+        """
+        Record a failed request that does not count towards opening the breaker.
+        
+        Consecutive blocking failures keep counting across it. A half-open
+        breaker's probe proved nothing, so the next request probes again.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.recovery_timeout
+    
+    def record_failure(self):
+        """
+        Record a blocking failure.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers keyed by target, e.g. host or host and proxy.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=120.0):
+        """
+        Initialize the registry.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a breaker
+            recovery_timeout (float): Seconds a breaker stays open before probing again
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get the breaker for a target, creating it if needed.
+
+        Args:
+            key (str): Target key
+
+        Returns:
+            CircuitBreaker: Breaker for the target
+        """
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+            return breaker
+
+    def states(self):
+        """
+        Get the state of every breaker.
+
+        Returns:
+            dict: Breaker state by target key
+        """
+        with self._lock:
+            return {key: breaker.state for key, breaker in self._breakers.items()}
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of overall request volume.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so
+    when a target starts failing, retries cannot multiply the load on it
+    beyond roughly (1 + ratio) times the normal request rate.
+    """
+
+    def __init__(self, ratio=0.2, min_tokens=3.0, max_tokens=50.0):
+        """
+        Initialize the retry budget.
+
+        Args:
+            ratio (float): Retries allowed per request
+            min_tokens (float): Tokens available before any request is made
+            max_tokens (float): Maximum number of saved-up tokens
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        """
+        Record a new (non-retry) request.
+        """
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_acquire(self):
+        """
+        Withdraw a token for a retry.
+
+        Returns:
+            bool: True if the retry is within budget
+        """
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+# Process-wide defaults, so breakers and the budget survive the scraper being
+# recreated for every search.
+default_circuit_breakers = CircuitBreakerRegistry()
+default_retry_budget = RetryBudget()
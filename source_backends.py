@@ -0,0 +1,495 @@
+import codecs
+import logging
+import os
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from metrics import registry
+
+logger = logging.getLogger("source_backends")
+
+# Paths of the LinkedIn guest endpoints, relative to the backend base URL
+JOB_SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+PEOPLE_SEARCH_PATH = "/search/results/people/"
+
+# Number of result cards LinkedIn returns per guest search page
+PAGE_SIZE = 10
+
+# Size of the chunks read from streamed responses, in bytes
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Opening tag of a result card, i.e. a div whose class list contains "base-card"
+CARD_START = re.compile(r'<div\b[^>]*\bclass="(?:[^"]*\s)?base-card(?:\s[^"]*)?"')
+
+# Characters kept from the end of the buffer when no card has started yet, so
+# an opening tag split across two chunks is still found
+CARD_START_LOOKBEHIND = 512
+
+
+def _card_text(card, selector):
+    """
+    Get the stripped text of the first element matching a CSS selector.
+
+    Args:
+        card (Tag): Result card element
+        selector (str): CSS selector
+
+    Returns:
+        str: Element text, or None if no element matches
+    """
+    element = card.select_one(selector)
+    if element is None:
+        return None
+    text = element.get_text(" ", strip=True)
+    return text or None
+
+
+def _card_link(card, selector):
+    """
+    Get the href of the first link matching a CSS selector, without tracking parameters.
+
+    Args:
+        card (Tag): Result card element
+        selector (str): CSS selector
+
+    Returns:
+        str: Link URL, or None if no link matches
+    """
+    element = card.select_one(selector)
+    if element is None or not element.get("href"):
+        return None
+    return element["href"].split("?")[0]
+
+
+def parse_job_card(card):
+    """
+    Parse a single job result card.
+
+    Args:
+        card (Tag): Job card element from a guest job search page
+
+    Returns:
+        dict: Job listing in the scraper's job format
+    """
+    urn = card.get("data-entity-urn") or ""
+    job_id = urn.rsplit(":", 1)[-1] if urn else None
+    url = _card_link(card, "a.base-card__full-link")
+    if not job_id and url:
+        match = re.search(r"(\d+)/?$", url)
+        job_id = match.group(1) if match else None
+
+    return {
+        'id': job_id,
+        'title': _card_text(card, ".base-search-card__title"),
+        'company': _card_text(card, ".base-search-card__subtitle"),
+        'location': _card_text(card, ".job-search-card__location"),
+        'url': url,
+        'description': None,
+        'criteria': {},
+        'application_type': None,
+        'company_details': {"url": _card_link(card, ".base-search-card__subtitle a")},
+        'posting_date': _card_text(card, "time")
+    }
+
+
+def parse_profile_card(card):
+    """
+    Parse a single people search result card.
+
+    Args:
+        card (Tag): Profile card element from a people search page
+
+    Returns:
+        dict: Profile in the scraper's profile format
+    """
+    headline = _card_text(card, ".base-search-card__subtitle") or ""
+    title, _, company = headline.partition(" at ")
+    connections = _card_text(card, ".people-search-card__connections")
+    if connections:
+        digits = re.sub(r"\D", "", connections)
+        connections = int(digits) if digits else None
+
+    return {
+        'name': _card_text(card, ".base-search-card__title"),
+        'title': title or None,
+        'company': company or None,
+        'location': _card_text(card, ".people-search-card__location"),
+        'profile_url': _card_link(card, "a.base-card__full-link"),
+        'connections': connections,
+        'is_qualified': False,
+        'industry': _card_text(card, ".people-search-card__industry"),
+        'company_size': _card_text(card, ".people-search-card__company-size")
+    }
+
+
+def parse_result_cards(html, kind):
+    """
+    Parse every result card on a search results page.
+
+    Args:
+        html (str): Page HTML
+        kind (str): Type of result ('profiles' or 'jobs')
+
+    Returns:
+        list: List of parsed records
+    """
+    with registry.timer("parse_seconds", kind=kind):
+        soup = BeautifulSoup(html, "html.parser")
+        parse_card = parse_profile_card if kind == "profiles" else parse_job_card
+        return [parse_card(card) for card in soup.select("div.base-card")]
+
+
+class IncrementalCardParser:
+    """
+    Parses result cards from a page that arrives in chunks.
+
+    Cards are split on their opening tags; a card is parsed as soon as the
+    next card starts, so the caller can stop reading the response once it
+    has enough results instead of buffering the whole page.
+    """
+
+    def __init__(self, kind):
+        """
+        Initialize the parser.
+
+        Args:
+            kind (str): Type of result ('profiles' or 'jobs')
+        """
+        self.kind = kind
+        self._buffer = ""
+
+    def _parse(self, fragment):
+        with registry.timer("parse_seconds", kind=self.kind):
+            soup = BeautifulSoup(fragment, "html.parser")
+            parse_card = parse_profile_card if self.kind == "profiles" else parse_job_card
+            return [parse_card(card) for card in soup.select("div.base-card")]
+
+    def feed(self, text):
+        """
+        Add the next piece of the page.
+
+        Args:
+            text (str): Decoded page text
+
+        Returns:
+            list: Records for the cards completed by this piece
+        """
+        self._buffer += text
+        starts = [match.start() for match in CARD_START.finditer(self._buffer)]
+
+        if not starts:
+            self._buffer = self._buffer[-CARD_START_LOOKBEHIND:]
+            return []
+
+        records = []
+        for card_start, next_start in zip(starts, starts[1:]):
+            records.extend(self._parse(self._buffer[card_start:next_start]))
+        self._buffer = self._buffer[starts[-1]:]
+        return records
+
+    def close(self):
+        """
+        Finish the page.
+
+        Returns:
+            list: Records for the last card, if any
+        """
+        buffer, self._buffer = self._buffer, ""
+        if not CARD_START.match(buffer):
+            return []
+        return self._parse(buffer)
+
+
+def iter_response_cards(response, kind, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Parse result cards from a streamed response as its body arrives.
+
+    The body is decompressed by requests (gzip, deflate, and br/zstd when
+    the brotli/zstandard packages are installed) and decoded incrementally.
+    Closing the generator early stops reading the response.
+
+    Args:
+        response (requests.Response): Response opened with stream=True
+        kind (str): Type of result ('profiles' or 'jobs')
+        chunk_size (int): Number of bytes to read at a time
+
+    Yields:
+        dict: Parsed records, in page order
+    """
+    parser = IncrementalCardParser(kind)
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        yield from parser.feed(decoder.decode(chunk))
+    yield from parser.feed(decoder.decode(b"", final=True))
+    yield from parser.close()
+
+
+def record_transfer_size(response, kind):
+    """
+    Record how many bytes of a response were read over the wire.
+
+    For compressed responses this is the compressed size, i.e. what a proxy
+    bills for.
+
+    Args:
+        response (requests.Response): Response whose body has been read
+        kind (str): Type of result ('profiles' or 'jobs')
+    """
+    tell = getattr(response.raw, "tell", None)
+    if tell is not None:
+        registry.increment("scraper_response_bytes_total", tell(), kind=kind,
+                           encoding=response.headers.get("Content-Encoding", "identity"))
+
+
+def fixture_name(keywords, location, start):
+    """
+    Build the file name under which a search page is recorded.
+
+    Args:
+        keywords (str): Search keywords
+        location (str): Location filter
+        start (int): Result offset of the page
+
+    Returns:
+        str: File name of the recorded page
+    """
+    def slug(value):
+        return re.sub(r"[^a-z0-9]+", "-", (value or "").lower()).strip("-") or "any"
+
+    return f"{slug(keywords)}__{slug(location)}__{start}.html"
+
+
+class SourceBackend:
+    """
+    Interface for the sources that LinkedIn search results are fetched from.
+
+    Subclasses return records in the scraper's profile and job formats, so the
+    rest of the pipeline does not need to know where the data came from.
+    """
+
+    name = "base"
+
+    def search_profiles(self, keywords, location=None, limit=10):
+        """
+        Search for profiles.
+
+        Args:
+            keywords (str): Search keywords
+            location (str): Location filter
+            limit (int): Maximum number of profiles to retrieve
+
+        Returns:
+            list: List of profile data
+        """
+        raise NotImplementedError
+
+    def search_jobs(self, keywords, location, limit=25):
+        """
+        Search for job listings.
+
+        Args:
+            keywords (str): Job search keywords
+            location (str): Job location
+            limit (int): Maximum number of job listings to retrieve
+
+        Returns:
+            list: List of job listings
+        """
+        raise NotImplementedError
+
+    def iter_search(self, kind, keywords, location, limit):
+        """
+        Iterate over search results as they become available.
+
+        Backends that fetch results in pages yield each page's records as soon
+        as it is parsed; the default yields the results of a full search.
+
+        Args:
+            kind (str): Type of result ('profiles' or 'jobs')
+            keywords (str): Search keywords
+            location (str): Location filter
+            limit (int): Maximum number of results to retrieve
+
+        Yields:
+            dict: Profile or job records
+        """
+        if kind == "profiles":
+            yield from self.search_profiles(keywords, location, limit)
+        else:
+            yield from self.search_jobs(keywords, location, limit)
+
+
+class PagedSourceBackend(SourceBackend):
+    """
+    Base class for backends that read paginated search result pages.
+    """
+
+    def _get_page(self, kind, keywords, location, start):
+        """
+        Get the HTML of one search results page.
+
+        Args:
+            kind (str): Type of result ('profiles' or 'jobs')
+            keywords (str): Search keywords
+            location (str): Location filter
+            start (int): Result offset of the page
+
+        Returns:
+            str: Page HTML, or None if the page is unavailable
+        """
+        raise NotImplementedError
+
+    def _get_page_records(self, kind, keywords, location, start, needed):
+        """
+        Get the parsed records of one search results page.
+
+        Args:
+            kind (str): Type of result ('profiles' or 'jobs')
+            keywords (str): Search keywords
+            location (str): Location filter
+            start (int): Result offset of the page
+            needed (int): Number of records still needed; backends may stop parsing once they have these
+
+        Returns:
+            list: List of parsed records, or None if the page is unavailable
+        """
+        html = self._get_page(kind, keywords, location, start)
+        if html is None:
+            return None
+        return parse_result_cards(html, kind)
+
+    def iter_search(self, kind, keywords, location, limit):
+        """
+        Yield results page by page until the limit or the last page is reached.
+
+        Args:
+            kind (str): Type of result ('profiles' or 'jobs')
+            keywords (str): Search keywords
+            location (str): Location filter
+            limit (int): Maximum number of results to retrieve
+
+        Yields:
+            dict: Parsed records
+        """
+        retrieved = 0
+        start = 0
+
+        while retrieved < limit:
+            records = self._get_page_records(kind, keywords, location, start, limit - retrieved)
+            if not records:
+                break
+
+            records = records[:limit - retrieved]
+            retrieved += len(records)
+            start += len(records)
+            yield from records
+
+        logger.info(f"Retrieved {retrieved} {kind} from {self.name} backend")
+
+    def search_profiles(self, keywords, location=None, limit=10):
+        return list(self.iter_search("profiles", keywords, location, limit))
+
+    def search_jobs(self, keywords, location, limit=25):
+        return list(self.iter_search("jobs", keywords, location, limit))
+
+
+class HttpSourceBackend(PagedSourceBackend):
+    """
+    Backend that fetches search result pages over HTTP.
+
+    Points at LinkedIn by default; set `base_url` to a local stub server to
+    exercise the full fetch, parse and store pipeline without network access.
+    Responses are streamed and parsed as they arrive, and reading stops once
+    the search has enough results. Fetched pages can optionally be recorded
+    for later replay, in which case they are read in full.
+    """
+
+    name = "http"
+
+    def __init__(self, fetch, base_url="https://www.linkedin.com", record_dir=None):
+        """
+        Initialize the HTTP backend.
+
+        Args:
+            fetch (callable): Function taking (url, params, stream) and returning a response or None
+            base_url (str): Base URL of the site to fetch from
+            record_dir (str): Directory to record fetched pages to (None to disable)
+        """
+        self.fetch = fetch
+        self.base_url = base_url.rstrip("/")
+        self.record_dir = record_dir
+
+    def _page_url(self, kind, keywords, location, start):
+        path = PEOPLE_SEARCH_PATH if kind == "profiles" else JOB_SEARCH_PATH
+        params = {'keywords': keywords, 'location': location or "", 'start': start}
+        return urljoin(self.base_url + "/", path.lstrip("/")), params
+
+    def _get_page_records(self, kind, keywords, location, start, needed):
+        if self.record_dir:
+            return super()._get_page_records(kind, keywords, location, start, needed)
+
+        url, params = self._page_url(kind, keywords, location, start)
+        response = self.fetch(url, params=params, stream=True)
+        if response is None:
+            return None
+
+        records = []
+        cards = iter_response_cards(response, kind)
+        try:
+            for record in cards:
+                records.append(record)
+                if len(records) >= needed:
+                    registry.increment("scraper_stream_early_stop_total", kind=kind)
+                    break
+        finally:
+            cards.close()
+            record_transfer_size(response, kind)
+            response.close()
+
+        return records
+
+    def _get_page(self, kind, keywords, location, start):
+        url, params = self._page_url(kind, keywords, location, start)
+        response = self.fetch(url, params=params)
+        if response is None:
+            return None
+
+        html = response.text
+        record_transfer_size(response, kind)
+        if self.record_dir:
+            kind_dir = os.path.join(self.record_dir, kind)
+            os.makedirs(kind_dir, exist_ok=True)
+            with open(os.path.join(kind_dir, fixture_name(keywords, location, start)), "w", encoding="utf-8") as f:
+                f.write(html)
+
+        return html
+
+
+class FixtureSourceBackend(PagedSourceBackend):
+    """
+    Backend that replays search result pages recorded by HttpSourceBackend.
+    """
+
+    name = "fixture"
+
+    def __init__(self, fixture_dir):
+        """
+        Initialize the fixture backend.
+
+        Args:
+            fixture_dir (str): Directory containing recorded pages
+        """
+        self.fixture_dir = fixture_dir
+
+    def _get_page(self, kind, keywords, location, start):
+        file_path = os.path.join(self.fixture_dir, kind, fixture_name(keywords, location, start))
+        if not os.path.exists(file_path):
+            if start == 0:
+                logger.warning(f"No recorded page found: {file_path}")
+            return None
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
@@ -0,0 +1,304 @@
+import argparse
+import gzip
+import html
+import logging
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from mock_backend import MockBackend
+from source_backends import JOB_SEARCH_PATH, PAGE_SIZE, PEOPLE_SEARCH_PATH, fixture_name
+
+logger = logging.getLogger("stub_server")
+
+
+def render_job_cards(jobs):
+    """
+    Render job listings as a LinkedIn guest job search page.
+
+    Args:
+        jobs (list): List of job listings
+
+    Returns:
+        str: Page HTML
+    """
+    cards = []
+    for job in jobs:
+        job_number = str(job['id']).rsplit("-", 1)[-1]
+        cards.append(
+            "<li>"
+            f"<div class=\"base-card base-search-card job-search-card\" data-entity-urn=\"urn:li:jobPosting:{html.escape(job_number)}\">"
+            f"<a class=\"base-card__full-link\" href=\"{html.escape(job['url'])}?trk=public_jobs\">"
+            f"<span class=\"sr-only\">{html.escape(job['title'])}</span></a>"
+            "<div class=\"base-search-card__info\">"
+            f"<h3 class=\"base-search-card__title\">{html.escape(job['title'])}</h3>"
+            "<h4 class=\"base-search-card__subtitle\">"
+            f"<a class=\"hidden-nested-link\" href=\"{html.escape(job['company_details']['url'])}?trk=public_jobs\">{html.escape(job['company'])}</a>"
+            "</h4>"
+            "<div class=\"base-search-card__metadata\">"
+            f"<span class=\"job-search-card__location\">{html.escape(job['location'] or '')}</span>"
+            f"<time class=\"job-search-card__listdate\">{html.escape(job['posting_date'])}</time>"
+            "</div></div></div>"
+            "</li>"
+        )
+    return "".join(cards)
+
+
+def render_profile_cards(profiles):
+    """
+    Render profiles as a people search results page.
+
+    Args:
+        profiles (list): List of profile data
+
+    Returns:
+        str: Page HTML
+    """
+    cards = []
+    for profile in profiles:
+        cards.append(
+            "<li>"
+            "<div class=\"base-card base-search-card\">"
+            f"<a class=\"base-card__full-link\" href=\"{html.escape(profile['profile_url'])}?trk=people-guest\">"
+            f"<span class=\"sr-only\">{html.escape(profile['name'])}</span></a>"
+            "<div class=\"base-search-card__info\">"
+            f"<h3 class=\"base-search-card__title\">{html.escape(profile['name'])}</h3>"
+            f"<h4 class=\"base-search-card__subtitle\">{html.escape(profile['title'])} at {html.escape(profile['company'])}</h4>"
+            "<div class=\"base-search-card__metadata\">"
+            f"<p class=\"people-search-card__location\">{html.escape(profile['location'])}</p>"
+            f"<span class=\"people-search-card__connections\">{profile['connections']} connections</span>"
+            f"<span class=\"people-search-card__industry\">{html.escape(profile['industry'])}</span>"
+            f"<span class=\"people-search-card__company-size\">{html.escape(profile['company_size'])}</span>"
+            "</div></div></div>"
+            "</li>"
+        )
+    return "".join(cards)
+
+
+class StubServer:
+    """
+    Local HTTP server that imitates LinkedIn's guest search endpoints.
+
+    Pages are served from recorded fixtures when available and rendered from a
+    replaying MockBackend otherwise. Pages are gzip-compressed for clients
+    that accept it. Latency, 429/999 responses and page size are configurable
+    so the scraper can be benchmarked end to end offline.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, fixture_dir=None, latency=0.0, latency_jitter=0.0,
+                 rate_429=0.0, rate_999=0.0, retry_after=1, page_size=PAGE_SIZE, total_results=100, seed=0):
+        """
+        Initialize the stub server.
+
+        Args:
+            host (str): Interface to bind to
+            port (int): Port to bind to (0 picks a free port)
+            fixture_dir (str): Directory of recorded pages to serve (None to always render)
+            latency (float): Delay in seconds added to every response
+            latency_jitter (float): Maximum extra random delay in seconds
+            rate_429 (float): Fraction of requests answered with 429 Too Many Requests
+            rate_999 (float): Fraction of requests answered with LinkedIn's 999 status
+            retry_after (int): Value of the Retry-After header sent with 429 responses
+            page_size (int): Number of results per rendered page
+            total_results (int): Number of results available per rendered search
+            seed (int): Seed for rendered results and injected failures
+        """
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_429 = rate_429
+        self.rate_999 = rate_999
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self.total_results = total_results
+        self.backend = MockBackend(seed=seed, replay=True)
+        self.rng = random.Random(seed)
+        self.request_count = 0
+        self._results = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """
+        str: Base URL of the running server
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def _render_page(self, kind, keywords, location, start):
+        """
+        Get the HTML of one search results page.
+
+        Args:
+            kind (str): Type of result ('profiles' or 'jobs')
+            keywords (str): Search keywords
+            location (str): Location filter
+            start (int): Result offset of the page
+
+        Returns:
+            str: Page HTML
+        """
+        if self.fixture_dir:
+            file_path = os.path.join(self.fixture_dir, kind, fixture_name(keywords, location, start))
+            if os.path.exists(file_path):
+                with open(file_path, "r", encoding="utf-8") as f:
+                    return f.read()
+
+        end = min(start + self.page_size, self.total_results)
+        if start >= end:
+            return ""
+
+        # Render from the full result set so pages of one search never overlap
+        key = (kind, keywords, location)
+        with self._lock:
+            records = self._results.get(key)
+            if records is None:
+                if kind == "profiles":
+                    records = self.backend.search_profiles(keywords, location or None, self.total_results)
+                else:
+                    records = self.backend.search_jobs(keywords, location, self.total_results)
+                self._results[key] = records
+
+        if kind == "profiles":
+            return render_profile_cards(records[start:end])
+        return render_job_cards(records[start:end])
+
+    def _handle(self, request):
+        """
+        Answer a single GET request.
+
+        Args:
+            request (BaseHTTPRequestHandler): Request being handled
+        """
+        with self._lock:
+            self.request_count += 1
+            roll = self.rng.random()
+            delay = self.latency + self.rng.uniform(0, self.latency_jitter)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if roll < self.rate_429:
+            request.send_response(429)
+            request.send_header("Retry-After", str(self.retry_after))
+            request.end_headers()
+            return
+        if roll < self.rate_429 + self.rate_999:
+            request.send_response(999)
+            request.end_headers()
+            return
+
+        parsed = urlparse(request.path)
+        if parsed.path.rstrip("/") == PEOPLE_SEARCH_PATH.rstrip("/"):
+            kind = "profiles"
+        elif parsed.path.rstrip("/") == JOB_SEARCH_PATH.rstrip("/"):
+            kind = "jobs"
+        else:
+            request.send_response(404)
+            request.end_headers()
+            return
+
+        query = parse_qs(parsed.query)
+        keywords = query.get("keywords", [""])[0]
+        location = query.get("location", [""])[0]
+        start = int(query.get("start", ["0"])[0] or 0)
+
+        body = self._render_page(kind, keywords, location, start).encode("utf-8")
+        accept_encoding = request.headers.get("Accept-Encoding", "")
+        gzipped = "gzip" in accept_encoding.lower()
+        if gzipped:
+            body = gzip.compress(body)
+
+        request.send_response(200)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        if gzipped:
+            request.send_header("Content-Encoding", "gzip")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        Returns:
+            StubServer: This server, for chaining
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stub server listening on {self.url}")
+        return self
+
+    def stop(self):
+        """
+        Stop the server and release its socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        logger.info("Stub server stopped")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Serve LinkedIn-like search pages for offline benchmarking")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind to")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind to")
+    parser.add_argument("--fixture-dir", default=None, help="Directory of recorded pages")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every response (seconds)")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Maximum extra random delay (seconds)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-999", type=float, default=0.0, help="Fraction of requests answered with 999")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Results per page")
+    parser.add_argument("--total-results", type=int, default=100, help="Results available per search")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for results and injected failures")
+    args = parser.parse_args()
+
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        fixture_dir=args.fixture_dir,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_429=args.rate_429,
+        rate_999=args.rate_999,
+        page_size=args.page_size,
+        total_results=args.total_results,
+        seed=args.seed
+    )
+    logger.info(f"Stub server listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,137 @@
+import pandas as pd
+import pytest
+
+from lead_dedup import DuplicateIndex, canonical_profile_url, canonical_profile_urls
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.linkedin.com/in/jane-doe/",
+    "https://www.linkedin.com/in/jane-doe",
+    "http://linkedin.com/in/jane-doe/",
+    "https://de.linkedin.com/in/jane-doe/?trk=people-guest",
+    "https://www.linkedin.com/in/Jane-Doe#experience",
+    "https://www.linkedin.com/de/in/jane-doe/details/experience/",
+    "www.linkedin.com/in/jane-doe",
+    "  https://WWW.LinkedIn.com/in/jane-doe/  ",
+])
+def test_linkedin_url_variants_share_canonical_form(url):
+    assert canonical_profile_url(url) == "https://www.linkedin.com/in/jane-doe/"
+
+
+def test_percent_encoded_slug_is_decoded():
+    assert canonical_profile_url("https://www.linkedin.com/in/j%C3%B6rg/") == "https://www.linkedin.com/in/jörg/"
+
+
+def test_other_sites_keep_their_path():
+    assert canonical_profile_url("HTTPS://Example.com/People/Jane?ref=1#top") == "https://example.com/People/Jane/"
+
+
+@pytest.mark.parametrize("url", [None, "", "   ", float("nan")])
+def test_missing_urls_become_empty(url):
+    assert canonical_profile_url(url) == ""
+
+
+def test_column_canonicalization_keeps_alignment():
+    urls = pd.Series(["http://linkedin.com/in/a", None, "https://www.linkedin.com/in/A/"], index=[10, 11, 12])
+
+    canonical = canonical_profile_urls(urls)
+
+    assert canonical.index.tolist() == [10, 11, 12]
+    assert canonical.tolist() == ["https://www.linkedin.com/in/a/", "", "https://www.linkedin.com/in/a/"]
+
+
+def leads(*rows):
+    return pd.DataFrame(rows, columns=["profile_url", "name", "company"])
+
+
+def test_same_person_under_another_url_is_suggested():
+    index = DuplicateIndex()
+    index.add(leads(("https://www.linkedin.com/in/jane-doe/", "Jane Doe", "Acme Inc")))
+
+    suggestions = index.add(leads(("https://www.linkedin.com/in/jane-doe-1a2b3c/", "Jane  Doe", "ACME")))
+
+    assert suggestions.to_dict("records") == [{
+        'profile_url': "https://www.linkedin.com/in/jane-doe-1a2b3c/",
+        'duplicate_of': "https://www.linkedin.com/in/jane-doe/",
+        'similarity': 1.0,
+        'reason': "name"
+    }]
+
+
+def test_url_variant_is_suggested_by_url():
+    index = DuplicateIndex()
+    index.add(leads(("https://www.linkedin.com/in/jane-doe/", "Jane Doe", "Acme")))
+
+    suggestions = index.add(leads(("http://de.linkedin.com/in/Jane-Doe?trk=x", "J. Doe", "Other")))
+
+    assert suggestions['reason'].tolist() == ["url"]
+    assert suggestions['duplicate_of'].tolist() == ["https://www.linkedin.com/in/jane-doe/"]
+
+
+def test_different_people_are_not_suggested():
+    index = DuplicateIndex()
+
+    suggestions = index.add(leads(
+        ("https://www.linkedin.com/in/a/", "Jane Doe", "Acme"),
+        ("https://www.linkedin.com/in/b/", "Robert Smith", "Globex"),
+        ("https://www.linkedin.com/in/c/", "Jane Doe", "Initech"),
+    ))
+
+    assert suggestions.empty
+
+
+def test_duplicates_within_one_batch_are_found():
+    index = DuplicateIndex()
+
+    suggestions = index.add(leads(
+        ("https://www.linkedin.com/in/a/", "Jane Doe", "Acme"),
+        ("https://www.linkedin.com/in/b/", "Jane Doe", "Acme"),
+    ))
+
+    assert suggestions[['profile_url', 'duplicate_of']].values.tolist() == [
+        ["https://www.linkedin.com/in/b/", "https://www.linkedin.com/in/a/"]
+    ]
+
+
+def test_indexed_leads_are_not_reported_again():
+    index = DuplicateIndex()
+    batch = leads(
+        ("https://www.linkedin.com/in/a/", "Jane Doe", "Acme"),
+        ("https://www.linkedin.com/in/b/", "Jane Doe", "Acme"),
+    )
+    index.add(batch)
+
+    assert index.add(batch).empty
+    assert len(index) == 2
+
+
+def test_leads_without_a_name_are_only_matched_by_url():
+    index = DuplicateIndex()
+
+    suggestions = index.add(leads(
+        ("https://www.linkedin.com/in/a/", "Unknown", "Acme"),
+        ("https://www.linkedin.com/in/b/", "Unknown", "Acme"),
+    ))
+
+    assert suggestions.empty
+
+
+def test_discarded_leads_are_no_longer_matched():
+    index = DuplicateIndex()
+    index.add(leads(("https://www.linkedin.com/in/a/", "Jane Doe", "Acme")))
+
+    index.discard("https://www.linkedin.com/in/a/")
+
+    assert index.add(leads(("https://www.linkedin.com/in/b/", "Jane Doe", "Acme"))).empty
+    assert len(index) == 1
+
+
+def test_signatures_estimate_jaccard_similarity():
+    index = DuplicateIndex(num_perm=256, bands=32)
+    signatures = index.signatures_for(["jonathan smith|acme", "jonathon smith|acme", "maria garcia|globex"])
+
+    def similarity(a, b):
+        return (signatures[a] == signatures[b]).mean()
+
+    assert similarity("jonathan smith|acme", "jonathon smith|acme") > 0.5
+    assert similarity("jonathan smith|acme", "maria garcia|globex") < 0.2
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_manager import DataManager
+
+
+def lead(url, title="Engineer"):
+    return {
+        'profile_url': url,
+        'name': "Jane Doe",
+        'title': title,
+        'company': "Acme",
+        'location': "Berlin",
+        'industry': "Software",
+        'company_size': "11-50",
+        'connections': "500+",
+    }
+
+
+def upsert(data_manager, *rows):
+    return data_manager.upsert_leads(data_manager.clean_data(pd.DataFrame(list(rows))))
+
+
+def stored(data_manager):
+    leads_df = data_manager.load_leads().set_index('profile_url').sort_index()
+    return leads_df[['title', 'fetch_count', 'change_count']].astype({'fetch_count': int, 'change_count': int})
+
+
+@pytest.fixture(params=["file", "database"])
+def data_manager(request, tmp_path):
+    return DataManager(storage_type=request.param, data_dir=str(tmp_path), db_path=str(tmp_path / "leads.db"))
+
+
+def test_refreshes_match_across_storage_types(data_manager):
+    assert upsert(data_manager, lead("https://a/"), lead("https://b/")) == 2
+    assert upsert(data_manager, lead("https://a/", title="CTO"), lead("https://c/")) == 1
+    assert upsert(data_manager, lead("https://a/", title="CTO"), lead("https://b/")) == 0
+    data_manager.apply_lead_refreshes()
+
+    assert stored(data_manager).to_dict("index") == {
+        "https://a/": {'title': "CTO", 'fetch_count': 3, 'change_count': 1},
+        "https://b/": {'title': "Engineer", 'fetch_count': 2, 'change_count': 0},
+        "https://c/": {'title': "Engineer", 'fetch_count': 1, 'change_count': 0},
+    }
+
+
+def test_file_mode_appends_new_leads_and_queues_refreshes(tmp_path):
+    data_manager = DataManager(storage_type="file", data_dir=str(tmp_path))
+    leads_path = tmp_path / "leads.csv"
+    upsert(data_manager, lead("https://a/"))
+    written = leads_path.read_text()
+
+    upsert(data_manager, lead("https://a/", title="CTO"), lead("https://b/"))
+
+    # The stored lead is untouched until the refreshes are applied
+    assert leads_path.read_text().startswith(written)
+    assert stored(data_manager).loc["https://a/", 'title'] == "Engineer"
+
+    assert data_manager.apply_lead_refreshes() == 1
+    assert stored(data_manager).loc["https://a/", 'title'] == "CTO"
+    assert not os.path.exists(tmp_path / "lead_refreshes.jsonl")
+    assert data_manager.apply_lead_refreshes() == 0
@@ -0,0 +1,125 @@
+import pytest
+
+import retry_policy
+from retry_policy import CircuitBreaker, RetryBudget
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(retry_policy.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60.0)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60.0)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_breaker_lets_one_probe_through_after_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
+    breaker.record_failure()
+
+    clock[0] += 59.0
+    assert not breaker.allow_request()
+
+    clock[0] += 1.0
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the first request after the timeout is a probe
+    assert not breaker.allow_request()
+
+
+def test_successful_probe_closes_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
+    breaker.record_failure()
+    clock[0] += 60.0
+    assert breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60.0)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 60.0
+    assert breaker.allow_request()
+
+    # A single failure in half-open state is enough, whatever the threshold
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock[0] += 60.0
+    assert breaker.allow_request()
+
+
+def test_inconclusive_failures_do_not_reset_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60.0)
+    
+    for _ in range(3):
+        breaker.record_failure()
+        breaker.record_inconclusive()
+    
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_inconclusive_probe_keeps_breaker_from_closing(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
+    breaker.record_failure()
+    clock[0] += 60.0
+    assert breaker.allow_request()
+    
+    breaker.record_inconclusive()
+    assert breaker.state != CircuitBreaker.CLOSED
+    # The next request probes again instead of waiting out another timeout
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_budget_is_exhausted_by_retries():
+    budget = RetryBudget(ratio=0.5, min_tokens=2.0)
+
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+
+def test_requests_refill_budget():
+    budget = RetryBudget(ratio=0.5, min_tokens=0.0)
+    assert not budget.try_acquire()
+
+    budget.record_request()
+    assert not budget.try_acquire()
+    budget.record_request()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+
+def test_budget_saves_up_at_most_max_tokens():
+    budget = RetryBudget(ratio=1.0, min_tokens=0.0, max_tokens=3.0)
+    for _ in range(10):
+        budget.record_request()
+
+    assert sum(budget.try_acquire() for _ in range(10)) == 3